@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Lazy, seekable calendar for state.calendar.
+
+Every day's weather and moon phase is a pure function of (world seed, day):
+weather follows src/generators/WeatherGenerator.ts draw for draw (through
+the SeededRandom port), and the moon runs the app's 32-day cycle. Events
+come from a pluggable source, by default none. So no day needs to be stored
+until someone changes it:
+
+    cal = CalendarEngine.from_world(data)
+    cal[400]                      -> day record, computed on demand
+    cal[1:29]                     -> list of records
+    cal.edit(400, weather={"condition": "fog"})
+    cal.write_state(data)         -> state.calendar = today..forecastEndDay
+
+Only edited days are kept (cal.overrides). Viewed days sit in a small
+bounded cache. A multi-year campaign therefore costs memory in proportion
+to the days it touched. from_world() compares the stored state.calendar
+against the computed days and keeps only the entries that differ, so
+hand-set weather and events survive the round trip.
+
+Usage: python3 calendar_engine.py [world.hexbinder.json] [--days N]
+"""
+
+import copy
+import json
+import sys
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from seeded_random import SeededRandom
+
+BASE = Path(__file__).parent
+DEFAULT_WORLD = BASE / "obojima_final.hexbinder.json"
+
+# -- Weather (mirrors WeatherGenerator.ts) -----------------------------------
+
+WEATHER_BY_SEASON = {
+    "spring": {"clear": 25, "cloudy": 25, "overcast": 15, "rain_light": 20, "rain_heavy": 10, "storm": 3,
+               "thunderstorm": 2, "fog": 0, "snow_light": 0, "snow_heavy": 0, "blizzard": 0},
+    "summer": {"clear": 40, "cloudy": 20, "overcast": 10, "rain_light": 10, "rain_heavy": 5, "storm": 5,
+               "thunderstorm": 8, "fog": 2, "snow_light": 0, "snow_heavy": 0, "blizzard": 0},
+    "autumn": {"clear": 20, "cloudy": 30, "overcast": 20, "rain_light": 15, "rain_heavy": 8, "storm": 3,
+               "thunderstorm": 2, "fog": 2, "snow_light": 0, "snow_heavy": 0, "blizzard": 0},
+    "winter": {"clear": 15, "cloudy": 20, "overcast": 20, "rain_light": 5, "rain_heavy": 0, "storm": 0,
+               "thunderstorm": 0, "fog": 5, "snow_light": 20, "snow_heavy": 10, "blizzard": 5},
+}
+
+TEMP_BY_SEASON = {
+    "spring": {"freezing": 5, "cold": 15, "cool": 35, "mild": 35, "warm": 10, "hot": 0},
+    "summer": {"freezing": 0, "cold": 0, "cool": 10, "mild": 25, "warm": 40, "hot": 25},
+    "autumn": {"freezing": 5, "cold": 20, "cool": 35, "mild": 30, "warm": 10, "hot": 0},
+    "winter": {"freezing": 30, "cold": 40, "cool": 20, "mild": 10, "warm": 0, "hot": 0},
+}
+
+WIND_WEIGHTS = {"calm": 30, "breeze": 40, "wind": 25, "gale": 5}
+
+STORM_CONDITIONS = {"storm", "thunderstorm", "blizzard"}
+SNOW_CONDITIONS = {"snow_light", "snow_heavy", "blizzard"}
+
+# Fahrenheit [minLow, maxLow, minHigh, maxHigh]
+TEMP_RANGES = {
+    "freezing": (-10, 15, 10, 32),
+    "cold": (20, 35, 35, 45),
+    "cool": (38, 50, 50, 62),
+    "mild": (50, 60, 62, 72),
+    "warm": (60, 72, 75, 88),
+    "hot": (72, 85, 88, 105),
+}
+
+
+def season_for_day(day):
+    """90-day seasons starting with spring on day 1."""
+    day_of_year = (day - 1) % 360
+    return ("spring", "summer", "autumn", "winter")[day_of_year // 90]
+
+
+def moon_phase(day):
+    phase = (day - 1) % 32
+    return ("new", "waxing", "full", "waning")[phase // 8]
+
+
+def generate_weather(seed, day, season=None):
+    """Same seed + season + day = same weather as the app."""
+    season = season or season_for_day(day)
+    rng = SeededRandom(f"{seed}-weather-{day}")
+    condition = rng.pick_weighted(WEATHER_BY_SEASON[season])
+    temperature = rng.pick_weighted(TEMP_BY_SEASON[season])
+    wind = rng.pick_weighted(WIND_WEIGHTS)
+
+    if condition in STORM_CONDITIONS:
+        if wind in ("calm", "breeze"):
+            wind = "wind"
+        if condition == "blizzard":
+            wind = "gale"
+    if condition in SNOW_CONDITIONS and temperature not in ("freezing", "cold"):
+        temperature = "cold"
+
+    min_low, max_low, min_high, max_high = TEMP_RANGES[temperature]
+    temp_low = rng.between(min_low, max_low)
+    temp_high = rng.between(max(min_high, temp_low + 5), max_high)
+    return {
+        "condition": condition,
+        "temperature": temperature,
+        "tempLow": temp_low,
+        "tempHigh": temp_high,
+        "wind": wind,
+    }
+
+
+# -- Event sources -----------------------------------------------------------
+
+def no_events(day):
+    return []
+
+
+def cycle_events(pool, per_day=3, id_format="event-obj-{n:03d}"):
+    """Event source that walks pool in order, per_day events a day.
+
+    Day d holds pool entries 3(d-1) .. 3(d-1)+2 (mod len(pool)) with
+    sequential ids, i.e. what transform_core used to write day by day,
+    but computable for any day directly.
+    """
+    def events(day):
+        first = (day - 1) * per_day
+        out = []
+        for n in range(first, first + per_day):
+            event = dict(pool[n % len(pool)])
+            event["id"] = id_format.format(n=n + 1)
+            out.append(event)
+        return out
+    return events
+
+
+# -- Engine ------------------------------------------------------------------
+
+def _merge(base, changes):
+    for key, value in changes.items():
+        if isinstance(value, dict) and isinstance(base.get(key), dict):
+            _merge(base[key], value)
+        else:
+            base[key] = copy.deepcopy(value)
+    return base
+
+
+class CalendarEngine:
+    def __init__(self, seed, events=no_events, weather=None, cache_size=256):
+        self.seed = seed
+        self.events = events
+        self.weather = weather or (lambda day: generate_weather(seed, day))
+        self.overrides = {}
+        self._cache = OrderedDict()
+        self._cache_size = cache_size
+
+    @classmethod
+    def from_world(cls, world, events=no_events, **kwargs):
+        """Engine for a world, keeping only calendar entries that differ from the computed ones."""
+        engine = cls(world.get("seed", ""), events, **kwargs)
+        for entry in world.get("state", {}).get("calendar", []):
+            day = entry["day"]
+            computed = engine.computed(day)
+            diff = {k: copy.deepcopy(v) for k, v in entry.items() if computed.get(k) != v}
+            if diff:
+                engine.overrides[day] = diff
+        engine._cache.clear()
+        return engine
+
+    def computed(self, day):
+        """The record for day with no edits applied."""
+        return {
+            "day": day,
+            "weather": self.weather(day),
+            "moonPhase": moon_phase(day),
+            "events": self.events(day),
+        }
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start = 1 if key.start is None else key.start
+            if key.stop is None:
+                raise ValueError("calendar slices need an end day")
+            return [self[d] for d in range(start, key.stop, key.step or 1)]
+        if key < 1:
+            raise IndexError(f"day {key} is before day 1")
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            return copy.deepcopy(cached)
+        record = self.computed(key)
+        if key in self.overrides:
+            _merge(record, self.overrides[key])
+        self._cache[key] = record
+        if len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+        return copy.deepcopy(record)
+
+    def iter_days(self, start=1, stop=None):
+        day = start
+        while stop is None or day < stop:
+            yield self[day]
+            day += 1
+
+    def edit(self, day, **changes):
+        """Override fields of one day; nested dicts (weather) merge."""
+        _merge(self.overrides.setdefault(day, {}), changes)
+        self._cache.pop(day, None)
+
+    def reset(self, day):
+        self.overrides.pop(day, None)
+        self._cache.pop(day, None)
+
+    def write_state(self, world, horizon=28):
+        """Materialize state.calendar from the current day through the forecast horizon."""
+        state = world.setdefault("state", {})
+        today = state.get("day", 1)
+        end = today + horizon - 1
+        state["calendar"] = self[today:end + 1]
+        state["forecastEndDay"] = end
+        return state["calendar"]
+
+
+def main():
+    args = sys.argv[1:]
+    days = 360 * 10
+    if "--days" in args:
+        i = args.index("--days")
+        days = int(args[i + 1])
+        del args[i:i + 2]
+    world_path = Path(args[0]) if args else DEFAULT_WORLD
+    with open(world_path) as f:
+        world = json.load(f)
+
+    cal = CalendarEngine.from_world(world)
+    print(f"{len(world['state']['calendar'])} stored days reduce to {len(cal.overrides)} overrides")
+
+    start = time.perf_counter()
+    conditions = {}
+    for record in cal.iter_days(1, days + 1):
+        c = record["weather"]["condition"]
+        conditions[c] = conditions.get(c, 0) + 1
+    elapsed = time.perf_counter() - start
+    print(f"Walked {days:,} days in {elapsed * 1000:.0f} ms; cache holds {len(cal._cache)} days")
+    for c, n in sorted(conditions.items(), key=lambda kv: -kv[1]):
+        print(f"  {c:<13} {n}")
+
+    restored = cal[1:len(world["state"]["calendar"]) + 1]
+    print(f"Round trip matches stored calendar: {restored == world['state']['calendar']}")
+
+
+if __name__ == "__main__":
+    main()
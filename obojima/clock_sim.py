@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Monte Carlo forecast for faction clocks.
+
+Each unpaused clock ticks on a given day with probability p. p starts from
+the clock's trigger and is adjusted by its owning faction:
+
+  trigger   time: 1 / daysPerTick; event: EVENT_TICK_RATE
+  scale     SCALE_FACTORS (local < regional < major)
+  advantages +ADVANTAGE_BONUS per advantage, up to MAX_ADVANTAGES
+  obstacle  OBSTACLE_FACTORS by obstacle type
+
+A clock with r empty segments completes on the day of its r-th tick. That
+is a sum of r geometric waiting times, so each trial costs r inverse-CDF
+draws per clock rather than one Bernoulli roll per day. Trials are split
+into chunks and fanned out with rng_streams.parallel_map, so results are
+identical for any worker count.
+
+Reported per clock: completion chance within the horizon and completion
+day percentiles. Across clocks: which clock fires first, and the most
+likely orders in which consequences land.
+
+Usage: python3 clock_sim.py [world.hexbinder.json] [--trials N] [--days N] [--workers N]
+"""
+
+import json
+import math
+import os
+import sys
+import time
+from collections import Counter, namedtuple
+from pathlib import Path
+
+from rng_streams import parallel_map
+
+BASE = Path(__file__).parent
+DEFAULT_WORLD = BASE / "obojima_final.hexbinder.json"
+
+EVENT_TICK_RATE = 1 / 7
+
+SCALE_FACTORS = {"local": 0.8, "regional": 1.0, "major": 1.25}
+
+ADVANTAGE_BONUS = 0.08
+MAX_ADVANTAGES = 5
+
+OBSTACLE_FACTORS = {
+    "rival_faction": 0.85,
+    "missing_item": 0.75,
+    "missing_knowledge": 0.8,
+    "lack_of_resources": 0.85,
+    "powerful_enemy": 0.8,
+    "internal_conflict": 0.9,
+    "divine_opposition": 0.7,
+    "geographic": 0.9,
+}
+
+ClockModel = namedtuple("ClockModel", ["id", "name", "remaining", "p"])
+
+
+def tick_probability(clock, faction=None):
+    trigger = clock.get("trigger") or {}
+    if trigger.get("type") == "time" and trigger.get("daysPerTick"):
+        p = 1 / trigger["daysPerTick"]
+    else:
+        p = EVENT_TICK_RATE
+    if faction:
+        p *= SCALE_FACTORS.get(faction.get("scale"), 1.0)
+        p *= 1 + ADVANTAGE_BONUS * min(len(faction.get("advantages") or []), MAX_ADVANTAGES)
+        obstacle = faction.get("obstacle") or {}
+        p *= OBSTACLE_FACTORS.get(obstacle.get("type"), 1.0)
+    return min(p, 1.0)
+
+
+def clock_models(world):
+    """ClockModel for every clock that can still complete."""
+    factions = {f["id"]: f for f in world.get("factions", [])}
+    models = []
+    for clock in world.get("clocks", []):
+        remaining = clock.get("segments", 0) - clock.get("filled", 0)
+        if clock.get("paused") or remaining <= 0:
+            continue
+        faction = factions.get(clock.get("ownerId")) if clock.get("ownerType") == "faction" else None
+        models.append(ClockModel(clock["id"], clock.get("name", clock["id"]), remaining,
+                                 tick_probability(clock, faction)))
+    return models
+
+
+def _run_chunk(payload, rng):
+    """Simulate one chunk of trials; returns aggregated counts only."""
+    models, trials, horizon, order_depth = payload
+    rand = rng.random
+    log = math.log
+    params = [(m.remaining, 1 / log(1 - m.p) if m.p < 1 else None) for m in models]
+    days = [Counter() for _ in models]
+    orders = Counter()
+    for _ in range(trials):
+        finished = []
+        for i, (remaining, inv_log_q) in enumerate(params):
+            day = remaining
+            if inv_log_q is not None:
+                # r geometric waiting times: floor(log(U) / log(1 - p)) + 1 each.
+                for _ in range(remaining):
+                    day += int(log(1.0 - rand()) * inv_log_q)
+            if day <= horizon:
+                days[i][day] += 1
+                finished.append((day, i))
+        finished.sort()
+        orders[tuple(i for _, i in finished[:order_depth])] += 1
+    return days, orders
+
+
+def simulate(world, trials=100_000, horizon=360, workers=None, chunk=5_000, order_depth=3):
+    """Monte Carlo over every clock in the world.
+
+    Returns (models, completion_days, orders): completion_days[i] is a
+    Counter of completion day -> trials for models[i] (trials that did not
+    finish within the horizon are absent), and orders counts the tuple of
+    the first order_depth clock indices to complete in each trial.
+    """
+    models = clock_models(world)
+    chunks = []
+    left = trials
+    while left > 0:
+        n = min(chunk, left)
+        chunks.append((f"chunk-{len(chunks)}", (models, n, horizon, order_depth)))
+        left -= n
+    results = parallel_map(_run_chunk, chunks, world.get("seed", ""), "clock-sim", workers=workers)
+    days = [Counter() for _ in models]
+    orders = Counter()
+    for chunk_days, chunk_orders in results:
+        for total, part in zip(days, chunk_days):
+            total.update(part)
+        orders.update(chunk_orders)
+    return models, days, orders
+
+
+def percentile(counter, total, q):
+    """Day by which a fraction q of all trials completed, or None."""
+    target = q * total
+    seen = 0
+    for day in sorted(counter):
+        seen += counter[day]
+        if seen >= target:
+            return day
+    return None
+
+
+def main():
+    args = sys.argv[1:]
+    opts = {"--trials": 100_000, "--days": 360, "--workers": os.cpu_count() or 1}
+    for flag in list(opts):
+        if flag in args:
+            i = args.index(flag)
+            opts[flag] = int(args[i + 1])
+            del args[i:i + 2]
+    world_path = Path(args[0]) if args else DEFAULT_WORLD
+    with open(world_path) as f:
+        world = json.load(f)
+
+    trials, horizon = opts["--trials"], opts["--days"]
+    start = time.perf_counter()
+    models, days, orders = simulate(world, trials, horizon, workers=opts["--workers"])
+    elapsed = time.perf_counter() - start
+    print(f"{trials:,} trials x {len(models)} clocks over {horizon} days in {elapsed:.2f}s\n")
+
+    print(f"  {'clock':<44} {'p/day':>6} {'done':>6} {'p10':>5} {'p50':>5} {'p90':>5}")
+    for m, counter in zip(models, days):
+        done = sum(counter.values()) / trials
+        p10, p50, p90 = (percentile(counter, trials, q) for q in (0.1, 0.5, 0.9))
+        fmt = lambda d: f"{d:>5}" if d is not None else "    -"
+        print(f"  {m.name[:44]:<44} {m.p:>6.3f} {done:>6.1%} {fmt(p10)} {fmt(p50)} {fmt(p90)}")
+
+    first = Counter()
+    for order, n in orders.items():
+        if order:
+            first[order[0]] += n
+    print("\nFirst consequence to land:")
+    for i, n in first.most_common(5):
+        print(f"  {n / trials:>6.1%}  {models[i].name}")
+    print("\nMost likely consequence orderings:")
+    for order, n in orders.most_common(5):
+        names = " -> ".join(models[i].name for i in order) or "(nothing completes)"
+        print(f"  {n / trials:>6.1%}  {names}")
+
+
+if __name__ == "__main__":
+    main()
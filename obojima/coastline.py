@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Coastlines, ocean borders and gap fills as whole-grid hex operations.
+
+The Python side of transform-map.cjs steps 3 and 8. It works on a
+hex_grid.HexGrid, where each step is a few bitmask shifts over the whole
+map rather than a loop over hexes:
+
+  fill_scaled_gaps   after a 2x scale, land hexes that used to touch are
+                     two apart. The empty midpoint between them gets the
+                     blend of the two terrains (BLEND_RULES, the same
+                     table as TERRAIN_BLEND in transform-map.cjs).
+  fill_holes         empty cells with at least min_neighbors land
+                     neighbours take the majority neighbouring terrain.
+  add_water_border   N rings of water around everything that is not
+                     water, growing the grid margin as needed.
+  coast_masks        land touching water, and water touching land.
+
+    grid = HexGrid.from_world(data)
+    grid = fill_scaled_gaps(grid)
+    grid, rings = add_water_border(grid, rings=2)
+    data["hexes"] = grid.to_hexes()
+
+Usage: python3 coastline.py [world.hexbinder.json] [--rings N] [--bench RADIUS]
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+
+from hex_grid import HexGrid, spiral
+
+BASE = Path(__file__).parent
+DEFAULT_WORLD = BASE / "obojima_final.hexbinder.json"
+
+WATER = "water"
+
+# Sorted "a+b" pairs -> blended terrain, as in transform-map.cjs.
+BLEND_RULES = {
+    "hills+mountains": "hills",
+    "forest+mountains": "hills",
+    "mountains+plains": "hills",
+    "mountains+swamp": "hills",
+    "forest+hills": "forest",
+    "forest+plains": "forest",
+    "hills+plains": "hills",
+    "hills+swamp": "swamp",
+    "forest+swamp": "swamp",
+    "plains+swamp": "swamp",
+    "desert+hills": "desert",
+    "desert+mountains": "hills",
+    "desert+plains": "desert",
+    "desert+forest": "hills",
+    "desert+swamp": "plains",
+}
+
+
+def blend(a, b, rules=BLEND_RULES):
+    """Blended terrain for a pair; unknown pairs fall back to the first in sorted order."""
+    if a == b:
+        return a
+    pair = "+".join(sorted((a, b)))
+    return rules.get(pair, min(a, b))
+
+
+def _terrain_masks(grid, exclude=()):
+    present = set(grid.terrain)
+    return {t: grid.mask({t}) for c, t in enumerate(grid.terrains)
+            if c and c in present and t not in exclude}
+
+
+def fill_scaled_gaps(grid, rules=BLEND_RULES):
+    """Fill empty midpoints between land hexes two steps apart. Returns the grid."""
+    empty = grid.interior & ~grid.present()
+    masks = _terrain_masks(grid, exclude=(WATER,))
+    names = sorted(masks)
+    filled = 0
+    # Directions 0-2 cover each axis once; d and d+3 are the two sides.
+    for a in names:
+        for b in names:
+            if b < a:
+                continue
+            target = blend(a, b, rules)
+            gaps = 0
+            for d in range(3):
+                left_a = grid.shift(masks[a], d)
+                right_b = grid.shift(masks[b], d + 3)
+                gaps |= left_a & right_b
+                if a != b:
+                    gaps |= grid.shift(masks[b], d) & grid.shift(masks[a], d + 3)
+            gaps &= empty & ~filled
+            if gaps:
+                grid.fill(gaps, target)
+                filled |= gaps
+    return grid
+
+
+def fill_holes(grid, min_neighbors=4):
+    """Give empty cells mostly surrounded by land their majority neighbour terrain."""
+    empty = grid.interior & ~grid.present()
+    masks = _terrain_masks(grid, exclude=(WATER,))
+    assigned = 0
+    for k in range(6, min_neighbors - 1, -1):
+        for t, m in sorted(masks.items()):
+            cells = grid.neighbor_count_at_least(m, k) & empty & ~assigned
+            if cells:
+                grid.fill(cells, t)
+                assigned |= cells
+    return grid
+
+
+def add_water_border(grid, rings=2):
+    """Add `rings` rings of water around all non-water hexes.
+
+    Returns (grid, [ring masks]); the grid is expanded when its margin is
+    too small, so use the returned one.
+    """
+    # Ring k needs k free cells inside the interior; erode it to check.
+    core = grid.interior
+    for _ in range(rings):
+        for d in range(6):
+            core &= grid.shift(core, d)
+    if grid.present() & ~core:
+        grid = grid.expand(rings + 1)
+    solid = grid.present() & ~grid.mask({WATER})
+    reached = solid
+    out = []
+    for _ in range(rings):
+        ring = grid.dilate(reached) & ~reached
+        new_water = ring & ~grid.present()
+        if new_water:
+            grid.fill(new_water, WATER)
+        out.append(ring)
+        reached |= ring
+    return grid, out
+
+
+def coast_masks(grid):
+    """(coastal land, coastal water): land touching water or the map edge, and water touching land."""
+    water = grid.mask({WATER})
+    land = grid.mask_land()
+    outside = grid.interior & ~grid.present()
+    coastal_land = land & grid.dilate(water | outside)
+    coastal_water = water & grid.dilate(land)
+    return coastal_land, coastal_water
+
+
+def _bench(radius, rings):
+    import math
+    hexes = []
+    for q, r in spiral((0, 0), radius):
+        # A lumpy island: land where a couple of waves stay above a threshold.
+        v = math.sin(q * 0.05) + math.cos(r * 0.043) + math.sin((q + r) * 0.031)
+        if v > 0.2:
+            terrain = ("plains", "forest", "hills", "mountains")[int(v * 3) % 4]
+            # Leave every other hex empty to exercise the gap fill.
+            if q % 2 == 0 and r % 2 == 0:
+                hexes.append({"coord": {"q": q, "r": r}, "terrain": terrain})
+    grid = HexGrid.from_hexes(hexes, margin=rings + 1)
+    start = time.perf_counter()
+    fill_scaled_gaps(grid)
+    gaps = time.perf_counter() - start
+    start = time.perf_counter()
+    fill_holes(grid)
+    holes = time.perf_counter() - start
+    start = time.perf_counter()
+    grid, ring_masks = add_water_border(grid, rings)
+    border = time.perf_counter() - start
+    print(f"Bench: {grid.size:,}-cell grid from {len(hexes):,} seed hexes -> {grid.count(grid.present()):,} hexes")
+    print(f"  gap fill {gaps * 1000:.0f} ms, hole fill {holes * 1000:.0f} ms, "
+          f"{rings}-ring border {border * 1000:.0f} ms ({sum(m.bit_count() for m in ring_masks):,} water hexes)")
+
+
+def main():
+    args = sys.argv[1:]
+    rings = 2
+    bench = None
+    if "--rings" in args:
+        i = args.index("--rings")
+        rings = int(args[i + 1])
+        del args[i:i + 2]
+    if "--bench" in args:
+        i = args.index("--bench")
+        bench = int(args[i + 1])
+        del args[i:i + 2]
+    world_path = Path(args[0]) if args else DEFAULT_WORLD
+    with open(world_path) as f:
+        world = json.load(f)
+
+    grid = HexGrid.from_world(world)
+    before = grid.count(grid.present())
+    grid = fill_holes(grid)
+    grid, ring_masks = add_water_border(grid, rings)
+    coastal_land, coastal_water = coast_masks(grid)
+    print(f"{world.get('name')}: {before} hexes -> {grid.count(grid.present())}")
+    print(f"  water ring sizes: {[m.bit_count() for m in ring_masks]}")
+    print(f"  coastal land {coastal_land.bit_count()}, coastal water {coastal_water.bit_count()}")
+    if bench:
+        _bench(bench, rings)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Rescale, recentre and rotate every hex coordinate in a world in one pass.
+
+Coordinates live in several places: {q, r} dicts (hex coords, location
+hexCoords, edge endpoints, faction lairs, significant items, dwellings and
+dungeon exit destinations) and "q,r" key strings (the current hex, visited
+hexes in state and dungeon exit destinationHexIds). COORD_SCHEMA lists them
+all as paths, with "*" standing for every element of a list.
+transform_world() gathers each path's q and r values into two arrays, maps
+them through one integer affine transform, and writes them back, so no
+reference is touched twice or missed. audit() walks the whole world and
+reports any coordinate-shaped value the schema does not cover; main()
+refuses to write a world that audit() finds uncovered coordinates in.
+
+Transforms are integer affine maps on axial coordinates, composed left to
+right:
+
+    t = AxialTransform().scale(2)                        # transform-map.cjs step 1
+    t = AxialTransform().translate(-4, 2).rotate(1)      # shift, then 60 deg clockwise
+    t = AxialTransform().about((3, -1), AxialTransform().rotate(3))
+    counts = transform_world(world, t)
+
+Usage: python3 coord_transform.py [world.hexbinder.json] [--scale N]
+           [--rotate STEPS] [--translate DQ,DR] [--center Q,R] [--out PATH]
+"""
+
+import json
+import re
+import sys
+import time
+from array import array
+from pathlib import Path
+
+BASE = Path(__file__).parent
+DEFAULT_WORLD = BASE / "obojima_final.hexbinder.json"
+
+# Paths to {q, r} dicts.
+COORD_SCHEMA = {
+    "hex": ("hexes", "*", "coord"),
+    "location": ("locations", "*", "hexCoord"),
+    "edge_from": ("edges", "*", "from"),
+    "edge_to": ("edges", "*", "to"),
+    "lair": ("factions", "*", "lair", "hexCoord"),
+    "item": ("significantItems", "*", "hexCoord"),
+    "exit": ("locations", "*", "exitPoints", "*", "destinationCoord"),
+    "dwelling": ("dwellings", "*", "hexCoord"),
+}
+
+# Paths to "q,r" key strings.
+KEY_SCHEMA = {
+    "current_hex": ("state", "currentHexId"),
+    "visited": ("state", "visitedHexIds", "*"),
+    "exit_hex": ("locations", "*", "exitPoints", "*", "destinationHexId"),
+}
+
+KEY_RE = re.compile(r"^-?\d+,-?\d+$")
+
+
+class AxialTransform:
+    """q' = a*q + b*r + e, r' = c*q + d*r + f."""
+
+    def __init__(self, a=1, b=0, c=0, d=1, e=0, f=0):
+        self.a, self.b, self.c, self.d, self.e, self.f = a, b, c, d, e, f
+
+    def __repr__(self):
+        return f"AxialTransform({self.a}, {self.b}, {self.c}, {self.d}, {self.e}, {self.f})"
+
+    def then(self, other):
+        """This transform followed by `other`."""
+        o = other
+        return AxialTransform(
+            o.a * self.a + o.b * self.c, o.a * self.b + o.b * self.d,
+            o.c * self.a + o.d * self.c, o.c * self.b + o.d * self.d,
+            o.a * self.e + o.b * self.f + o.e, o.c * self.e + o.d * self.f + o.f,
+        )
+
+    def scale(self, factor):
+        return self.then(AxialTransform(factor, 0, 0, factor))
+
+    def translate(self, dq, dr):
+        return self.then(AxialTransform(e=dq, f=dr))
+
+    def rotate(self, steps):
+        """Rotate about the origin by steps * 60 degrees clockwise."""
+        t = self
+        for _ in range(steps % 6):
+            # Cube (x, y, z) -> (-z, -x, -y) is (q, r) -> (-r, q + r).
+            t = t.then(AxialTransform(0, -1, 1, 1))
+        return t
+
+    def about(self, center, inner):
+        """Apply `inner` around `center` instead of the origin."""
+        q, r = center
+        return self.translate(-q, -r).then(inner).translate(q, r)
+
+    def is_identity(self):
+        return (self.a, self.b, self.c, self.d, self.e, self.f) == (1, 0, 0, 1, 0, 0)
+
+    def point(self, q, r):
+        return self.a * q + self.b * r + self.e, self.c * q + self.d * r + self.f
+
+    def apply(self, qs, rs):
+        """Transformed (qs, rs) arrays."""
+        a, b, c, d, e, f = self.a, self.b, self.c, self.d, self.e, self.f
+        if b == 0 and c == 0:
+            return (array("q", [a * q + e for q in qs]), array("q", [d * r + f for r in rs]))
+        return (array("q", [a * q + b * r + e for q, r in zip(qs, rs)]),
+                array("q", [c * q + d * r + f for q, r in zip(qs, rs)]))
+
+
+def _step(objs, key):
+    """Everything one path step below `objs`, level by level."""
+    if key == "*":
+        return [x for o in objs if isinstance(o, list) for x in o]
+    return [o[key] for o in objs if isinstance(o, dict) and key in o]
+
+
+def _slots(world, path):
+    """(container, key) for every slot matching `path`."""
+    parents = [world]
+    for key in path[:-1]:
+        parents = _step(parents, key)
+    last = path[-1]
+    if last == "*":
+        return [(p, i) for p in parents if isinstance(p, list) for i in range(len(p))]
+    return [(p, last) for p in parents if isinstance(p, dict) and last in p]
+
+
+def collect(world, coord_schema=COORD_SCHEMA, key_schema=KEY_SCHEMA):
+    """({name: [coord dicts]}, {name: [(container, key)]}) for every schema path."""
+    coords = {}
+    for name, path in coord_schema.items():
+        found = [world]
+        for key in path:
+            found = _step(found, key)
+        coords[name] = [x for x in found if isinstance(x, dict)]
+    keys = {name: [(c, k) for c, k in _slots(world, path) if isinstance(c[k], str)]
+            for name, path in key_schema.items()}
+    return coords, keys
+
+
+def transform_world(world, transform, coord_schema=COORD_SCHEMA, key_schema=KEY_SCHEMA):
+    """Apply `transform` to every coordinate in place. Returns {name: count}."""
+    coords, keys = collect(world, coord_schema, key_schema)
+    counts = {name: len(v) for name, v in (*coords.items(), *keys.items())}
+    if transform.is_identity():
+        return counts
+    for found in coords.values():
+        qs, rs = transform.apply(array("q", [x["q"] for x in found]), array("q", [x["r"] for x in found]))
+        for x, q, r in zip(found, qs, rs):
+            x["q"] = q
+            x["r"] = r
+    for slots in keys.values():
+        parts = [c[k].split(",") for c, k in slots]
+        qs, rs = transform.apply(array("q", [int(p[0]) for p in parts]), array("q", [int(p[1]) for p in parts]))
+        for (c, k), q, r in zip(slots, qs, rs):
+            c[k] = f"{q},{r}"
+    return counts
+
+
+def audit(world, coord_schema=COORD_SCHEMA, key_schema=KEY_SCHEMA):
+    """Paths of coordinate-shaped values that the schema does not reach."""
+    coords, keys = collect(world, coord_schema, key_schema)
+    covered = {id(x) for found in coords.values() for x in found}
+    covered.update((id(c), k) for slots in keys.values() for c, k in slots)
+    missed = []
+
+    def walk(obj, path):
+        if isinstance(obj, dict):
+            if "q" in obj and "r" in obj and isinstance(obj["q"], int) and isinstance(obj["r"], int):
+                if id(obj) not in covered:
+                    missed.append(path)
+                return
+            items = obj.items()
+        elif isinstance(obj, list):
+            items = enumerate(obj)
+        else:
+            return
+        for k, v in items:
+            if isinstance(v, str):
+                if KEY_RE.match(v) and (id(obj), k) not in covered:
+                    missed.append(f"{path}.{k}")
+            else:
+                walk(v, f"{path}.{k}")
+
+    walk(world, "")
+    return missed
+
+
+def _parse_pair(text):
+    q, r = text.split(",")
+    return int(q), int(r)
+
+
+def main():
+    args = sys.argv[1:]
+    opts = {}
+    for flag in ("--scale", "--rotate", "--translate", "--center", "--out"):
+        if flag in args:
+            i = args.index(flag)
+            opts[flag] = args[i + 1]
+            del args[i:i + 2]
+    world_path = Path(args[0]) if args else DEFAULT_WORLD
+    with open(world_path) as f:
+        world = json.load(f)
+
+    inner = AxialTransform()
+    if "--scale" in opts:
+        inner = inner.scale(int(opts["--scale"]))
+    if "--rotate" in opts:
+        inner = inner.rotate(int(opts["--rotate"]))
+    transform = AxialTransform()
+    if "--center" in opts:
+        transform = transform.about(_parse_pair(opts["--center"]), inner)
+    else:
+        transform = inner
+    if "--translate" in opts:
+        transform = transform.translate(*_parse_pair(opts["--translate"]))
+    if not {"--scale", "--rotate", "--translate"} & set(opts):
+        # No transform given: the transform-map.cjs 2x scale.
+        transform = transform.scale(2)
+
+    missed = audit(world)
+    start = time.perf_counter()
+    counts = transform_world(world, transform)
+    elapsed = time.perf_counter() - start
+    print(f"{transform}: {sum(counts.values())} references in {elapsed * 1000:.2f} ms")
+    for name, n in counts.items():
+        print(f"  {name:<12} {n}")
+    if missed:
+        # A partial transform leaves the world inconsistent; never write it.
+        print(f"Not covered by schema ({len(missed)}): {', '.join(missed[:10])}")
+        if "--out" in opts:
+            print(f"Not writing {opts['--out']}")
+        sys.exit(1)
+    if "--out" in opts:
+        with open(opts["--out"], "w") as f:
+            json.dump(world, f, indent=2, ensure_ascii=False)
+        print(f"Wrote {opts['--out']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Dice expressions: parse once, roll in bulk, exact distributions.
+
+Expressions are sums of dice terms and integer constants, e.g. "1d4",
+"2d6+3", "d8 - 1", "3d6 + 1d4 + 2". parse() caches the compiled Dice
+object per expression string, so wanderingMonsters counts and any other
+rollable field compile once per distinct string.
+
+    d = parse("2d6+3")
+    d.roll(rng)               -> one total
+    d.roll_many(rng, 10**6)   -> list of totals, one rng.choices draw per term
+    d.pmf()                   -> {total: Fraction}, exact, by convolution
+    d.mean, d.min, d.max
+
+Usage: python3 dice.py [expression ...] [--rolls N]
+"""
+
+import random
+import re
+import sys
+import time
+from fractions import Fraction
+from functools import lru_cache
+from operator import add, sub
+
+_TERM = re.compile(r"([+-])?\s*(?:(\d*)d(\d+)|(\d+))", re.IGNORECASE)
+
+
+class DiceError(ValueError):
+    pass
+
+
+class Dice:
+    """Compiled expression: dice terms (sign, count, sides) plus a constant."""
+
+    __slots__ = ("expr", "terms", "constant", "_pmf")
+
+    def __init__(self, expr, terms, constant):
+        self.expr = expr
+        self.terms = tuple(terms)
+        self.constant = constant
+        self._pmf = None
+
+    def __repr__(self):
+        return f"Dice({self.expr!r})"
+
+    @property
+    def min(self):
+        return self.constant + sum(sign * (count if sign > 0 else count * sides)
+                                   for sign, count, sides in self.terms)
+
+    @property
+    def max(self):
+        return self.constant + sum(sign * (count * sides if sign > 0 else count)
+                                   for sign, count, sides in self.terms)
+
+    @property
+    def mean(self):
+        return self.constant + sum(Fraction(sign * count * (sides + 1), 2) for sign, count, sides in self.terms)
+
+    def roll(self, rng=random):
+        total = self.constant
+        for sign, count, sides in self.terms:
+            total += sign * sum(rng.randint(1, sides) for _ in range(count))
+        return total
+
+    def roll_many(self, rng, k):
+        """k totals. Each term draws all count*k faces in one rng.choices call."""
+        totals = [self.constant] * k
+        for sign, count, sides in self.terms:
+            faces = rng.choices(range(1, sides + 1), k=count * k)
+            per_roll = faces[0::count]
+            for j in range(1, count):
+                per_roll = list(map(add, per_roll, faces[j::count]))
+            totals = list(map(add if sign > 0 else sub, totals, per_roll))
+        return totals
+
+    def counts(self):
+        """(offset, ways) where ways[i] is the number of outcomes totalling offset + i."""
+        offset = self.constant
+        ways = [1]
+        for sign, count, sides in self.terms:
+            die = [1] * sides
+            for _ in range(count):
+                ways = _convolve(ways, die)
+                # An added die spans 1..sides, a subtracted one -sides..-1.
+                offset += 1 if sign > 0 else -sides
+        return offset, ways
+
+    def pmf(self):
+        """Exact {total: Fraction} by convolving each die's uniform faces."""
+        if self._pmf is None:
+            offset, ways = self.counts()
+            outcomes = sum(ways)
+            self._pmf = {offset + i: Fraction(w, outcomes) for i, w in enumerate(ways) if w}
+        return self._pmf
+
+
+def _convolve(a, b):
+    out = [0] * (len(a) + len(b) - 1)
+    for i, x in enumerate(a):
+        if x:
+            for j, y in enumerate(b):
+                out[i + j] += x * y
+    return out
+
+
+@lru_cache(maxsize=None)
+def parse(expr):
+    """Compiled Dice for an expression string (or int), cached."""
+    if isinstance(expr, int):
+        return Dice(str(expr), (), expr)
+    text = str(expr).strip()
+    pos = 0
+    terms = []
+    constant = 0
+    first = True
+    while pos < len(text):
+        m = _TERM.match(text, pos)
+        if not m or (not first and not m.group(1)):
+            raise DiceError(f"Invalid dice expression: {expr!r}")
+        sign = -1 if m.group(1) == "-" else 1
+        if m.group(3):
+            count = int(m.group(2) or 1)
+            sides = int(m.group(3))
+            if sides < 1:
+                raise DiceError(f"Invalid die size in {expr!r}")
+            if count:
+                terms.append((sign, count, sides))
+        else:
+            constant += sign * int(m.group(4))
+        pos = m.end()
+        while pos < len(text) and text[pos].isspace():
+            pos += 1
+        first = False
+    if first:
+        raise DiceError(f"Invalid dice expression: {expr!r}")
+    return Dice(text, terms, constant)
+
+
+def roll(expr, rng=random):
+    return parse(expr).roll(rng)
+
+
+def mixture_pmf(weighted):
+    """Exact pmf of a weighted choice between expressions: [(weight, expr), ...]."""
+    total = sum(Fraction(w) for w, _ in weighted)
+    out = {}
+    for w, expr in weighted:
+        for value, p in parse(expr).pmf().items():
+            out[value] = out.get(value, 0) + p * Fraction(w) / total
+    return dict(sorted(out.items()))
+
+
+def main():
+    args = sys.argv[1:]
+    rolls = 1_000_000
+    if "--rolls" in args:
+        i = args.index("--rolls")
+        rolls = int(args[i + 1])
+        del args[i:i + 2]
+    exprs = args or ["1d4", "2d6+3", "3d6 - 1d4"]
+    rng = random.Random(0)
+    for expr in exprs:
+        d = parse(expr)
+        start = time.perf_counter()
+        totals = d.roll_many(rng, rolls)
+        elapsed = time.perf_counter() - start
+        mean = sum(totals) / rolls
+        print(f"{expr}: range {d.min}..{d.max}, mean {float(d.mean):.3f} (sampled {mean:.3f}); "
+              f"{rolls:,} rolls in {elapsed * 1000:.0f} ms")
+        for value, p in d.pmf().items():
+            print(f"  {value:>4}  {float(p):.4f}  {p}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Rasterize dungeon layouts into occupancy grids and check them.
+
+A dungeon location has gridWidth x gridHeight cells, rooms with bounds
+{x, y, width, height} and passages with waypoints [{x, y}, ...].
+OccupancyGrid paints them into two flat arrays, indexed y * width + x:
+
+  rooms     array("H"): 1 + room index, 0 = no room
+  passages  array("H"): 1 + passage index, 0 = no passage
+
+Rooms are painted a row slice at a time and straight passage segments as
+one row slice or one column stride, so painting a whole dungeon takes a few
+hundred slice operations instead of a loop over cells. Overlaps are found
+while painting by looking at the slice about to be overwritten.
+
+Queries:
+  overlaps          room pairs sharing cells
+  cut_through       passages crossing a room other than their two ends
+  dangling          passages whose ends do not reach their end rooms
+  out_of_bounds     rooms and passages leaving the grid
+  adjacency()       room pairs and room/passage pairs sharing an edge
+  is_free(rect)     no room or passage within the rect (plus padding), O(1)
+  find_space(w, h)  first free rect of that size, row by row
+
+    grid = OccupancyGrid(dungeon)
+    problems = validate_dungeon(dungeon)     -> ["Room A overlaps Room B (4 cells)", ...]
+
+Usage: python3 dungeon_grid.py [world.hexbinder.json] [--name DUNGEON]
+"""
+
+import json
+import sys
+import time
+from array import array
+from itertools import accumulate
+from operator import add
+from pathlib import Path
+
+BASE = Path(__file__).parent
+DEFAULT_WORLD = BASE / "obojima_final.hexbinder.json"
+
+
+def _segment(a, b):
+    """Grid cells from a to b inclusive; straight lines, Bresenham otherwise."""
+    x0, y0, x1, y1 = a["x"], a["y"], b["x"], b["y"]
+    dx, dy = abs(x1 - x0), -abs(y1 - y0)
+    sx = 1 if x0 < x1 else -1
+    sy = 1 if y0 < y1 else -1
+    err = dx + dy
+    cells = []
+    while True:
+        cells.append((x0, y0))
+        if x0 == x1 and y0 == y1:
+            return cells
+        e2 = 2 * err
+        if e2 >= dy:
+            err += dy
+            x0 += sx
+        if e2 <= dx:
+            err += dx
+            y0 += sy
+
+
+class OccupancyGrid:
+    def __init__(self, dungeon):
+        self.dungeon = dungeon
+        self.width = w = dungeon.get("gridWidth", 0)
+        self.height = h = dungeon.get("gridHeight", 0)
+        self.room_list = dungeon.get("rooms", [])
+        self.passage_list = dungeon.get("passages", [])
+        self.room_index = {room["id"]: i + 1 for i, room in enumerate(self.room_list)}
+        self.rooms = array("H", bytes(2 * w * h))
+        self.passages = array("H", bytes(2 * w * h))
+        self.overlaps = {}       # (code, code) -> cells
+        self.cut_through = {}    # (passage code, room code) -> cells
+        self.out_of_bounds = []  # ("room" | "passage", id)
+        self.touches = {}        # passage code -> room codes at or beside its two ends
+        self._table = None
+        for code, room in enumerate(self.room_list, 1):
+            self._paint_room(code, room.get("bounds"))
+        for code, passage in enumerate(self.passage_list, 1):
+            self._paint_passage(code, passage)
+
+    def _paint_room(self, code, bounds):
+        if not bounds:
+            return
+        W, H = self.width, self.height
+        x0, y0 = bounds["x"], bounds["y"]
+        x1, y1 = x0 + bounds["width"], y0 + bounds["height"]
+        cx0, cy0, cx1, cy1 = max(0, x0), max(0, y0), min(W, x1), min(H, y1)
+        if (cx0, cy0, cx1, cy1) != (x0, y0, x1, y1):
+            self.out_of_bounds.append(("room", self.room_list[code - 1].get("name")))
+        if cx1 <= cx0 or cy1 <= cy0:
+            return
+        span = cx1 - cx0
+        fill = array("H", [code]) * span
+        rooms = self.rooms
+        for y in range(cy0, cy1):
+            start = y * W + cx0
+            row = rooms[start:start + span]
+            if any(row):
+                for other in set(row) - {0}:
+                    key = (other, code)
+                    self.overlaps[key] = self.overlaps.get(key, 0) + row.count(other)
+            rooms[start:start + span] = fill
+
+    def _paint_passage(self, code, passage):
+        W, H = self.width, self.height
+        points = passage.get("waypoints", [])
+        ends = {self.room_index.get(passage.get("fromRoomId")), self.room_index.get(passage.get("toRoomId")), 0}
+        outside = False
+        for a, b in zip(points, points[1:] or points):
+            if a["x"] == b["x"] or a["y"] == b["y"]:
+                xs = sorted((a["x"], b["x"]))
+                ys = sorted((a["y"], b["y"]))
+                clipped = [[max(0, xs[0]), min(W - 1, xs[1])], [max(0, ys[0]), min(H - 1, ys[1])]]
+                if clipped != [xs, ys]:
+                    outside = True
+                    xs, ys = clipped
+                    if xs[0] > xs[1] or ys[0] > ys[1]:
+                        continue
+                if ys[0] == ys[1]:
+                    sl = slice(ys[0] * W + xs[0], ys[0] * W + xs[1] + 1)
+                else:
+                    sl = slice(ys[0] * W + xs[0], ys[1] * W + xs[0] + 1, W)
+                self._mark(code, sl, ends)
+            else:
+                for x, y in _segment(a, b):
+                    if 0 <= x < W and 0 <= y < H:
+                        i = y * W + x
+                        self._mark(code, slice(i, i + 1), ends)
+                    else:
+                        outside = True
+        if outside:
+            self.out_of_bounds.append(("passage", passage.get("id")))
+        touched = set()
+        for end in points[:1] + points[-1:]:
+            x, y = end["x"], end["y"]
+            for nx, ny in ((x, y), (x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+                if 0 <= nx < W and 0 <= ny < H:
+                    touched.add(self.rooms[ny * W + nx])
+        touched.discard(0)
+        self.touches[code] = touched
+
+    def _mark(self, code, sl, ends):
+        under = self.rooms[sl]
+        if any(under):
+            for room in set(under) - ends:
+                key = (code, room)
+                self.cut_through[key] = self.cut_through.get(key, 0) + under.count(room)
+        n = len(range(*sl.indices(len(self.passages))))
+        self.passages[sl] = array("H", [code]) * n
+
+    # -- Queries --------------------------------------------------------------
+
+    def room_at(self, x, y):
+        code = self.rooms[y * self.width + x]
+        return self.room_list[code - 1] if code else None
+
+    def _edge_pairs(self, a, b):
+        """Distinct (a[i], b[j]) code pairs over horizontally and vertically adjacent cells."""
+        W = self.width
+        pairs = set(zip(a[W:], b[:-W])) | set(zip(a[:-W], b[W:]))
+        for y in range(self.height):
+            ra = a[y * W:(y + 1) * W]
+            rb = b[y * W:(y + 1) * W]
+            pairs.update(zip(ra[1:], rb[:-1]))
+            pairs.update(zip(ra[:-1], rb[1:]))
+        return pairs
+
+    def adjacency(self):
+        """(room pairs sharing an edge, {passage code: room codes beside its cells})."""
+        rooms = {tuple(sorted(p)) for p in self._edge_pairs(self.rooms, self.rooms) if 0 not in p and p[0] != p[1]}
+        beside = {}
+        for p, r in self._edge_pairs(self.passages, self.rooms) | set(zip(self.passages, self.rooms)):
+            if p and r:
+                beside.setdefault(p, set()).add(r)
+        return rooms, beside
+
+    def dangling(self):
+        """Passages whose two ends do not reach both of their end rooms."""
+        out = []
+        for code, passage in enumerate(self.passage_list, 1):
+            reached = self.touches.get(code, set())
+            missing = [self.room_list[i - 1].get("name") if i else room_id
+                       for room_id, i in ((r, self.room_index.get(r)) for r in (passage.get("fromRoomId"), passage.get("toRoomId")))
+                       if i not in reached]
+            if missing:
+                out.append((passage.get("id"), missing))
+        return out
+
+    def free_cells(self):
+        return sum(1 for r, p in zip(self.rooms, self.passages) if not (r or p))
+
+    def _summed(self):
+        """Summed-area table of occupied cells, (width + 1) x (height + 1)."""
+        if self._table is None:
+            W = self.width
+            occupied = [1 if r or p else 0 for r, p in zip(self.rooms, self.passages)]
+            table = [[0] * (W + 1)]
+            for y in range(self.height):
+                row = [0, *accumulate(occupied[y * W:(y + 1) * W])]
+                table.append(list(map(add, table[-1], row)))
+            self._table = table
+        return self._table
+
+    def occupied_in(self, x, y, w, h):
+        """Occupied cells in a rect, clipped to the grid."""
+        t = self._summed()
+        x0, y0 = max(0, x), max(0, y)
+        x1, y1 = min(self.width, x + w), min(self.height, y + h)
+        if x1 <= x0 or y1 <= y0:
+            return 0
+        return t[y1][x1] - t[y0][x1] - t[y1][x0] + t[y0][x0]
+
+    def is_free(self, x, y, w, h, pad=1):
+        """Rect fits in the grid with no room or passage within `pad` cells."""
+        if x < 0 or y < 0 or x + w > self.width or y + h > self.height:
+            return False
+        return self.occupied_in(x - pad, y - pad, w + 2 * pad, h + 2 * pad) == 0
+
+    def find_space(self, w, h, pad=1):
+        """Top-left (x, y) of the first free w x h rect, or None."""
+        for y in range(self.height - h + 1):
+            for x in range(self.width - w + 1):
+                if self.is_free(x, y, w, h, pad):
+                    return x, y
+        return None
+
+
+def validate_dungeon(dungeon):
+    """Human-readable layout problems for one dungeon."""
+    grid = OccupancyGrid(dungeon)
+    name = dungeon.get("name", dungeon.get("id"))
+    rooms = grid.room_list
+    passages = grid.passage_list
+    problems = []
+    for (a, b), n in sorted(grid.overlaps.items()):
+        problems.append(f"{name}: room {rooms[a - 1]['name']} overlaps {rooms[b - 1]['name']} ({n} cells)")
+    for (p, r), n in sorted(grid.cut_through.items()):
+        problems.append(f"{name}: passage {passages[p - 1]['id']} cuts through {rooms[r - 1]['name']} ({n} cells)")
+    for passage_id, missing in grid.dangling():
+        problems.append(f"{name}: passage {passage_id} does not reach {', '.join(missing)}")
+    for kind, item_id in grid.out_of_bounds:
+        problems.append(f"{name}: {kind} {item_id} leaves the {grid.width}x{grid.height} grid")
+    return problems
+
+
+def validate_world(world):
+    problems = []
+    for loc in world.get("locations", []):
+        if loc.get("type") == "dungeon" and loc.get("gridWidth"):
+            problems.extend(validate_dungeon(loc))
+    return problems
+
+
+def main():
+    args = sys.argv[1:]
+    name = None
+    if "--name" in args:
+        i = args.index("--name")
+        name = args[i + 1].lower()
+        del args[i:i + 2]
+    world_path = Path(args[0]) if args else DEFAULT_WORLD
+    with open(world_path) as f:
+        world = json.load(f)
+
+    dungeons = [l for l in world["locations"] if l.get("type") == "dungeon" and l.get("gridWidth")]
+    start = time.perf_counter()
+    problems = validate_world(world)
+    elapsed = time.perf_counter() - start
+    print(f"Checked {len(dungeons)} dungeons in {elapsed * 1000:.1f} ms: {len(problems)} problems")
+    for p in problems:
+        print(f"  {p}")
+
+    if name:
+        dungeons = [d for d in dungeons if d["name"].lower().startswith(name)]
+    for d in dungeons[:1] if not name else dungeons:
+        grid = OccupancyGrid(d)
+        touching, _ = grid.adjacency()
+        total = grid.width * grid.height
+        print(f"\n{d['name']}: {grid.width}x{grid.height}, {grid.free_cells()}/{total} cells free, "
+              f"{len(touching)} touching room pairs")
+        for w, h in ((4, 4), (8, 8)):
+            print(f"  first free {w}x{h} room slot (1-cell gap): {grid.find_space(w, h)}")
+
+
+if __name__ == "__main__":
+    main()
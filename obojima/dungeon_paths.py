@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Cached grid-step distance fields for dungeon pathing and passage carving.
+
+Walkable cells are room and passage cells of a dungeon_grid.OccupancyGrid,
+moving in four directions. A distance field is one BFS from a set of
+source cells, stored as a flat array("i") (-1 = unreachable). Fields are
+computed on demand and kept:
+
+  entrance     field from every cell of entranceRoomId
+  rooms        one field per room, from all of its cells
+  cells        an LRU of single-cell fields, for path() goals
+
+With a goal's field in hand, path() is A* with an exact heuristic: each step
+moves to a neighbour one closer, so a query costs only the path length.
+DungeonPaths objects are cached per dungeon with a hash of its layout
+(grid size, room bounds, passage waypoints), so every caller shares one set
+of fields until the layout changes.
+
+carve_passage() routes a new passage between two rooms through free cells
+and existing passages, never through a third room, and appends it in the
+dungeon's waypoint format (corner points, starting and ending just outside
+the two rooms).
+
+    paths = dungeon_paths(dungeon)
+    paths.room_depths()                      -> {room_id: steps from the entrance}
+    paths.distance("room-a", "room-b")       -> steps, or None
+    paths.path((6, 30), (20, 37))            -> [(x, y), ...]
+    carve_passage(dungeon, "room-a", "room-b")
+
+Usage: python3 dungeon_paths.py [world.hexbinder.json] [--bench SIZE]
+"""
+
+import hashlib
+import json
+import random
+import sys
+import time
+from array import array
+from collections import OrderedDict, deque
+from pathlib import Path
+
+from dungeon_grid import OccupancyGrid
+from id_alloc import IdAllocator
+
+BASE = Path(__file__).parent
+DEFAULT_WORLD = BASE / "obojima_final.hexbinder.json"
+
+CELL_FIELDS = 64
+
+
+def layout_hash(dungeon):
+    """Hash of everything that affects walkable cells."""
+    layout = [
+        dungeon.get("gridWidth"), dungeon.get("gridHeight"),
+        [(r.get("id"), r.get("bounds")) for r in dungeon.get("rooms", [])],
+        [(p.get("fromRoomId"), p.get("toRoomId"), p.get("waypoints")) for p in dungeon.get("passages", [])],
+    ]
+    blob = json.dumps(layout, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(blob.encode()).hexdigest()
+
+
+class DungeonPaths:
+    def __init__(self, dungeon):
+        grid = OccupancyGrid(dungeon)
+        self.grid = grid
+        self.width = W = grid.width
+        self.height = grid.height
+        self.entrance_id = dungeon.get("entranceRoomId")
+        # Padded copy (one blocked cell all round) so neighbour steps never wrap.
+        self.stride = S = W + 2
+        walk = bytearray(S * (self.height + 2))
+        for y in range(self.height):
+            row = (y + 1) * S + 1
+            walk[row:row + W] = bytes(1 if r or p else 0 for r, p in zip(grid.rooms[y * W:(y + 1) * W],
+                                                                         grid.passages[y * W:(y + 1) * W]))
+        self.walkable = walk
+        self.steps = (1, -1, S, -S)
+        self.room_cells = {}
+        for i, code in enumerate(grid.rooms):
+            if code:
+                y, x = divmod(i, W)
+                self.room_cells.setdefault(grid.room_list[code - 1]["id"], []).append((y + 1) * S + x + 1)
+        self._room_fields = {}
+        self._cell_fields = OrderedDict()
+
+    def _p(self, xy):
+        return (xy[1] + 1) * self.stride + xy[0] + 1
+
+    def _xy(self, p):
+        y, x = divmod(p, self.stride)
+        return x - 1, y - 1
+
+    def bfs(self, sources, passable=None):
+        """Distance field from padded source indices over `passable` (default: walkable)."""
+        passable = self.walkable if passable is None else passable
+        dist = array("i", [-1]) * len(passable)
+        queue = deque()
+        for p in sources:
+            if dist[p] < 0:
+                dist[p] = 0
+                queue.append(p)
+        steps = self.steps
+        pop, push = queue.popleft, queue.append
+        while queue:
+            p = pop()
+            d = dist[p] + 1
+            for s in steps:
+                n = p + s
+                if passable[n] and dist[n] < 0:
+                    dist[n] = d
+                    push(n)
+        return dist
+
+    def room_field(self, room_id):
+        field = self._room_fields.get(room_id)
+        if field is None:
+            field = self._room_fields[room_id] = self.bfs(self.room_cells.get(room_id, ()))
+        return field
+
+    def entrance_field(self):
+        return self.room_field(self.entrance_id)
+
+    def cell_field(self, xy):
+        p = self._p(xy)
+        field = self._cell_fields.get(p)
+        if field is not None:
+            self._cell_fields.move_to_end(p)
+            return field
+        field = self._cell_fields[p] = self.bfs([p])
+        if len(self._cell_fields) > CELL_FIELDS:
+            self._cell_fields.popitem(last=False)
+        return field
+
+    def distance(self, from_room, to_room):
+        """Fewest steps from any cell of one room to any cell of the other, or None."""
+        field = self.room_field(to_room)
+        ds = [field[p] for p in self.room_cells.get(from_room, ()) if field[p] >= 0]
+        return min(ds) if ds else None
+
+    def room_depths(self):
+        """{room id: steps from the entrance room}, unreachable rooms omitted."""
+        out = {}
+        for room in self.grid.room_list:
+            d = self.distance(room["id"], self.entrance_id)
+            if d is not None:
+                out[room["id"]] = d
+        return out
+
+    def _descend(self, field, p):
+        path = [p]
+        steps = self.steps
+        while field[p] > 0:
+            want = field[p] - 1
+            for s in steps:
+                if field[p + s] == want:
+                    p += s
+                    break
+            path.append(p)
+        return path
+
+    def path(self, start, goal):
+        """Shortest walkable cell path from start to goal (x, y), or None."""
+        field = self.cell_field(goal)
+        p = self._p(start)
+        if field[p] < 0:
+            return None
+        return [self._xy(c) for c in self._descend(field, p)]
+
+    def path_to_room(self, start, room_id):
+        field = self.room_field(room_id)
+        p = self._p(start)
+        if field[p] < 0:
+            return None
+        return [self._xy(c) for c in self._descend(field, p)]
+
+    def carve_route(self, from_room, to_room):
+        """Cells for a new passage between two rooms, outside both, or None."""
+        grid, S, W = self.grid, self.stride, self.width
+        b_code = grid.room_index[to_room]
+        # Free cells and passages are open; of the rooms only the target is.
+        open_cells = bytearray(len(self.walkable))
+        for y in range(self.height):
+            row = (y + 1) * S + 1
+            open_cells[row:row + W] = bytes(1 if r == 0 or r == b_code else 0
+                                            for r in grid.rooms[y * W:(y + 1) * W])
+        field = self.bfs(self.room_cells[to_room], open_cells)
+        starts = {p + s for p in self.room_cells[from_room] for s in self.steps
+                  if open_cells[p + s] and p + s not in self.room_cells[to_room]}
+        reached = [(field[p], p) for p in starts if field[p] > 0]
+        if not reached:
+            return None
+        _, start = min(reached)
+        cells = self._descend(field, start)[:-1]  # drop the cell inside the target room
+        return [self._xy(c) for c in cells]
+
+
+def _corners(cells):
+    """Waypoints: first cell, every turn, last cell."""
+    if len(cells) <= 2:
+        return list(cells)
+    out = [cells[0]]
+    for prev, cur, nxt in zip(cells, cells[1:], cells[2:]):
+        if (cur[0] - prev[0], cur[1] - prev[1]) != (nxt[0] - cur[0], nxt[1] - cur[1]):
+            out.append(cur)
+    out.append(cells[-1])
+    return out
+
+
+_CACHE = {}  # dungeon id -> (layout hash, DungeonPaths)
+
+
+def dungeon_paths(dungeon):
+    """Cached DungeonPaths for the dungeon's current layout."""
+    key = layout_hash(dungeon)
+    hit = _CACHE.get(dungeon.get("id"))
+    if hit is not None and hit[0] == key:
+        return hit[1]
+    paths = DungeonPaths(dungeon)
+    _CACHE[dungeon.get("id")] = (key, paths)
+    return paths
+
+
+def carve_passage(dungeon, from_room, to_room, connection_type="passage", ids=None, rng=random):
+    """Route and append a new passage between two rooms. Returns it, or None if boxed in."""
+    cells = dungeon_paths(dungeon).carve_route(from_room, to_room)
+    if cells is None:
+        return None
+    if ids is None:
+        ids = IdAllocator.from_world(dungeon)
+    passage = {
+        "id": ids.allocate("passage", rng),
+        "fromRoomId": from_room,
+        "toRoomId": to_room,
+        "waypoints": [{"x": x, "y": y} for x, y in _corners(cells)],
+        "connectionType": connection_type,
+        "locked": False,
+        "hidden": connection_type == "secret",
+    }
+    dungeon.setdefault("passages", []).append(passage)
+    return passage
+
+
+def _synthetic_dungeon(size, seed=0):
+    """Rooms on a lattice joined in a snake by straight passages."""
+    rng = random.Random(seed)
+    rooms, passages = [], []
+    step = 10
+    cols = size // step
+    for j in range(cols):
+        for i in range(cols):
+            x, y = i * step + 1, j * step + 1
+            w, h = rng.randint(3, 6), rng.randint(3, 6)
+            rooms.append({"id": f"room-{j:02d}{i:02d}", "name": f"Room {j},{i}",
+                          "bounds": {"x": x, "y": y, "width": w, "height": h}})
+    for j in range(cols):
+        for i in range(cols - 1):
+            a = rooms[j * cols + i]["bounds"]
+            passages.append({"id": f"passage-h{j}{i}", "fromRoomId": rooms[j * cols + i]["id"],
+                             "toRoomId": rooms[j * cols + i + 1]["id"],
+                             "waypoints": [{"x": a["x"] + a["width"], "y": a["y"] + 1},
+                                           {"x": a["x"] + step - 1, "y": a["y"] + 1}]})
+        if j < cols - 1:
+            i = cols - 1 if j % 2 == 0 else 0
+            a = rooms[j * cols + i]["bounds"]
+            passages.append({"id": f"passage-v{j}", "fromRoomId": rooms[j * cols + i]["id"],
+                             "toRoomId": rooms[(j + 1) * cols + i]["id"],
+                             "waypoints": [{"x": a["x"] + 1, "y": a["y"] + a["height"]},
+                                           {"x": a["x"] + 1, "y": a["y"] + step - 1}]})
+    return {"id": "dungeon-bench", "name": f"{size}x{size} bench", "gridWidth": size, "gridHeight": size,
+            "rooms": rooms, "passages": passages, "entranceRoomId": rooms[0]["id"]}
+
+
+def _bench(size):
+    dungeon = _synthetic_dungeon(size)
+    start = time.perf_counter()
+    paths = dungeon_paths(dungeon)
+    depths = paths.room_depths()
+    built = time.perf_counter() - start
+    rooms = dungeon["rooms"]
+    start_xy = (rooms[0]["bounds"]["x"], rooms[0]["bounds"]["y"])
+    goal_xy = (rooms[-1]["bounds"]["x"], rooms[-1]["bounds"]["y"])
+    start = time.perf_counter()
+    route = paths.path(start_xy, goal_xy)
+    cold = time.perf_counter() - start
+    n = 1000
+    start = time.perf_counter()
+    for _ in range(n):
+        paths.path(start_xy, goal_xy)
+    warm = (time.perf_counter() - start) / n
+    start = time.perf_counter()
+    for _ in range(n):
+        paths.distance(rooms[0]["id"], rooms[-1]["id"])
+    lookup = (time.perf_counter() - start) / n
+    print(f"Bench: {size}x{size} grid, {len(rooms)} rooms, {len(dungeon['passages'])} passages")
+    print(f"  layout + {len(depths)} room depths {built * 1000:.0f} ms; path of {len(route)} cells: "
+          f"cold {cold * 1000:.1f} ms, warm {warm * 1e6:.0f} us; room distance {lookup * 1e6:.1f} us")
+    print(f"  cache hit for unchanged layout: {dungeon_paths(dungeon) is paths}")
+
+
+def main():
+    args = sys.argv[1:]
+    bench = None
+    if "--bench" in args:
+        i = args.index("--bench")
+        bench = int(args[i + 1])
+        del args[i:i + 2]
+    world_path = Path(args[0]) if args else DEFAULT_WORLD
+    with open(world_path) as f:
+        world = json.load(f)
+
+    dungeons = [l for l in world["locations"] if l.get("type") == "dungeon" and l.get("gridWidth")]
+    start = time.perf_counter()
+    depths = {d["id"]: dungeon_paths(d).room_depths() for d in dungeons}
+    elapsed = time.perf_counter() - start
+    print(f"Entrance distance fields for {len(dungeons)} dungeons in {elapsed * 1000:.1f} ms")
+    d = dungeons[0]
+    names = {r["id"]: r["name"] for r in d["rooms"]}
+    print(f"\n{d['name']} (steps from the entrance):")
+    for room_id, steps in sorted(depths[d["id"]].items(), key=lambda kv: kv[1]):
+        print(f"  {steps:>3}  {names[room_id]}")
+    unreached = [names[r] for r in names if r not in depths[d["id"]]]
+    if unreached:
+        print(f"  unreachable: {', '.join(unreached)}")
+
+    a, b = d["rooms"][0]["id"], d["rooms"][-1]["id"]
+    passage = carve_passage(d, a, b, rng=random.Random(world.get("seed")))
+    if passage:
+        print(f"\nCarved {passage['id']} {names[a]} -> {names[b]}: {passage['waypoints']}")
+        print(f"  {names[a]} -> {names[b]} now {dungeon_paths(d).distance(a, b)} steps")
+    if bench:
+        _bench(bench)
+
+
+if __name__ == "__main__":
+    main()
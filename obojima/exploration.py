@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Bitset exploration state: state.visitedHexIds as one bit per grid cell.
+
+visitedHexIds is a list of "q,r" strings. ExplorationState keeps the same
+set as an int bitmask over a HexGrid's cell indices, so:
+
+  membership   one bit test instead of a list scan
+  union        one | of two ints
+  count        int.bit_count()
+  frontier     unvisited hexes next to the visited region, one dilate()
+
+Serialized form is a short text token: the grid origin and width, then the
+zlib-compressed little-endian bitmask in base64. Visited ids that fall
+outside the grid (hexes not on the map) are kept aside and written back
+unchanged, so to_list() round-trips the set exactly. Ids come back in grid
+row order, the same order HexGrid.to_hexes() uses.
+
+    explored = ExplorationState.from_world(world)
+    (3, -1) in explored
+    explored.visit(4, -1)
+    explored.frontier_coords()          -> [(q, r), ...]
+    token = explored.dumps()            -> "hexbits1:-5:-4:12:eJz..."
+    ExplorationState.loads(token, explored.grid).to_list() == explored.to_list()
+    explored.write(world)
+
+Usage: python3 exploration.py [world.hexbinder.json] [--bench HEXES]
+"""
+
+import base64
+import json
+import random
+import sys
+import time
+import zlib
+from pathlib import Path
+
+from hex_grid import AXIAL_DIRECTIONS, FLAG_VISITED, HexGrid, spiral
+
+BASE = Path(__file__).parent
+DEFAULT_WORLD = BASE / "obojima_final.hexbinder.json"
+
+TOKEN_PREFIX = "hexbits1"
+
+
+def _parse_id(hex_id):
+    q, r = hex_id.split(",")
+    return int(q), int(r)
+
+
+class ExplorationState:
+    def __init__(self, grid, bits=0, outside=()):
+        self.grid = grid
+        self.bits = bits & grid.interior
+        self.outside = list(outside)  # visited ids with no grid cell
+
+    @classmethod
+    def from_ids(cls, grid, hex_ids):
+        state = cls(grid)
+        state.visit_ids(hex_ids)
+        return state
+
+    @classmethod
+    def from_world(cls, world, grid=None):
+        if grid is None:
+            grid = HexGrid.from_world(world)
+            visited = world.get("state", {}).get("visitedHexIds", [])
+            state = cls(grid, grid.flag_mask(FLAG_VISITED))
+            for hex_id in visited:
+                if not grid.in_bounds(*_parse_id(hex_id)) and hex_id not in state.outside:
+                    state.outside.append(hex_id)
+            return state
+        return cls.from_ids(grid, world.get("state", {}).get("visitedHexIds", []))
+
+    # -- Updates and queries --------------------------------------------------
+
+    def visit(self, q, r):
+        grid = self.grid
+        if grid.in_bounds(q, r):
+            self.bits |= 1 << grid.index(q, r)
+        else:
+            hex_id = f"{q},{r}"
+            if hex_id not in self.outside:
+                self.outside.append(hex_id)
+
+    def visit_ids(self, hex_ids):
+        grid = self.grid
+        m = 0
+        for hex_id in hex_ids:
+            q, r = _parse_id(hex_id)
+            if grid.in_bounds(q, r):
+                m |= 1 << grid.index(q, r)
+            elif hex_id not in self.outside:
+                self.outside.append(hex_id)
+        self.bits |= m
+
+    def __contains__(self, coord):
+        q, r = coord
+        grid = self.grid
+        if grid.in_bounds(q, r):
+            return (self.bits >> grid.index(q, r)) & 1 == 1
+        return f"{q},{r}" in self.outside
+
+    def __len__(self):
+        return self.bits.bit_count() + len(self.outside)
+
+    def count(self):
+        return len(self)
+
+    def _same_grid(self, other):
+        a, b = self.grid, other.grid
+        return (a.q0, a.r0, a.width, a.height) == (b.q0, b.r0, b.width, b.height)
+
+    def union(self, other):
+        """New state visited in either; other is re-indexed if its grid differs."""
+        out = ExplorationState(self.grid, self.bits, self.outside)
+        if self._same_grid(other):
+            out.bits |= other.bits
+            out.outside += [h for h in other.outside if h not in out.outside]
+        else:
+            out.visit_ids(other.to_list())
+        return out
+
+    __or__ = union
+
+    def frontier(self):
+        """Bitmask of unvisited map hexes adjacent to a visited one."""
+        grid = self.grid
+        return grid.dilate(self.bits) & ~self.bits & grid.present()
+
+    def frontier_coords(self):
+        return self.grid.coords(self.frontier())
+
+    def coords(self):
+        return self.grid.coords(self.bits)
+
+    # -- List and token round trips -------------------------------------------
+
+    def to_list(self):
+        """visitedHexIds list: grid hexes in row order, then off-grid ids."""
+        return [f"{q},{r}" for q, r in self.grid.coords(self.bits)] + self.outside
+
+    def write(self, world):
+        world.setdefault("state", {})["visitedHexIds"] = self.to_list()
+
+    def dumps(self):
+        grid = self.grid
+        raw = self.bits.to_bytes((self.bits.bit_length() + 7) // 8, "little")
+        body = base64.b64encode(zlib.compress(raw, 9)).decode()
+        head = f"{TOKEN_PREFIX}:{grid.q0}:{grid.r0}:{grid.width}"
+        extra = ";".join(self.outside)
+        return f"{head}:{body}" + (f":{extra}" if extra else "")
+
+    @classmethod
+    def loads(cls, token, grid):
+        """State from dumps() output, re-indexed onto `grid` if the geometry moved."""
+        parts = token.split(":", 5)
+        if parts[0] != TOKEN_PREFIX or len(parts) < 5:
+            raise ValueError(f"not an exploration token: {token[:20]!r}")
+        q0, r0, width = int(parts[1]), int(parts[2]), int(parts[3])
+        bits = int.from_bytes(zlib.decompress(base64.b64decode(parts[4])), "little")
+        outside = parts[5].split(";") if len(parts) > 5 else []
+        if (q0, r0, width) == (grid.q0, grid.r0, grid.width):
+            return cls(grid, bits, outside)
+        state = cls(grid, 0, outside)
+        ids = []
+        for i in grid.indices(bits):
+            r, q = divmod(i, width)
+            ids.append(f"{q + q0},{r + r0}")
+        state.visit_ids(ids)
+        return state
+
+
+def _bench(n_hexes):
+    radius = 1
+    while 1 + 3 * radius * (radius + 1) < n_hexes:
+        radius += 1
+    hexes = [{"coord": {"q": q, "r": r}, "terrain": "plains"} for q, r in spiral((0, 0), radius)]
+    rng = random.Random(0)
+    # A wandering party: a long random walk, as visitedHexIds grows in play.
+    q = r = 0
+    visited = []
+    seen = set()
+    for _ in range(n_hexes // 5):
+        dq, dr = rng.choice(AXIAL_DIRECTIONS)
+        if max(abs(q + dq), abs(r + dr), abs(q + dq + r + dr)) <= radius:
+            q, r = q + dq, r + dr
+        if (q, r) not in seen:
+            seen.add((q, r))
+            visited.append(f"{q},{r}")
+    world = {"hexes": hexes, "state": {"visitedHexIds": visited}}
+
+    grid = HexGrid.from_hexes(hexes)
+    start = time.perf_counter()
+    explored = ExplorationState.from_world(world, grid)
+    built = time.perf_counter() - start
+    probes = [(rng.randint(-radius, radius), rng.randint(-radius, radius)) for _ in range(10_000)]
+    start = time.perf_counter()
+    sum(1 for p in probes if p in explored)
+    bit_lookup = time.perf_counter() - start
+    start = time.perf_counter()
+    sum(1 for q, r in probes[:200] if f"{q},{r}" in visited)
+    list_lookup = (time.perf_counter() - start) * len(probes) / 200
+    start = time.perf_counter()
+    frontier = explored.frontier()
+    front = time.perf_counter() - start
+    token = explored.dumps()
+    list_json = len(json.dumps(visited))
+    print(f"Bench: {len(hexes):,} hexes, {len(explored):,} visited")
+    print(f"  build {built * 1000:.1f} ms; 10k membership tests {bit_lookup * 1000:.1f} ms "
+          f"(list scan ~{list_lookup * 1000:.0f} ms); frontier {front * 1000:.1f} ms ({frontier.bit_count():,} hexes)")
+    print(f"  token {len(token):,} bytes vs list JSON {list_json:,} bytes; "
+          f"round trip {'ok' if sorted(ExplorationState.loads(token, grid).to_list()) == sorted(visited) else 'FAILED'}")
+
+
+def main():
+    args = sys.argv[1:]
+    bench = None
+    if "--bench" in args:
+        i = args.index("--bench")
+        bench = int(args[i + 1])
+        del args[i:i + 2]
+    world_path = Path(args[0]) if args else DEFAULT_WORLD
+    with open(world_path) as f:
+        world = json.load(f)
+
+    explored = ExplorationState.from_world(world)
+    visited = world.get("state", {}).get("visitedHexIds", [])
+    token = explored.dumps()
+    print(f"{world.get('name')}: {len(explored)} visited of {explored.grid.count(explored.grid.present())} hexes")
+    print(f"  frontier: {explored.frontier_coords()}")
+    print(f"  token: {token}")
+    restored = ExplorationState.loads(token, explored.grid).to_list()
+    print(f"  list round trip identical: {sorted(restored) == sorted(visited)}")
+    if bench:
+        _bench(bench)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+Faction relationship matrix and influence propagation.
+
+Relationships are a sparse signed matrix M (row faction -> column faction)
+with RELATION_WEIGHTS per relationship type. Transitive stance is
+
+    T = M + d*M^2 + d^2*M^3 ...   (up to `hops` terms)
+
+so the ally of an ally scores positive and the enemy of an enemy scores
+positive too. Rows of T are computed on demand and cached. Changing one
+edge a->b drops only the cached rows of factions that can reach a within
+hops - 1 steps.
+
+Influence spreads over a settlement graph. Each settlement links to its
+nearest neighbours by hex distance, and the links are row-normalized into
+W. A faction's influence row solves x = seed + spread * x W by fixed-point
+iteration. Its seed comes from territoryIds, influenceIds, a settlement
+headquarters and the settlement nearest its lair. The system is linear and
+each faction's row depends only on its own seed, so editing one faction's
+seeds recomputes one row.
+
+    graph = FactionGraph.from_world(data)
+    graph.stance("faction-MarGuild", "faction-o3Wd4Xcu")
+    graph.alliance_blocs(), graph.conflicts(), graph.contested()
+    graph.set_relationship(a, b, "hostile")     # incremental
+    graph.write_influence(data)                 # influenceIds from the model
+
+Usage: python3 faction_graph.py [world.hexbinder.json] [--bench] [--write OUT]
+"""
+
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+from hex_nearest import SettlementLocator
+
+BASE = Path(__file__).parent
+DEFAULT_WORLD = BASE / "obojima_final.hexbinder.json"
+
+RELATION_WEIGHTS = {
+    "allied": 1.0,
+    "friendly": 0.5,
+    "neutral": 0.0,
+    "rival": -0.5,
+    "hostile": -1.0,
+    "war": -1.5,
+}
+
+DEFAULT_REASONS = {"allied": "Shared goals", "friendly": "Shared goals", "rival": "Competing interests",
+                   "hostile": "Ancient enmity", "war": "Open war"}
+
+SEED_WEIGHTS = {"territory": 1.0, "headquarters": 1.0, "lair": 0.8, "influence": 0.6}
+
+
+class FactionGraph:
+    def __init__(self, faction_ids, settlement_coords, decay=0.5, hops=3, spread=0.6,
+                 neighbors=6, max_range=8, epsilon=1e-4):
+        self.faction_ids = list(faction_ids)
+        self.index = {fid: i for i, fid in enumerate(self.faction_ids)}
+        self.decay = decay
+        self.hops = hops
+        self.spread = spread
+        self.epsilon = epsilon
+
+        n = len(self.faction_ids)
+        self.rows = [{} for _ in range(n)]      # M[i] = {j: weight}
+        self.cols = [set() for _ in range(n)]   # i in cols[j] <=> M[i][j] != 0
+        self.types = {}                         # (i, j) -> (type, reason)
+        self._stance = {}
+
+        self.settlement_ids = list(settlement_coords)
+        self.sindex = {sid: i for i, sid in enumerate(self.settlement_ids)}
+        self.W = self._settlement_links(settlement_coords, neighbors, max_range)
+        self.seeds = [{} for _ in range(n)]     # faction -> {settlement index: weight}
+        self._influence = {}
+
+    # -- Construction --------------------------------------------------------
+
+    def _settlement_links(self, coords, neighbors, max_range):
+        world = {"locations": [{"id": sid, "type": "settlement", "hexCoord": {"q": q, "r": r}}
+                               for sid, (q, r) in coords.items()]}
+        locator = SettlementLocator(world)
+        W = []
+        for sid, qr in coords.items():
+            links = {}
+            for dist, other in locator.nearest(qr, neighbors + 1):
+                if other != sid and dist <= max_range:
+                    links[self.sindex[other]] = 1.0 / (1 + dist)
+            total = sum(links.values())
+            W.append({j: w / total for j, w in links.items()} if total else {})
+        return W
+
+    @classmethod
+    def from_world(cls, world, **kwargs):
+        coords = {loc["id"]: (loc["hexCoord"]["q"], loc["hexCoord"]["r"])
+                  for loc in world.get("locations", [])
+                  if loc.get("type") == "settlement" and loc.get("hexCoord")}
+        factions = world.get("factions", [])
+        graph = cls([f["id"] for f in factions], coords, **kwargs)
+        locator = SettlementLocator(world)
+        for f in factions:
+            for rel in f.get("relationships", []):
+                if rel.get("factionId") in graph.index:
+                    graph.set_relationship(f["id"], rel["factionId"], rel.get("type", "neutral"), rel.get("reason"))
+            for sid in f.get("territoryIds", []):
+                graph.set_seed(f["id"], sid, SEED_WEIGHTS["territory"])
+            for sid in f.get("influenceIds", []):
+                graph.set_seed(f["id"], sid, max(SEED_WEIGHTS["influence"], graph.seed(f["id"], sid)))
+            hq = f.get("headquartersId")
+            if hq in graph.sindex:
+                graph.set_seed(f["id"], hq, SEED_WEIGHTS["headquarters"])
+            lair = (f.get("lair") or {}).get("hexCoord")
+            if lair and coords:
+                near = locator.nearest(lair, 1)
+                if near:
+                    sid = near[0][1]
+                    graph.set_seed(f["id"], sid, max(SEED_WEIGHTS["lair"], graph.seed(f["id"], sid)))
+        return graph
+
+    # -- Relationships -------------------------------------------------------
+
+    def set_relationship(self, a, b, rel_type, reason=None):
+        """Set (or with "neutral", clear) the a -> b edge."""
+        i, j = self.index[a], self.index[b]
+        weight = RELATION_WEIGHTS[rel_type]
+        self._invalidate_stance(i)
+        if weight == 0:
+            self.rows[i].pop(j, None)
+            self.cols[j].discard(i)
+            self.types.pop((i, j), None)
+        else:
+            self.rows[i][j] = weight
+            self.cols[j].add(i)
+            self.types[(i, j)] = (rel_type, reason or DEFAULT_REASONS.get(rel_type, ""))
+
+    def relationship(self, a, b):
+        return self.types.get((self.index[a], self.index[b]), ("neutral", ""))[0]
+
+    def _invalidate_stance(self, i):
+        # Row r of T depends on edge (i, *) iff r reaches i in < hops steps.
+        frontier = {i}
+        seen = {i}
+        for _ in range(self.hops - 1):
+            nxt = set()
+            for node in frontier:
+                nxt.update(self.cols[node] - seen)
+            seen |= nxt
+            frontier = nxt
+        for r in seen:
+            self._stance.pop(r, None)
+
+    def stance_row(self, i):
+        """{j: transitive stance} for faction index i."""
+        cached = self._stance.get(i)
+        if cached is not None:
+            return cached
+        rows = self.rows
+        total = {}
+        vec = {i: 1.0}
+        scale = 1.0
+        for _ in range(self.hops):
+            nxt = {}
+            for k, v in vec.items():
+                for j, w in rows[k].items():
+                    nxt[j] = nxt.get(j, 0.0) + v * w
+            for j, v in nxt.items():
+                total[j] = total.get(j, 0.0) + scale * v
+            vec = nxt
+            scale *= self.decay
+        total.pop(i, None)
+        self._stance[i] = total
+        return total
+
+    def stance(self, a, b):
+        return self.stance_row(self.index[a]).get(self.index[b], 0.0)
+
+    def alliance_blocs(self, threshold=0.5):
+        """Groups joined by mutual transitive stance >= threshold."""
+        parent = list(range(len(self.faction_ids)))
+
+        def find(x):
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        for i in range(len(self.faction_ids)):
+            for j, s in self.stance_row(i).items():
+                if s >= threshold and self.stance_row(j).get(i, 0.0) >= threshold:
+                    parent[find(i)] = find(j)
+        blocs = {}
+        for i in range(len(self.faction_ids)):
+            blocs.setdefault(find(i), []).append(self.faction_ids[i])
+        return sorted((b for b in blocs.values() if len(b) > 1), key=len, reverse=True)
+
+    def conflicts(self, threshold=0.5):
+        """[(a, b, score)] pairs whose stance (either way) is <= -threshold, worst first."""
+        out = {}
+        for i in range(len(self.faction_ids)):
+            for j, s in self.stance_row(i).items():
+                if s <= -threshold:
+                    key = (min(i, j), max(i, j))
+                    out[key] = min(out.get(key, 0.0), s)
+        return sorted(((self.faction_ids[a], self.faction_ids[b], s) for (a, b), s in out.items()),
+                      key=lambda t: t[2])
+
+    # -- Influence -----------------------------------------------------------
+
+    def seed(self, faction, settlement):
+        return self.seeds[self.index[faction]].get(self.sindex[settlement], 0.0)
+
+    def set_seed(self, faction, settlement, weight):
+        f = self.index[faction]
+        s = self.sindex.get(settlement)
+        if s is None:
+            return
+        if weight:
+            self.seeds[f][s] = weight
+        else:
+            self.seeds[f].pop(s, None)
+        self._influence.pop(f, None)
+
+    def _influence_row(self, f):
+        cached = self._influence.get(f)
+        if cached is not None:
+            return cached
+        seed = self.seeds[f]
+        W = self.W
+        spread = self.spread
+        eps = self.epsilon
+        x = dict(seed)
+        for _ in range(100):
+            nxt = dict(seed)
+            for s, v in x.items():
+                v *= spread
+                for t, w in W[s].items():
+                    nxt[t] = nxt.get(t, 0.0) + v * w
+            nxt = {s: v for s, v in nxt.items() if v >= eps}
+            delta = max((abs(v - x.get(s, 0.0)) for s, v in nxt.items()), default=0.0)
+            x = nxt
+            if delta < eps:
+                break
+        self._influence[f] = x
+        return x
+
+    def influence(self, faction):
+        """{settlement_id: influence} for one faction."""
+        ids = self.settlement_ids
+        return {ids[s]: v for s, v in self._influence_row(self.index[faction]).items()}
+
+    def influence_matrix(self):
+        """{faction_id: {settlement_id: influence}} for every faction."""
+        return {fid: self.influence(fid) for fid in self.faction_ids}
+
+    def contested(self, threshold=0.6, hostility=1.0):
+        """{settlement_id: [(a, b)]} where hostile factions both hold influence >= threshold."""
+        holders = {}
+        for f in range(len(self.faction_ids)):
+            for s, v in self._influence_row(f).items():
+                if v >= threshold:
+                    holders.setdefault(s, []).append(f)
+        out = {}
+        for s, fs in holders.items():
+            pairs = [(self.faction_ids[a], self.faction_ids[b])
+                     for n, a in enumerate(fs) for b in fs[n + 1:]
+                     if min(self.stance_row(a).get(b, 0.0), self.stance_row(b).get(a, 0.0)) <= -hostility]
+            if pairs:
+                out[self.settlement_ids[s]] = pairs
+        return out
+
+    # -- Write back ----------------------------------------------------------
+
+    def write_relationships(self, world):
+        for f in world.get("factions", []):
+            i = self.index[f["id"]]
+            f["relationships"] = [
+                {"factionId": self.faction_ids[j], "type": self.types[(i, j)][0], "reason": self.types[(i, j)][1]}
+                for j in self.rows[i]
+            ]
+
+    def write_influence(self, world, threshold=0.5, limit=5):
+        """Set influenceIds to the strongest non-territory settlements above threshold."""
+        for f in world.get("factions", []):
+            territory = set(f.get("territoryIds", []))
+            ranked = sorted(((v, sid) for sid, v in self.influence(f["id"]).items()
+                             if v >= threshold and sid not in territory), reverse=True)
+            f["influenceIds"] = [sid for _, sid in ranked[:limit]]
+
+
+def _bench(n_factions=300, n_settlements=3000, seed=7):
+    rng = random.Random(seed)
+    coords = {f"settlement-{i}": (rng.randrange(-150, 150), rng.randrange(-150, 150)) for i in range(n_settlements)}
+    fids = [f"faction-{i}" for i in range(n_factions)]
+    start = time.perf_counter()
+    graph = FactionGraph(fids, coords)
+    for a in fids:
+        for b in rng.sample(fids, 4):
+            if a != b:
+                graph.set_relationship(a, b, rng.choice(list(RELATION_WEIGHTS)))
+        for sid in rng.sample(list(coords), 3):
+            graph.set_seed(a, sid, 1.0)
+    built = time.perf_counter() - start
+
+    start = time.perf_counter()
+    graph.conflicts()
+    graph.influence_matrix()
+    full = time.perf_counter() - start
+
+    start = time.perf_counter()
+    graph.set_relationship(fids[0], fids[1], "war")
+    graph.set_seed(fids[2], "settlement-0", 1.0)
+    graph.conflicts()
+    graph.influence_matrix()
+    incremental = time.perf_counter() - start
+    print(f"Bench {n_factions} factions x {n_settlements} settlements: build {built * 1000:.0f} ms, "
+          f"full recompute {full * 1000:.0f} ms, one-edge + one-seed update {incremental * 1000:.0f} ms")
+
+
+def main():
+    args = sys.argv[1:]
+    bench = "--bench" in args
+    if bench:
+        args.remove("--bench")
+    out_path = None
+    if "--write" in args:
+        i = args.index("--write")
+        out_path = Path(args[i + 1])
+        del args[i:i + 2]
+    world_path = Path(args[0]) if args else DEFAULT_WORLD
+    with open(world_path) as f:
+        world = json.load(f)
+
+    graph = FactionGraph.from_world(world)
+    names = {f["id"]: f["name"] for f in world.get("factions", [])}
+    names.update({l["id"]: l["name"] for l in world.get("locations", [])})
+
+    print("Alliance blocs:")
+    for bloc in graph.alliance_blocs():
+        print(f"  {', '.join(names[f] for f in bloc)}")
+    print("\nConflicts:")
+    for a, b, s in graph.conflicts():
+        print(f"  {s:+.2f}  {names[a]} / {names[b]}")
+    print("\nContested settlements:")
+    for sid, pairs in graph.contested().items():
+        print(f"  {names[sid]}: " + "; ".join(f"{names[a]} vs {names[b]}" for a, b in pairs))
+
+    if bench:
+        print()
+        _bench()
+
+    if out_path:
+        graph.write_relationships(world)
+        graph.write_influence(world)
+        with open(out_path, "w") as f:
+            json.dump(world, f, indent=2)
+        print(f"\nWrote relationships and influenceIds: {out_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -13,16 +13,26 @@ Fixes:
 
 import json
 import random
-import string
 
-def gen_id(prefix):
-    chars = string.ascii_letters + string.digits + "_-"
-    return f"{prefix}-{''.join(random.choices(chars, k=8))}"
+from id_alloc import IdAllocator, duplicate_ids
+from name_resolver import NameResolver
+from rng_streams import entity_rng
+from templates import compile_templates
+
+def gen_id(prefix, rng=random):
+    return id_allocator.allocate(prefix, rng)
 
 # Load data
 with open("obojima_final.hexbinder.json") as f:
     data = json.load(f)
 
+# FIX 4-6 draw from per-settlement streams so each settlement's notices,
+# rumors and secrets are reproducible on their own.
+WORLD_SEED = data.get("seed", "")
+
+# Every new id is checked against all ids already in the world.
+id_allocator = IdAllocator.from_world(data)
+
 # ========================================
 # Build lookup maps
 # ========================================
@@ -119,9 +129,10 @@ def make_faction(fid, name, desc, archetype, ftype, purpose, scale,
         "status": "active"
     }
 
-# Settlement name → ID mapping
-sname_to_id = {s["name"]: s["id"] for s in settlements}
-dname_to_id = {d["name"]: d["id"] for d in dungeons}
+# Settlement name → ID mapping (misses print near-miss suggestions)
+resolver = NameResolver.from_world(data)
+sname_to_id = resolver.lookup("settlement")
+dname_to_id = resolver.lookup("dungeon")
 
 new_factions = [
     make_faction(
@@ -449,15 +460,15 @@ for faction in data["factions"]:
 # ========================================
 print("\nFIX 4: Regenerating notices...")
 
-notice_templates_request = [
+notice_templates_request = compile_templates([
     "INFORMATION WANTED: Reports needed regarding strange activity in {region}. Rewards for credible leads. Contact {faction}.",
     "SKILLED HELP NEEDED: {faction} seeks specialists for work in {region}. Generous compensation guaranteed.",
     "ADVENTURERS WANTED: {faction} seeks capable individuals for an important task. Inquire at {site}.",
     "BOUNTY POSTED: {faction} offers {reward} for information about threats in {region}.",
     "NOTICE: {faction} requests volunteers for community protection efforts. See representatives at {site}.",
-]
+], slots=("faction", "region", "site", "reward"))
 
-notice_templates_job = [
+notice_templates_job = compile_templates([
     "{npc} needs help clearing creatures from their {place}",
     "{npc} seeks a guide through the {region}",
     "{npc} requires an escort to {destination}",
@@ -468,7 +479,7 @@ notice_templates_job = [
     "{npc} is offering work at {site} — inquire within",
     "{npc} seeks adventurers for a salvage expedition",
     "{npc} has a pest problem and needs capable exterminators",
-]
+], slots=("npc", "region", "destination", "place", "site"))
 
 regions = ["Gift of Shuritashi", "Land of Hot Water", "Mount Arbora", "Gale Fields",
            "Brackwater Wetlands", "Coastal Highlands", "The Shallows"]
@@ -478,20 +489,21 @@ destinations = ["Okiri", "Matango", "Tidewater", "Yatamon", "Uluwa", "Toggle",
                 "Hogstone Hot Springs", "Polewater Village"]
 
 for settlement in settlements:
+    rng = entity_rng(WORLD_SEED, settlement["id"], "notices")
     npc_ids = settlement.get("npcIds", [])
     settlement_sites = settlement.get("sites", [])
     new_notices = []
 
     # Faction notices (3-5)
-    for i in range(random.randint(3, 5)):
-        faction_name = random.choice(all_faction_names)
-        region = random.choice(regions)
+    for i in range(rng.randint(3, 5)):
+        faction_name = rng.choice(all_faction_names)
+        region = rng.choice(regions)
         site_name = settlement_sites[0]["name"] if settlement_sites else settlement["name"]
-        reward = f"{random.randint(20, 150)} gp"
-        template = random.choice(notice_templates_request)
-        desc = template.format(faction=faction_name, region=region, site=site_name, reward=reward)
+        reward = f"{rng.randint(20, 150)} gp"
+        template = rng.choice(notice_templates_request)
+        desc = template.render(faction=faction_name, region=region, site=site_name, reward=reward)
         new_notices.append({
-            "id": gen_id("notice"),
+            "id": gen_id("notice", rng),
             "title": desc.split(":")[0] if ":" in desc else "NOTICE",
             "description": desc,
             "noticeType": "request",
@@ -499,20 +511,20 @@ for settlement in settlements:
         })
 
     # NPC job notices (5-8)
-    for i in range(random.randint(5, 8)):
-        npc_name = npc_map.get(random.choice(npc_ids), {}).get("name", "A local resident") if npc_ids else "A local resident"
-        region = random.choice(regions)
-        dest = random.choice([d for d in destinations if d != settlement["name"]])
-        place = random.choice(places)
+    for i in range(rng.randint(5, 8)):
+        npc_name = npc_map.get(rng.choice(npc_ids), {}).get("name", "A local resident") if npc_ids else "A local resident"
+        region = rng.choice(regions)
+        dest = rng.choice([d for d in destinations if d != settlement["name"]])
+        place = rng.choice(places)
         site_name = settlement_sites[0]["name"] if settlement_sites else settlement["name"]
-        template = random.choice(notice_templates_job)
-        desc = template.format(npc=npc_name, region=region, destination=dest, place=place, site=site_name)
+        template = rng.choice(notice_templates_job)
+        desc = template.render(npc=npc_name, region=region, destination=dest, place=place, site=site_name)
         new_notices.append({
-            "id": gen_id("notice"),
+            "id": gen_id("notice", rng),
             "title": desc[:50] + ("..." if len(desc) > 50 else ""),
             "description": desc,
             "noticeType": "job",
-            "reward": f"{random.randint(10, 80)} gp"
+            "reward": f"{rng.randint(10, 80)} gp"
         })
 
     settlement["notices"] = new_notices
@@ -523,7 +535,7 @@ for settlement in settlements:
 # ========================================
 print("\nFIX 5: Regenerating rumors...")
 
-rumor_templates = [
+rumor_templates = compile_templates([
     "They say {npc} has been acting strangely lately",
     "Word around {settlement} is that {npc} knows more than they let on",
     "{npc} was seen heading toward {region} late at night",
@@ -539,9 +551,10 @@ rumor_templates = [
     "A nakudama elder warned that the old spirits are stirring",
     "Fishing boats have been coming back empty from the Shallows",
     "Someone carved strange symbols on the shrine near {region}",
-]
+], slots=("npc", "faction", "region", "settlement", "dest"))
 
 for settlement in settlements:
+    rng = entity_rng(WORLD_SEED, settlement["id"], "rumors")
     npc_ids = settlement.get("npcIds", [])
     new_rumors = []
 
@@ -549,28 +562,28 @@ for settlement in settlements:
     linked_hooks = [h for h in data["hooks"] if settlement["id"] in h.get("involvedLocationIds", [])]
     for hook in linked_hooks[:5]:
         new_rumors.append({
-            "id": gen_id("rumor"),
+            "id": gen_id("rumor", rng),
             "text": hook.get("rumor", "Something strange is happening"),
             "isTrue": True,
-            "source": random.choice(["tavern talk", "market gossip", "traveler's tale", "overheard conversation"]),
+            "source": rng.choice(["tavern talk", "market gossip", "traveler's tale", "overheard conversation"]),
             "linkedHookId": hook["id"],
             "targetLocationId": hook.get("targetLocationId")
         })
 
     # General rumors
     for i in range(max(3, 8 - len(new_rumors))):
-        npc_name = npc_map.get(random.choice(npc_ids), {}).get("name", "someone") if npc_ids else "someone"
-        template = random.choice(rumor_templates)
-        text = template.format(
-            npc=npc_name, faction=random.choice(all_faction_names),
-            region=random.choice(regions), settlement=settlement["name"],
-            dest=random.choice(destinations)
+        npc_name = npc_map.get(rng.choice(npc_ids), {}).get("name", "someone") if npc_ids else "someone"
+        template = rng.choice(rumor_templates)
+        text = template.render(
+            npc=npc_name, faction=rng.choice(all_faction_names),
+            region=rng.choice(regions), settlement=settlement["name"],
+            dest=rng.choice(destinations)
         )
         new_rumors.append({
-            "id": gen_id("rumor"),
+            "id": gen_id("rumor", rng),
             "text": text,
-            "isTrue": random.choice([True, True, False]),
-            "source": random.choice(["tavern talk", "market gossip", "traveler's tale", "overheard conversation", "drunken rambling"]),
+            "isTrue": rng.choice([True, True, False]),
+            "source": rng.choice(["tavern talk", "market gossip", "traveler's tale", "overheard conversation", "drunken rambling"]),
             "linkedHookId": None,
             "targetLocationId": None
         })
@@ -585,7 +598,7 @@ print("\nFIX 6: Fixing lore secrets...")
 
 settlement_site_ids = {s["id"]: [site["id"] for site in s.get("sites", [])] for s in settlements}
 
-obojima_secrets = [
+obojima_secrets = compile_templates([
     ("The {site} owner secretly communes with ocean spirits during the new moon", "major"),
     ("Ancient nakudama artifacts are hidden beneath {site}", "major"),
     ("The settlement's water source is slowly being corrupted by brackwater runoff", "major"),
@@ -598,32 +611,33 @@ obojima_secrets = [
     ("An old spirit trapped in a local shrine grants wishes — for a price", "major"),
     ("{npc} is actually a former member of the {faction} in hiding", "major"),
     ("The settlement was built on top of an ancient spirit's resting place", "major"),
-]
+], slots=("site", "npc", "faction"))
 
 for settlement in settlements:
+    rng = entity_rng(WORLD_SEED, settlement["id"], "secrets")
     site_ids = settlement_site_ids.get(settlement["id"], [])
     npc_ids = settlement.get("npcIds", [])
     if "lore" not in settlement:
         settlement["lore"] = {"history": {"founding": "", "founderType": "refugees", "age": "established", "majorEvents": []}, "secrets": []}
 
     new_secrets = []
-    for template, severity in random.sample(obojima_secrets, min(3, len(obojima_secrets))):
+    for template, severity in rng.sample(obojima_secrets, min(3, len(obojima_secrets))):
         involved_sites, involved_npcs = [], []
         site_name = "the local establishment"
         if site_ids:
-            chosen_site = random.choice(site_ids)
+            chosen_site = rng.choice(site_ids)
             site_obj = next((s for s in settlement["sites"] if s["id"] == chosen_site), None)
             if site_obj: site_name = site_obj["name"]
             involved_sites = [chosen_site]
         npc_name = "a local resident"
         if npc_ids:
-            chosen_npc = random.choice(npc_ids)
+            chosen_npc = rng.choice(npc_ids)
             npc_name = npc_map.get(chosen_npc, {}).get("name", "a local resident")
             involved_npcs = [chosen_npc]
-        faction_name = random.choice(all_faction_names)
+        faction_name = rng.choice(all_faction_names)
         new_secrets.append({
-            "id": gen_id("secret"),
-            "text": template.format(site=site_name, npc=npc_name, faction=faction_name),
+            "id": gen_id("secret", rng),
+            "text": template.render(site=site_name, npc=npc_name, faction=faction_name),
             "severity": severity,
             "discovered": False,
             "involvedSiteIds": involved_sites,
@@ -939,6 +953,11 @@ for s in settlements:
                 print(f"  ERR: Secret in {s['name']} → invalid NPC {nid}")
                 errors += 1
 
+# Duplicate ids
+for dup_id, count in duplicate_ids(data).items():
+    print(f"  ERR: id {dup_id} used {count} times")
+    errors += 1
+
 print(f"\nTotal errors: {errors}")
 
 # ========================================
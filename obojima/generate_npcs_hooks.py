@@ -2,12 +2,18 @@
 """Generate Obojima-themed NPCs and hooks, preserving original IDs."""
 
 import json
-import random
+
+from hex_nearest import nearest_settlement_map
+from hook_sources import assign_sources, build_candidate_pools
+from npc_bulk import make_npc
+from rng_streams import entity_rng
 
 # Load original data
 with open("/Users/dmccord/Projects/vibeCode/hexbinder/temp/obojima.hexbinder.json") as f:
     data = json.load(f)
 
+WORLD_SEED = data.get("seed", "")
+
 orig_npcs = data["npcs"]
 orig_hooks = data["hooks"]
 orig_locations = data["locations"]
@@ -28,27 +34,6 @@ for nids in settlement_npc_map.values():
 unattached = [n for n in orig_npcs if n["id"] not in all_settlement_npc_ids]
 
 
-def make_npc(npc_id, name, race, gender, desc, feature, archetype, threat, age, role, tags, location_id):
-    return {
-        "id": npc_id,
-        "name": name,
-        "race": race,
-        "gender": gender,
-        "description": desc,
-        "distinguishingFeature": feature,
-        "archetype": archetype,
-        "threatLevel": threat,
-        "age": age,
-        "role": role,
-        "relationships": [],
-        "flavorWant": "",
-        "wants": [],
-        "status": "alive",
-        "tags": tags,
-        "locationId": location_id,
-    }
-
-
 npcs = []
 
 # == Polewater Village (settlement-_N0PVVNb) == 9 NPCs ==
@@ -427,23 +412,17 @@ flavor_wants = [
     "Seeks the perfect mushroom specimen",
     "Wants to befriend a spirit",
 ]
-random.seed(42)
 for npc in npcs:
     if not npc["flavorWant"]:
-        npc["flavorWant"] = random.choice(flavor_wants)
+        npc["flavorWant"] = entity_rng(WORLD_SEED, npc["id"], "flavorWant").choice(flavor_wants)
 
 # Build NPC lookup
 npc_by_id = {n["id"]: n for n in npcs}
 
-# Settlement NPC ID lists for hook source assignment
-settlement_to_npc_ids = {}
-for npc in npcs:
-    loc = npc["locationId"]
-    if loc and loc.startswith("settlement-"):
-        settlement_to_npc_ids.setdefault(loc, []).append(npc["id"])
-
-# Closest settlement to each dungeon
-dungeon_to_nearest_settlement = {
+# Hook source settlement for each dungeon. The curated pairings follow the
+# lore rather than map distance, so they win; any dungeon they don't list
+# falls back to its nearest settlement by hex distance.
+DUNGEON_SETTLEMENT_OVERRIDES = {
     "dungeon-bqafTLDH": "settlement-_N0PVVNb",
     "dungeon-YN2lLblj": "settlement-CbSD55DO",
     "dungeon-yIL6pItd": "settlement-HmoL5chU",
@@ -456,17 +435,18 @@ dungeon_to_nearest_settlement = {
     "dungeon-ic32fqpx": "settlement-qaroUeGg",
     "dungeon-qooARykv": "settlement-_N0PVVNb",
 }
+dungeon_to_nearest_settlement = {
+    **nearest_settlement_map(data, kinds=("dungeon",)),
+    **DUNGEON_SETTLEMENT_OVERRIDES,
+}
 
-
-def get_source_npc(target_loc_id):
-    if target_loc_id and target_loc_id.startswith("settlement-"):
-        candidates = settlement_to_npc_ids.get(target_loc_id, [])
-    elif target_loc_id and target_loc_id.startswith("dungeon-"):
-        nearest = dungeon_to_nearest_settlement.get(target_loc_id, "settlement-HmoL5chU")
-        candidates = settlement_to_npc_ids.get(nearest, [])
-    else:
-        candidates = settlement_to_npc_ids.get("settlement-HmoL5chU", [])
-    return random.choice(candidates) if candidates else npcs[0]["id"]
+# Every settlement gets a pool, even an empty one, so a settlement with no
+# NPCs falls back to npcs[0] below (as get_source_npc did) rather than
+# borrowing a Yatamon resident.
+source_pools = build_candidate_pools(
+    npcs, dungeon_to_nearest_settlement,
+    [l["id"] for l in data["locations"] if l.get("type") == "settlement"],
+)
 
 
 # == Generate Hooks ==
@@ -655,11 +635,13 @@ for hook_type, templates in hook_templates.items():
         t["type"] = hook_type
         all_templates.append(t)
 
-random.seed(123)
+hook_targets = [all_templates[i % len(all_templates)]["target"] for i in range(len(hook_ids))]
+hook_rng = entity_rng(WORLD_SEED, "hooks", "sourceNpcId")
+hook_sources = assign_sources(hook_targets, source_pools, hook_rng, fallback="settlement-HmoL5chU")
 for i, hook_id in enumerate(hook_ids):
     template = all_templates[i % len(all_templates)]
     target = template["target"]
-    source_npc = get_source_npc(target)
+    source_npc = hook_sources[i] or npcs[0]["id"]
 
     missing_npc = template.get("missing_npc", None)
 
@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""
+Dense axial hex grid for whole-map terrain work.
+
+world["hexes"] is a list of dicts. HexGrid stores the same hexes in flat
+arrays over the bounding box of their axial coordinates, with a margin of
+empty cells:
+
+    index(q, r) = (r - r0) * width + (q - q0)
+
+  terrain   bytearray of codes into TERRAINS (0 = no hex)
+  location  array("i") of indexes into location_ids (-1 = none)
+  flags     bytearray of per-hex bit flags (FLAG_* constants)
+  extra     {index: other hex fields}, e.g. description, kept for round trips
+
+Whole-grid operations work on bitmasks: Python ints with bit i set for
+cell i. Stepping every cell one hex in a direction is then a single shift
+by that direction's index delta, and set algebra is &, |, ^. mask(),
+dilate(), neighbor_count_at_least() and fill() all run at C speed over
+the whole grid. A one-cell margin keeps shifts from wrapping across rows.
+
+Geometry follows src/lib/hex-utils.ts and generate-preview.mjs:
+pointy-top, x = size * sqrt(3) * (q + r/2), y = size * 1.5 * r.
+
+    grid = HexGrid.from_world(data)
+    water = grid.mask({"water"})
+    coast = grid.dilate(water) & grid.mask_land()
+    grid.fill(grid.neighbor_count_at_least(grid.mask({"forest"}), 3) & grid.mask({"plains"}), "forest")
+    data["hexes"] = grid.to_hexes()
+
+Usage: python3 hex_grid.py [world.hexbinder.json] [--bench RADIUS]
+"""
+
+import json
+import math
+import sys
+import time
+from array import array
+from pathlib import Path
+
+BASE = Path(__file__).parent
+DEFAULT_WORLD = BASE / "obojima_final.hexbinder.json"
+
+AXIAL_DIRECTIONS = [(1, 0), (1, -1), (0, -1), (-1, 0), (-1, 1), (0, 1)]
+
+TERRAINS = ["", "plains", "hills", "forest", "desert", "swamp", "mountains", "water"]
+
+FLAG_VISITED = 1
+FLAG_EDITED = 2
+
+SQRT3 = math.sqrt(3)
+
+
+# -- Coordinates -------------------------------------------------------------
+
+def hex_distance(a, b):
+    dq = a[0] - b[0]
+    dr = a[1] - b[1]
+    return max(abs(dq), abs(dr), abs(dq + dr))
+
+
+def axial_to_pixel(q, r, size=1.0):
+    return size * SQRT3 * (q + r / 2), size * 1.5 * r
+
+
+def axial_round(q, r):
+    x, z = q, r
+    y = -x - z
+    rx, ry, rz = round(x), round(y), round(z)
+    dx, dy, dz = abs(rx - x), abs(ry - y), abs(rz - z)
+    if dx > dy and dx > dz:
+        rx = -ry - rz
+    elif dy > dz:
+        ry = -rx - rz
+    else:
+        rz = -rx - ry
+    return int(rx), int(rz)
+
+
+def pixel_to_axial(x, y, size=1.0):
+    q = (SQRT3 / 3 * x - y / 3) / size
+    r = (2 / 3 * y) / size
+    return axial_round(q, r)
+
+
+def ring(center, radius):
+    """Hexes exactly radius steps from center, walking the ring in order."""
+    if radius == 0:
+        yield tuple(center)
+        return
+    q = center[0] + AXIAL_DIRECTIONS[4][0] * radius
+    r = center[1] + AXIAL_DIRECTIONS[4][1] * radius
+    for dq, dr in AXIAL_DIRECTIONS:
+        for _ in range(radius):
+            yield q, r
+            q += dq
+            r += dr
+
+
+def spiral(center, radius):
+    """center, then ring 1, ring 2 ... ring radius."""
+    for k in range(radius + 1):
+        yield from ring(center, k)
+
+
+def _qr(coord):
+    return (coord["q"], coord["r"]) if isinstance(coord, dict) else tuple(coord)
+
+
+# -- Grid --------------------------------------------------------------------
+
+class HexGrid:
+    def __init__(self, q_min, q_max, r_min, r_max, margin=1):
+        margin = max(1, margin)
+        self.q0 = q_min - margin
+        self.r0 = r_min - margin
+        self.width = q_max - q_min + 1 + 2 * margin
+        self.height = r_max - r_min + 1 + 2 * margin
+        self.size = self.width * self.height
+        self.terrain = bytearray(self.size)
+        self.location = array("i", [-1]) * self.size
+        self.flags = bytearray(self.size)
+        self.extra = {}
+        self.location_ids = []
+        self._location_index = {}
+        self.terrains = list(TERRAINS)
+        self._codes = {t: i for i, t in enumerate(self.terrains)}
+        self.deltas = [dr * self.width + dq for dq, dr in AXIAL_DIRECTIONS]
+        row = "0" + "1" * (self.width - 2) + "0"
+        edge = "0" * self.width
+        self.interior = _bits_from_str(edge + row * (self.height - 2) + edge)
+        self.all = (1 << self.size) - 1
+
+    # -- Construction and round trip -----------------------------------------
+
+    @classmethod
+    def from_hexes(cls, hexes, margin=1):
+        coords = [_qr(h["coord"]) for h in hexes]
+        if not coords:
+            return cls(0, 0, 0, 0, margin)
+        qs = [c[0] for c in coords]
+        rs = [c[1] for c in coords]
+        grid = cls(min(qs), max(qs), min(rs), max(rs), margin)
+        for h, (q, r) in zip(hexes, coords):
+            i = grid.index(q, r)
+            grid.terrain[i] = grid.code(h.get("terrain") or "plains")
+            if h.get("locationId"):
+                grid.location[i] = grid._location(h["locationId"])
+            rest = {k: v for k, v in h.items() if k not in ("coord", "terrain", "locationId")}
+            if rest:
+                grid.extra[i] = rest
+        return grid
+
+    @classmethod
+    def from_world(cls, world, margin=1):
+        grid = cls.from_hexes(world.get("hexes", []), margin)
+        visited = world.get("state", {}).get("visitedHexIds", [])
+        for hex_id in visited:
+            q, r = (int(p) for p in hex_id.split(","))
+            if grid.in_bounds(q, r):
+                grid.flags[grid.index(q, r)] |= FLAG_VISITED
+        return grid
+
+    def to_hexes(self):
+        """Hexes in world["hexes"] format, row by row."""
+        out = []
+        terrains = self.terrains
+        for i in self.indices(self.present()):
+            q, r = self.coord(i)
+            h = {"coord": {"q": q, "r": r}, "terrain": terrains[self.terrain[i]]}
+            if self.location[i] >= 0:
+                h["locationId"] = self.location_ids[self.location[i]]
+            h.update(self.extra.get(i, {}))
+            out.append(h)
+        return out
+
+    def expand(self, margin):
+        """Copy of the grid with at least `margin` empty cells around its current box."""
+        grid = HexGrid(self.q0 + 1, self.q0 + self.width - 2, self.r0 + 1, self.r0 + self.height - 2, margin)
+        grid.terrains = list(self.terrains)
+        grid._codes = dict(self._codes)
+        grid.location_ids = list(self.location_ids)
+        grid._location_index = dict(self._location_index)
+        shift = (self.r0 - grid.r0) * grid.width + (self.q0 - grid.q0)
+        w = self.width
+        for row in range(self.height):
+            src = row * w
+            dst = src + shift + row * (grid.width - w)
+            grid.terrain[dst:dst + w] = self.terrain[src:src + w]
+            grid.location[dst:dst + w] = self.location[src:src + w]
+            grid.flags[dst:dst + w] = self.flags[src:src + w]
+        for i, rest in self.extra.items():
+            grid.extra[grid.index(*self.coord(i))] = rest
+        return grid
+
+    def _location(self, location_id):
+        idx = self._location_index.get(location_id)
+        if idx is None:
+            idx = self._location_index[location_id] = len(self.location_ids)
+            self.location_ids.append(location_id)
+        return idx
+
+    def code(self, terrain):
+        c = self._codes.get(terrain)
+        if c is None:
+            if len(self.terrains) >= 256:
+                raise ValueError("too many terrain types")
+            c = self._codes[terrain] = len(self.terrains)
+            self.terrains.append(terrain)
+        return c
+
+    # -- Cell access ----------------------------------------------------------
+
+    def in_bounds(self, q, r):
+        return 0 < q - self.q0 < self.width - 1 and 0 < r - self.r0 < self.height - 1
+
+    def index(self, q, r):
+        if not self.in_bounds(q, r):
+            raise IndexError(f"hex ({q}, {r}) is outside the grid")
+        return (r - self.r0) * self.width + (q - self.q0)
+
+    def coord(self, i):
+        r, q = divmod(i, self.width)
+        return q + self.q0, r + self.r0
+
+    def get(self, q, r):
+        if not self.in_bounds(q, r):
+            return None
+        return self.terrains[self.terrain[self.index(q, r)]] or None
+
+    def set(self, q, r, terrain):
+        i = self.index(q, r)
+        self.terrain[i] = self.code(terrain)
+        self.flags[i] |= FLAG_EDITED
+
+    def neighbors(self, q, r):
+        return [(q + dq, r + dr) for dq, dr in AXIAL_DIRECTIONS]
+
+    def gather(self, direction):
+        """Terrain code of every cell's neighbor in one direction, as bytes.
+
+        out[i] == terrain[i + delta]; cells whose neighbor falls off the
+        array read 0.
+        """
+        d = self.deltas[direction]
+        t = bytes(self.terrain)
+        if d >= 0:
+            return t[d:] + bytes(d)
+        return bytes(-d) + t[:d]
+
+    # -- Bitmasks -------------------------------------------------------------
+
+    def mask(self, terrains):
+        """Bitmask of cells whose terrain is in terrains."""
+        codes = {self._codes[t] for t in terrains if t in self._codes}
+        table = bytes(b"1"[0] if c in codes else b"0"[0] for c in range(256))
+        return _bits_from_str(self.terrain.translate(table).decode())
+
+    def present(self):
+        """Bitmask of cells that hold a hex."""
+        table = b"0" + b"1" * 255
+        return _bits_from_str(self.terrain.translate(table).decode())
+
+    def mask_land(self):
+        return self.present() & ~self.mask({"water"}) & self.all
+
+    def flag_mask(self, flag):
+        table = bytes(b"1"[0] if c & flag else b"0"[0] for c in range(256))
+        return _bits_from_str(self.flags.translate(table).decode())
+
+    def shift(self, mask, direction):
+        """Cells one step from mask in direction."""
+        d = self.deltas[direction]
+        moved = mask << d if d >= 0 else mask >> -d
+        return moved & self.interior
+
+    def dilate(self, mask, steps=1):
+        """mask plus every cell within steps hexes of it."""
+        for _ in range(steps):
+            grown = mask
+            for d in range(6):
+                grown |= self.shift(mask, d)
+            mask = grown
+        return mask
+
+    def neighbor_counts(self, mask):
+        """Bit-sliced count (0-6) of mask neighbors per cell: (ones, twos, fours)."""
+        b0 = b1 = b2 = 0
+        for d in range(6):
+            x = self.shift(mask, d)
+            c0 = b0 & x
+            b0 ^= x
+            c1 = b1 & c0
+            b1 ^= c0
+            b2 |= c1
+        return b0, b1, b2
+
+    def neighbor_count_at_least(self, mask, k):
+        """Cells with at least k of their six neighbors in mask."""
+        b0, b1, b2 = self.neighbor_counts(mask)
+        if k <= 0:
+            return self.interior
+        if k == 1:
+            return b0 | b1 | b2
+        if k == 2:
+            return b1 | b2
+        if k == 3:
+            return b2 | (b1 & b0)
+        if k == 4:
+            return b2
+        if k == 5:
+            return b2 & (b0 | b1)
+        if k == 6:
+            return b2 & b1
+        return 0
+
+    def count(self, mask):
+        return mask.bit_count()
+
+    def indices(self, mask):
+        """Cell indices of set bits, ascending."""
+        s = format(mask, "b")[::-1]
+        find = s.find
+        i = find("1")
+        while i >= 0:
+            yield i
+            i = find("1", i + 1)
+
+    def coords(self, mask):
+        return [self.coord(i) for i in self.indices(mask)]
+
+    def mask_of(self, coords):
+        m = 0
+        for q, r in coords:
+            if self.in_bounds(q, r):
+                m |= 1 << self.index(q, r)
+        return m
+
+    def fill(self, mask, terrain):
+        """Set terrain for every cell in mask, as whole-array integer ops."""
+        mask &= self.interior
+        if not mask:
+            return
+        n = self.size
+        sel = format(mask, f"0{n}b")[::-1].encode().translate(_SELECT_TABLE)
+        m = int.from_bytes(sel, "little")
+        t = int.from_bytes(self.terrain, "little")
+        c = int.from_bytes(bytes([self.code(terrain)]) * n, "little")
+        full = (1 << (8 * n)) - 1
+        self.terrain = bytearray(((t & (full ^ m)) | (c & m)).to_bytes(n, "little"))
+        f = int.from_bytes(self.flags, "little")
+        e = int.from_bytes(bytes([FLAG_EDITED]) * n, "little")
+        self.flags = bytearray((f | (e & m)).to_bytes(n, "little"))
+
+
+_SELECT_TABLE = bytes(0xFF if c == ord("1") else 0 for c in range(256))
+
+
+def _bits_from_str(cells):
+    """Bitmask from a per-cell '0'/'1' string (cell 0 first)."""
+    return int(cells[::-1], 2) if cells else 0
+
+
+def _bench(radius):
+    hexes = [{"coord": {"q": q, "r": r}, "terrain": "plains" if (q * 7 + r * 13) % 5 else "forest"}
+             for q, r in spiral((0, 0), radius)]
+    start = time.perf_counter()
+    grid = HexGrid.from_hexes(hexes)
+    built = time.perf_counter() - start
+    start = time.perf_counter()
+    forest = grid.mask({"forest"})
+    grow = grid.neighbor_count_at_least(forest, 2) & grid.mask({"plains"})
+    grid.fill(grow, "forest")
+    rule = time.perf_counter() - start
+    print(f"Bench: {len(hexes):,} hexes, build {built * 1000:.0f} ms, "
+          f"forest-growth rule {rule * 1000:.0f} ms ({grid.count(grow):,} hexes changed)")
+
+
+def main():
+    args = sys.argv[1:]
+    bench = None
+    if "--bench" in args:
+        i = args.index("--bench")
+        bench = int(args[i + 1])
+        del args[i:i + 2]
+    world_path = Path(args[0]) if args else DEFAULT_WORLD
+    with open(world_path) as f:
+        world = json.load(f)
+
+    grid = HexGrid.from_world(world)
+    print(f"Grid {grid.width}x{grid.height} for {grid.count(grid.present())} hexes")
+    land = grid.mask_land()
+    coast = land & grid.dilate(grid.mask({"water"}) | (grid.interior & ~grid.present()))
+    print(f"  land {grid.count(land)}, coastal land {grid.count(coast)}")
+    print(f"  round trip identical: {grid.to_hexes() == sorted(world['hexes'], key=lambda h: (h['coord']['r'], h['coord']['q']))}")
+    print(f"  ring 1 around (0,0): {list(ring((0, 0), 1))}")
+    print(f"  (2,-1) -> pixel {axial_to_pixel(2, -1)} -> {pixel_to_axial(*axial_to_pixel(2, -1))}")
+    if bench:
+        _bench(bench)
+
+
+if __name__ == "__main__":
+    main()
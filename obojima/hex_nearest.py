@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Nearest-settlement lookup over axial hex coordinates.
+
+Two distance modes:
+  straight  hex distance between hexCoords. Settlements are bucketed on a
+            coarse axial grid and each query searches outward bucket ring by
+            bucket ring, so a lookup touches only nearby settlements.
+  travel    movement cost over the hex map: entering a hex costs its terrain
+            cost (TERRAIN_COSTS, same values as src/lib/hex-utils.ts) and
+            world edges act as shortcuts priced per hex of length. One
+            multi-source Dijkstra labels every hex with its k cheapest
+            settlements, so every location is answered in a single pass.
+
+    nearest_settlement_map(world)                -> {location_id: settlement_id}
+    SettlementLocator(world).nearest(coord, k=3) -> [(distance, settlement_id), ...]
+
+Usage: python3 hex_nearest.py [world.hexbinder.json] [--travel] [--k N]
+"""
+
+import heapq
+import json
+import math
+import sys
+import time
+from pathlib import Path
+
+BASE = Path(__file__).parent
+DEFAULT_WORLD = BASE / "obojima_final.hexbinder.json"
+
+AXIAL_DIRECTIONS = [(1, 0), (1, -1), (0, -1), (-1, 0), (-1, 1), (0, 1)]
+
+TERRAIN_COSTS = {
+    "plains": 1,
+    "hills": 2,
+    "forest": 3,
+    "desert": 3,
+    "swamp": 4,
+    "mountains": math.inf,
+    "water": math.inf,
+}
+
+# Cost per hex of edge length when travelling along a world edge.
+EDGE_COSTS = {"road": 0.5, "river": 0.75}
+
+
+def hex_distance(a, b):
+    dq = a[0] - b[0]
+    dr = a[1] - b[1]
+    return max(abs(dq), abs(dr), abs(dq + dr))
+
+
+def _qr(coord):
+    return (coord["q"], coord["r"]) if isinstance(coord, dict) else tuple(coord)
+
+
+class SettlementLocator:
+    def __init__(self, world, bucket_size=8):
+        self.bucket_size = bucket_size
+        self.settlements = [
+            (loc["id"], _qr(loc["hexCoord"]))
+            for loc in world.get("locations", [])
+            if loc.get("type") == "settlement" and loc.get("hexCoord")
+        ]
+        self.buckets = {}
+        for sid, qr in self.settlements:
+            self.buckets.setdefault(self._bucket(qr), []).append((sid, qr))
+        if self.buckets:
+            bqs = [b[0] for b in self.buckets]
+            brs = [b[1] for b in self.buckets]
+            self._bucket_bounds = (min(bqs), max(bqs), min(brs), max(brs))
+        self.world = world
+
+    def _bucket(self, qr):
+        return (qr[0] // self.bucket_size, qr[1] // self.bucket_size)
+
+    def nearest(self, coord, k=1):
+        """k nearest settlements by hex distance: [(distance, id), ...]."""
+        if not self.settlements:
+            return []
+        qr = _qr(coord)
+        bq, br = self._bucket(qr)
+        q0, q1, r0, r1 = self._bucket_bounds
+        max_ring = max(abs(bq - q0), abs(bq - q1), abs(br - r0), abs(br - r1))
+        found = []
+        ring = 0
+        while ring <= max_ring:
+            for key in _square_ring(bq, br, ring):
+                for sid, sqr in self.buckets.get(key, ()):
+                    found.append((hex_distance(qr, sqr), sid))
+            found.sort()
+            # A settlement outside this ring of buckets differs from the query
+            # by at least ring * bucket_size in q or r, and hex distance is at
+            # least max(|dq|, |dr|).
+            if len(found) >= k and found[k - 1][0] <= ring * self.bucket_size:
+                break
+            ring += 1
+        return found[:k]
+
+    def nearest_by_travel(self, k=1, edge_costs=EDGE_COSTS, terrain_costs=TERRAIN_COSTS):
+        """{(q, r): [(cost, id), ...]} for every reachable hex, in one pass."""
+        terrain = {_qr(h["coord"]): h.get("terrain") for h in self.world.get("hexes", [])}
+        links = {}
+        for edge in self.world.get("edges", []):
+            per_hex = edge_costs.get(edge.get("type"))
+            if per_hex is None:
+                continue
+            a, b = _qr(edge["from"]), _qr(edge["to"])
+            cost = per_hex * max(1, hex_distance(a, b))
+            links.setdefault(a, []).append((b, cost))
+            links.setdefault(b, []).append((a, cost))
+
+        # Step cost into each passable hex, precomputed once.
+        enter = {}
+        for qr, t in terrain.items():
+            step = terrain_costs.get(t, math.inf)
+            if step != math.inf:
+                enter[qr] = step
+
+        labels = {}
+        settled = set()  # (hex, settlement) pairs already labelled
+        # Same passability rules as travel_planner.TravelGraph: a settlement on
+        # an impassable hex goes nowhere, and links only lead into passable hexes.
+        heap = [(0.0, qr, sid) for sid, qr in self.settlements if qr in enter]
+        heapq.heapify(heap)
+        push = heapq.heappush
+        pop = heapq.heappop
+        while heap:
+            cost, node, sid = pop(heap)
+            if (node, sid) in settled:
+                continue
+            node_labels = labels.get(node)
+            if node_labels is None:
+                node_labels = labels[node] = []
+            elif len(node_labels) >= k:
+                continue
+            node_labels.append((cost, sid))
+            settled.add((node, sid))
+            q, r = node
+            for dq, dr in AXIAL_DIRECTIONS:
+                nb = (q + dq, r + dr)
+                step = enter.get(nb)
+                if step is None or (nb, sid) in settled:
+                    continue
+                nb_labels = labels.get(nb)
+                if nb_labels is None or len(nb_labels) < k:
+                    push(heap, (cost + step, nb, sid))
+            for nb, step in links.get(node, ()):
+                if nb in enter and (nb, sid) not in settled:
+                    push(heap, (cost + step, nb, sid))
+        return labels
+
+    def nearest_for_locations(self, k=1, travel=False, kinds=None):
+        """{location_id: [(distance, settlement_id), ...]} for every location.
+
+        In travel mode, locations the road/terrain graph can't reach (islands,
+        underwater sites) fall back to straight-line distance.
+        """
+        labels = self.nearest_by_travel(k) if travel else None
+        out = {}
+        for loc in self.world.get("locations", []):
+            if not loc.get("hexCoord") or (kinds and loc.get("type") not in kinds):
+                continue
+            qr = _qr(loc["hexCoord"])
+            result = labels.get(qr) if labels is not None else None
+            out[loc["id"]] = result or self.nearest(qr, k)
+        return out
+
+
+def _square_ring(cq, cr, ring):
+    if ring == 0:
+        yield (cq, cr)
+        return
+    for d in range(-ring, ring + 1):
+        yield (cq + d, cr - ring)
+        yield (cq + d, cr + ring)
+    for d in range(-ring + 1, ring):
+        yield (cq - ring, cr + d)
+        yield (cq + ring, cr + d)
+
+
+def nearest_settlement_map(world, kinds=("dungeon",), travel=False):
+    """{location_id: nearest settlement_id} for locations of the given types."""
+    locator = SettlementLocator(world)
+    found = locator.nearest_for_locations(k=1, travel=travel, kinds=kinds)
+    return {loc_id: hits[0][1] for loc_id, hits in found.items() if hits}
+
+
+def main():
+    args = sys.argv[1:]
+    travel = "--travel" in args
+    if travel:
+        args.remove("--travel")
+    k = 1
+    if "--k" in args:
+        i = args.index("--k")
+        k = int(args[i + 1])
+        del args[i:i + 2]
+    world_path = Path(args[0]) if args else DEFAULT_WORLD
+    with open(world_path) as f:
+        world = json.load(f)
+
+    start = time.perf_counter()
+    locator = SettlementLocator(world)
+    result = locator.nearest_for_locations(k=k, travel=travel, kinds=("dungeon",))
+    elapsed = time.perf_counter() - start
+
+    names = {l["id"]: l["name"] for l in world["locations"]}
+    mode = "travel cost" if travel else "hex distance"
+    print(f"Nearest settlements by {mode} for {len(result)} dungeons in {elapsed * 1000:.1f} ms")
+    for loc_id, hits in result.items():
+        near = ", ".join(f"{names.get(sid, sid)} ({d:g})" for d, sid in hits)
+        print(f"  {names.get(loc_id, loc_id)}: {near}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Batch assignment of hook source NPCs.
+
+A hook's source NPC is drawn from the pool of NPCs living at its target
+settlement, or, for dungeon targets, at the settlement nearest the dungeon.
+Pools are built once per target. Hooks are grouped by target, and each group
+gets its sources in one draw: a single random.choices(k=len(group)) call, or
+with balancing, a per-NPC quota fill that keeps any one NPC from sourcing
+more than max_per_npc hooks.
+
+    pools = build_candidate_pools(npcs, nearest_settlement, settlement_ids)
+    sources = assign_sources(targets, pools, rng, fallback="settlement-HmoL5chU")
+
+Usage: python3 hook_sources.py [world.hexbinder.json] [--max-per-npc N]
+"""
+
+import json
+import random
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+BASE = Path(__file__).parent
+DEFAULT_WORLD = BASE / "obojima_final.hexbinder.json"
+
+
+def build_candidate_pools(npcs, nearest_settlement=None, settlement_ids=()):
+    """{location_id: [npc ids]} for settlements and the dungeons near them.
+
+    nearest_settlement maps non-settlement location ids (dungeons) to the
+    settlement whose residents should source their hooks. Settlements in
+    settlement_ids get a pool even with no residents; an empty pool leaves
+    its hooks unassigned instead of sending them to the fallback.
+    """
+    pools = {sid: [] for sid in settlement_ids}
+    for npc in npcs:
+        loc = npc.get("locationId")
+        if loc and loc.startswith("settlement-"):
+            pools.setdefault(loc, []).append(npc["id"])
+    for loc_id, settlement_id in (nearest_settlement or {}).items():
+        if settlement_id in pools and loc_id not in pools:
+            pools[loc_id] = pools[settlement_id]
+    return pools
+
+
+def _quota_fill(k, pool, load, cap, rng):
+    """Spread k assignments over pool, levelling load and respecting cap.
+
+    Returns (sources, unplaced). Work is per NPC, not per hook: find the
+    lowest water level L such that topping every NPC up to min(L, cap)
+    places k hooks, then trim the overshoot at random.
+    """
+    loads = [load[n] for n in pool]
+
+    def placed(level):
+        top = min(level, cap)
+        return sum(top - l for l in loads if l < top)
+
+    lo, hi = min(loads), cap
+    if placed(hi) < k:
+        level = hi
+    else:
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if placed(mid) >= k:
+                hi = mid
+            else:
+                lo = mid + 1
+        level = lo
+
+    top = min(level, cap)
+    grants = {n: top - l for n, l in zip(pool, loads) if l < top}
+    overshoot = sum(grants.values()) - k
+    if overshoot > 0:
+        # Only NPCs filled to the top level can give back a slot.
+        at_top = [n for n in grants if load[n] + grants[n] == top]
+        for n in rng.sample(at_top, overshoot):
+            grants[n] -= 1
+
+    sources = [n for n, g in grants.items() for _ in range(g)]
+    rng.shuffle(sources)
+    return sources, k - len(sources)
+
+
+def assign_sources(targets, pools, rng=None, fallback=None, max_per_npc=None):
+    """Source NPC id for each target location id, in input order.
+
+    Targets without a pool use the fallback settlement's pool. Targets
+    with an empty pool get None: a settlement with no NPCs is not given a
+    source from another settlement, and the caller picks one. With
+    max_per_npc set, hooks that cannot fit under the cap spill into the
+    fallback pool, and anything still unplaced ignores the cap.
+    """
+    rng = rng or random.Random()
+    fallback_pool = pools.get(fallback, [])
+
+    groups = {}
+    for i, target in enumerate(targets):
+        key = target if target in pools else None
+        groups.setdefault(key, []).append(i)
+
+    result = [None] * len(targets)
+    load = Counter()
+    for key, positions in groups.items():
+        pool = pools[key] if key is not None else fallback_pool
+        if not pool:
+            continue
+        k = len(positions)
+        if max_per_npc is None:
+            sources = rng.choices(pool, k=k)
+        else:
+            sources, short = _quota_fill(k, pool, load, max_per_npc, rng)
+            if short and pool is not fallback_pool and fallback_pool:
+                extra, short = _quota_fill(short, fallback_pool, load + Counter(sources), max_per_npc, rng)
+                sources += extra
+            if short:
+                sources += rng.choices(pool, k=short)
+            load.update(sources)
+        for pos, src in zip(positions, sources):
+            result[pos] = src
+    return result
+
+
+def main():
+    args = sys.argv[1:]
+    cap = None
+    if "--max-per-npc" in args:
+        i = args.index("--max-per-npc")
+        cap = int(args[i + 1])
+        del args[i:i + 2]
+    world_path = Path(args[0]) if args else DEFAULT_WORLD
+    with open(world_path) as f:
+        world = json.load(f)
+
+    # Keep each dungeon's current source settlement as its "nearest".
+    npc_loc = {n["id"]: n.get("locationId") for n in world["npcs"]}
+    nearest = {}
+    for h in world["hooks"]:
+        target = h.get("targetLocationId") or ""
+        src_loc = npc_loc.get(h.get("sourceNpcId"))
+        if target.startswith("dungeon-") and src_loc:
+            nearest.setdefault(target, src_loc)
+
+    settlement_ids = [l["id"] for l in world["locations"] if l.get("type") == "settlement"]
+    pools = build_candidate_pools(world["npcs"], nearest, settlement_ids)
+    targets = [h.get("targetLocationId") for h in world["hooks"]]
+
+    start = time.perf_counter()
+    sources = assign_sources(targets, pools, random.Random(123), "settlement-HmoL5chU", cap)
+    elapsed = time.perf_counter() - start
+
+    load = Counter(sources)
+    print(f"Assigned {len(sources)} hooks across {len(pools)} pools in {elapsed * 1000:.2f} ms")
+    print(f"  Distinct sources: {len(load)}; busiest NPC sources {max(load.values())} hooks")
+
+
+if __name__ == "__main__":
+    main()
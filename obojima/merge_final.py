@@ -1,5 +1,8 @@
 import json
 import os
+import sys
+
+from id_alloc import IdAllocator
 
 CORE = "/Users/dmccord/Projects/vibeCode/hexbinder/temp/obojima_core.json"
 NPCS = "/Users/dmccord/Projects/vibeCode/hexbinder/temp/obojima_npcs.json"
@@ -15,6 +18,13 @@ with open(NPCS) as f:
 with open(HOOKS) as f:
     hooks = json.load(f)
 
+# The NPC and hook files are generated separately; make sure none of their
+# ids collide with the core world or with each other before merging.
+base = {k: v for k, v in world.items() if k not in ("npcs", "hooks")}
+clashes = IdAllocator.from_world(base).claim_all([npcs, hooks], base)
+if clashes:
+    sys.exit(f"Duplicate ids, not writing {OUTPUT}: {', '.join(sorted(set(clashes))[:20])}")
+
 world["npcs"] = npcs
 world["hooks"] = hooks
 
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Fuzzy entity-name resolution over a world, backed by a trigram index.
+
+Patch scripts refer to entities by name ("Tidewater", "AHA HQ"). Exact dict
+lookups silently return None on a typo; the resolver instead ranks every
+indexed name by trigram similarity so a mismatch comes back with near-miss
+suggestions.
+
+    resolver = NameResolver.from_world(data)
+    resolver.resolve("Tidewatr", kind="settlement")
+        -> [Match(name='Tidewater', id='settlement-qaroUeGg', kind='settlement', score=0.72)]
+    resolver.lookup("settlement").get("AHA HQ")
+        -> None, after printing the closest candidates
+
+Usage: python3 name_resolver.py [world.hexbinder.json] name [name ...]
+"""
+
+import json
+import re
+import sys
+import time
+from collections import Counter, namedtuple
+from heapq import nlargest
+from pathlib import Path
+
+BASE = Path(__file__).parent
+DEFAULT_WORLD = BASE / "obojima_final.hexbinder.json"
+
+Match = namedtuple("Match", ["name", "id", "kind", "score"])
+
+
+class UnresolvedNameError(KeyError):
+    def __init__(self, name, kind, suggestions):
+        self.name = name
+        self.kind = kind
+        self.suggestions = suggestions
+        hint = ", ".join(f"{m.name} ({m.score:.2f})" for m in suggestions) or "no close matches"
+        super().__init__(f"Unknown {kind or 'entity'} {name!r}; did you mean: {hint}")
+
+
+def normalize(name):
+    name = name.lower().replace("’", "'").replace("'", "")
+    return re.sub(r"[^a-z0-9]+", " ", name).strip()
+
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NameResolver:
+    """Trigram index over (name, id, kind) entries.
+
+    Scores are the Dice coefficient of the two trigram sets, so 1.0 is an
+    exact (normalized) match and unrelated names score near 0.
+    """
+
+    def __init__(self):
+        self.names = []
+        self.ids = []
+        self.kinds = []
+        self._sizes = []
+        self._postings = {}
+        self._exact = {}
+
+    def add(self, name, entity_id, kind):
+        if not name:
+            return
+        idx = len(self.names)
+        norm = normalize(name)
+        grams = trigrams(norm)
+        self.names.append(name)
+        self.ids.append(entity_id)
+        self.kinds.append(kind)
+        self._sizes.append(len(grams))
+        for g in grams:
+            self._postings.setdefault(g, []).append(idx)
+        self._exact.setdefault(norm, []).append(idx)
+
+    @classmethod
+    def from_world(cls, world):
+        resolver = cls()
+        for loc in world.get("locations", []):
+            resolver.add(loc.get("name"), loc["id"], loc.get("type", "location"))
+            for site in loc.get("sites", []):
+                resolver.add(site.get("name"), site["id"], "site")
+            for room in loc.get("rooms", []):
+                resolver.add(room.get("name"), room["id"], "room")
+        for npc in world.get("npcs", []):
+            resolver.add(npc.get("name"), npc["id"], "npc")
+        for faction in world.get("factions", []):
+            resolver.add(faction.get("name"), faction["id"], "faction")
+        for item in world.get("significantItems", []):
+            resolver.add(item.get("name"), item["id"], "item")
+        for clock in world.get("clocks", []):
+            resolver.add(clock.get("name"), clock["id"], "clock")
+        return resolver
+
+    def __len__(self):
+        return len(self.names)
+
+    def resolve(self, name, kind=None, limit=5, min_score=0.3):
+        """Ranked candidates for name, best first."""
+        norm = normalize(name)
+        exact = [i for i in self._exact.get(norm, ()) if kind is None or self.kinds[i] == kind]
+        if exact:
+            return [Match(self.names[i], self.ids[i], self.kinds[i], 1.0) for i in exact][:limit]
+
+        grams = trigrams(norm)
+        counts = Counter()
+        for g in grams:
+            postings = self._postings.get(g)
+            if postings:
+                counts.update(postings)
+        if not counts:
+            return []
+
+        size = len(grams)
+        sizes = self._sizes
+        kinds = self.kinds
+        # A candidate sharing c trigrams can score at most 2c / (size + c).
+        need = max(1, int(min_score * size / (2 - min_score)))
+        scored = (
+            (2.0 * c / (size + sizes[i]), i)
+            for i, c in counts.items()
+            if c >= need and (kind is None or kinds[i] == kind)
+        )
+        best = nlargest(limit, scored)
+        return [Match(self.names[i], self.ids[i], self.kinds[i], round(s, 3)) for s, i in best if s >= min_score]
+
+    def require(self, name, kind=None, min_score=0.3):
+        """The id for an exact (normalized) match, else UnresolvedNameError."""
+        matches = self.resolve(name, kind=kind, min_score=min_score)
+        if matches and matches[0].score == 1.0:
+            return matches[0].id
+        raise UnresolvedNameError(name, kind, matches)
+
+    def lookup(self, kind, warn=True):
+        """Dict-style accessor for one kind that reports misses."""
+        return KindLookup(self, kind, warn)
+
+
+class KindLookup:
+    """Drop-in for a name->id dict: .get() and [] with near-miss reporting.
+
+    .get() keeps dict semantics (returns the default on a miss) but prints
+    the closest candidates so a typo in a patch is visible in the run log.
+    """
+
+    def __init__(self, resolver, kind, warn=True):
+        self.resolver = resolver
+        self.kind = kind
+        self.warn = warn
+        self.misses = []
+
+    def get(self, name, default=None):
+        try:
+            return self.resolver.require(name, self.kind)
+        except UnresolvedNameError as e:
+            self.misses.append(e)
+            if self.warn:
+                print(f"  WARNING: {e.args[0]}")
+            return default
+
+    def __getitem__(self, name):
+        return self.resolver.require(name, self.kind)
+
+    def __contains__(self, name):
+        kinds = self.resolver.kinds
+        return any(kinds[i] == self.kind for i in self.resolver._exact.get(normalize(name), ()))
+
+
+def main():
+    args = sys.argv[1:]
+    world_path = DEFAULT_WORLD
+    if args and args[0].endswith(".json"):
+        world_path = Path(args.pop(0))
+    with open(world_path) as f:
+        world = json.load(f)
+
+    start = time.perf_counter()
+    resolver = NameResolver.from_world(world)
+    print(f"Indexed {len(resolver)} names in {(time.perf_counter() - start) * 1000:.1f} ms")
+    for name in args:
+        start = time.perf_counter()
+        matches = resolver.resolve(name)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"\n{name!r} ({elapsed:.2f} ms):")
+        for m in matches:
+            print(f"  {m.score:.3f}  {m.kind:<10} {m.name}  [{m.id}]")
+        if not matches:
+            print("  no candidates")
+
+
+if __name__ == "__main__":
+    main()
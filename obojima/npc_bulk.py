@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Bulk NPC generation from per-settlement demand and weighted tables.
+
+make_npc() is the NPC record schema shared with generate_npcs_hooks.py.
+generate_bulk() fills settlements with background NPCs in that schema:
+
+  1. demand per settlement is derived from its size and population
+  2. every attribute column (race, gender, archetype, threat, age, role,
+     name, feature) is drawn for all NPCs at once with one batched
+     random.choices(k=N) call per column
+  3. the columns are zipped into records through make_npc()
+
+Usage: python3 npc_bulk.py [world.hexbinder.json] [--total N]
+"""
+
+import json
+import math
+import random
+import sys
+import time
+from itertools import accumulate
+from pathlib import Path
+
+from id_alloc import IdAllocator
+
+BASE = Path(__file__).parent
+DEFAULT_WORLD = BASE / "obojima_final.hexbinder.json"
+
+
+def make_npc(npc_id, name, race, gender, desc, feature, archetype, threat, age, role, tags, location_id):
+    return {
+        "id": npc_id,
+        "name": name,
+        "race": race,
+        "gender": gender,
+        "description": desc,
+        "distinguishingFeature": feature,
+        "archetype": archetype,
+        "threatLevel": threat,
+        "age": age,
+        "role": role,
+        "relationships": [],
+        "flavorWant": "",
+        "wants": [],
+        "status": "alive",
+        "tags": tags,
+        "locationId": location_id,
+    }
+
+
+# -- Demand ------------------------------------------------------------------
+
+# Named NPCs a settlement of each size supports before population is counted.
+SIZE_BASE = {"thorpe": 2, "hamlet": 4, "village": 6, "town": 12, "city": 20}
+
+
+def settlement_demand(settlement, per_sqrt_pop=0.1):
+    """NPC count for a settlement: size base plus sqrt(population) scaling."""
+    base = SIZE_BASE.get(settlement.get("size"), 6)
+    population = settlement.get("population") or 0
+    return base + int(math.sqrt(population) * per_sqrt_pop)
+
+
+# -- Tables ------------------------------------------------------------------
+
+# Each table is {value: weight}. "age" maps (low, high) bands to weights.
+DEFAULT_TABLES = {
+    "race": {"human": 60, "spirit": 20, "nakudama": 12, "elf": 4, "dara": 4},
+    "gender": {"male": 48, "female": 48, "nonbinary": 4},
+    "archetype": {
+        "commoner": 40, "merchant": 12, "guard": 10, "scholar": 6, "priest": 6,
+        "witch": 6, "thief": 6, "bandit": 4, "noble": 4, "knight": 3,
+        "cultist": 2, "assassin": 1,
+    },
+    "threat": {1: 45, 2: 35, 3: 15, 4: 4, 5: 1},
+    "age": {(16, 25): 20, (26, 40): 35, (41, 60): 30, (61, 90): 15},
+}
+
+ROLES = {
+    "commoner": ["farmer", "fisherman", "laborer", "cook", "weaver", "porter", "shepherd", "potter"],
+    "merchant": ["shopkeeper", "trader", "peddler", "tea seller", "fishmonger"],
+    "guard": ["watchman", "gate guard", "militia member"],
+    "scholar": ["archivist", "tutor", "cartographer", "scribe"],
+    "priest": ["shrine keeper", "healer", "spirit speaker"],
+    "witch": ["hedge witch", "potion brewer", "herbalist"],
+    "thief": ["pickpocket", "fence", "smuggler"],
+    "bandit": ["brigand", "highway robber"],
+    "noble": ["elder", "landholder", "councillor"],
+    "knight": ["sword school student", "retired duelist"],
+    "cultist": ["zealot", "doomsayer"],
+    "assassin": ["hired blade"],
+}
+
+FEATURES = [
+    "Smells faintly of sea salt", "Wears a hat woven from tall grass", "Missing two fingers",
+    "Hums constantly", "Has a spirit moth that follows them", "Ink-stained hands",
+    "Speaks only in a whisper", "Wears a First Age wristwatch that doesn't work",
+    "Bright mushroom-dyed scarf", "Laughs too loudly", "Carries a battered umbrella",
+    "Burn scars along one arm", "Never takes off their sandals", "Unusually tall",
+]
+
+NAME_SYLLABLES = ["ka", "ko", "mi", "ra", "shi", "no", "ta", "yu", "ho", "na", "ri", "to",
+                  "be", "lo", "su", "ma", "ze", "wa", "ki", "po", "da", "ne", "ru", "ji"]
+
+
+def _cum(table):
+    return list(table), list(accumulate(table.values()))
+
+
+def _column(rng, table, k):
+    values, cum = _cum(table)
+    return rng.choices(values, cum_weights=cum, k=k)
+
+
+def _names(rng, k):
+    lengths = rng.choices((2, 3, 4), cum_weights=(50, 85, 100), k=k)
+    syllables = rng.choices(NAME_SYLLABLES, k=sum(lengths))
+    names = []
+    pos = 0
+    for n in lengths:
+        names.append("".join(syllables[pos:pos + n]).capitalize())
+        pos += n
+    return names
+
+
+# -- Generation --------------------------------------------------------------
+
+def generate_bulk(demand, tables=None, rng=None, existing_ids=()):
+    """Generate NPCs for {location_id: count} demand.
+
+    tables overrides entries of DEFAULT_TABLES. existing_ids is an iterable
+    of taken ids or a shared IdAllocator. Returns (npcs, by_location)
+    where by_location maps each location id to its new NPC ids.
+    """
+    rng = rng or random.Random()
+    tables = {**DEFAULT_TABLES, **(tables or {})}
+
+    location_col = [loc for loc, count in demand.items() for _ in range(count)]
+    n = len(location_col)
+    if n == 0:
+        return [], {}
+
+    races = _column(rng, tables["race"], n)
+    genders = _column(rng, tables["gender"], n)
+    archetypes = _column(rng, tables["archetype"], n)
+    threats = _column(rng, tables["threat"], n)
+    bands = _column(rng, tables["age"], n)
+    age_offsets = [rng.random() for _ in range(n)]
+    role_picks = [rng.random() for _ in range(n)]
+    features = rng.choices(FEATURES, k=n)
+    names = _names(rng, n)
+    allocator = existing_ids
+    if not isinstance(allocator, IdAllocator):
+        taken = list(existing_ids)
+        allocator = IdAllocator(taken, expected=len(taken) + 2 * n)
+    ids = allocator.allocate_batch("npc", n, rng)
+
+    npcs = []
+    by_location = {}
+    for i in range(n):
+        low, high = bands[i]
+        age = low + int(age_offsets[i] * (high - low + 1))
+        roles = ROLES.get(archetypes[i], ROLES["commoner"])
+        role = roles[int(role_picks[i] * len(roles))]
+        npc = make_npc(
+            ids[i], names[i], races[i], genders[i],
+            f"A {age}-year-old {races[i]} {role}.",
+            features[i], archetypes[i], threats[i], age, role,
+            [role.split()[-1], races[i]], location_col[i],
+        )
+        npcs.append(npc)
+        by_location.setdefault(location_col[i], []).append(ids[i])
+    return npcs, by_location
+
+
+def demand_for_world(world, scale=1.0):
+    return {
+        loc["id"]: max(1, round(settlement_demand(loc) * scale))
+        for loc in world.get("locations", [])
+        if loc.get("type") == "settlement"
+    }
+
+
+def main():
+    args = sys.argv[1:]
+    total = None
+    if "--total" in args:
+        i = args.index("--total")
+        total = int(args[i + 1])
+        del args[i:i + 2]
+    world_path = Path(args[0]) if args else DEFAULT_WORLD
+    with open(world_path) as f:
+        world = json.load(f)
+
+    demand = demand_for_world(world)
+    if total:
+        scale = total / sum(demand.values())
+        demand = demand_for_world(world, scale)
+
+    existing = {n["id"] for n in world.get("npcs", [])}
+    start = time.perf_counter()
+    npcs, by_location = generate_bulk(demand, rng=random.Random(world.get("seed")), existing_ids=existing)
+    elapsed = time.perf_counter() - start
+
+    names = {l["id"]: l["name"] for l in world.get("locations", [])}
+    print(f"Generated {len(npcs):,} NPCs in {elapsed:.3f}s")
+    for loc_id, ids in list(by_location.items())[:20]:
+        print(f"  {names.get(loc_id, loc_id)}: {len(ids)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,9 @@
 """Patch 2: Fix faction structure and clock structure to match app model."""
 
 import json
+import sys
+
+from id_alloc import IdAllocator
 
 INPUT = '/Users/dmccord/Projects/vibeCode/hexbinder/temp/obojima_final.hexbinder.json'
 OUTPUT = '/Users/dmccord/Projects/vibeCode/hexbinder/temp/obojima_final.hexbinder.json'
@@ -408,6 +411,13 @@ new_clocks = [
     },
 ]
 
+# The new factions and clocks use hand-typed ids (faction-MarGuild,
+# goal-mg1, clock-MarRepair, ...). Check them against everything that stays.
+kept = {**data, 'factions': good_factions, 'clocks': good_clocks}
+clashes = IdAllocator.from_world(kept).claim_all([new_factions, new_clocks], kept)
+if clashes:
+    sys.exit(f"  ❌ ids already in use: {', '.join(sorted(set(clashes)))} (not writing {OUTPUT})")
+
 data['clocks'] = good_clocks + new_clocks
 print(f"  Total clocks: {len(data['clocks'])}")
 for c in data['clocks']:
@@ -4,6 +4,9 @@
 import json
 import copy
 import hashlib
+import sys
+
+from id_alloc import IdAllocator
 
 INPUT = '/Users/dmccord/Projects/vibeCode/hexbinder/temp/obojima_final.hexbinder.json'
 OUTPUT = '/Users/dmccord/Projects/vibeCode/hexbinder/temp/obojima_final.hexbinder.json'
@@ -502,8 +505,19 @@ NEW_FACTIONS = [
     },
 ]
 
+# Hand-typed ids: claim them against the world so a clash stops the patch.
+id_allocator = IdAllocator.from_world(data)
+
+
+def claim_ids(record):
+    clashes = id_allocator.claim_all(record, data)
+    if clashes:
+        sys.exit(f"  id already in use: {', '.join(clashes)} (not writing {OUTPUT})")
+
+
 for faction in NEW_FACTIONS:
     if faction['name'] not in existing_faction_names:
+        claim_ids(faction)
         data['factions'].append(faction)
         print(f"  Added: {faction['name']}")
     else:
@@ -563,6 +577,7 @@ NEW_CLOCKS = [
 
 for clock in NEW_CLOCKS:
     if clock['name'] not in existing_clock_names:
+        claim_ids(clock)
         data['clocks'].append(clock)
         print(f"  Added: {clock['name']}")
     else:
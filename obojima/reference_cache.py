@@ -0,0 +1,455 @@
+#!/usr/bin/env python3
+"""
+Parse the Obojima reference documents into structured records, with a cache.
+
+Sources (in reference/):
+  NPC_MASTER.md   -> npcs       (one record per "### Name" + stat line entry)
+  FACTIONS.md     -> factions   (numbered "## N. Name" sections)
+  GEOGRAPHY.md    -> regions    (numbered "### N. Name (DIR)" sections + settlement table)
+  bestiary.md     -> creatures  ("**Name** | CR x | source" blocks)
+  obojima_raw.txt -> pages      (sourcebook text split on PAGE BREAK markers)
+
+Parsed records are pickled to reference/.reference_cache.pkl. Each source is
+keyed on its mtime, size and SHA-1; an unchanged mtime skips hashing entirely,
+and a touched-but-identical file only costs a hash. Only changed sources are
+reparsed.
+
+Usage from generation scripts:
+    from reference_cache import load_reference
+    ref = load_reference()
+    ref.npc("Captain Clintock")["want"]
+    ref.faction("Mariners' Guild")["agenda"]
+    ref.pages_mentioning("Tidewater")
+
+Run directly, it loads the cache, prints record counts and looks up each
+NAME as an NPC, faction, region and creature, plus the pages mentioning it.
+
+Usage: python3 reference_cache.py [NAME ...]
+"""
+
+import hashlib
+import os
+import pickle
+import re
+import sys
+import time
+from pathlib import Path
+
+BASE = Path(__file__).parent
+REFERENCE_DIR = BASE / "reference"
+CACHE_NAME = ".reference_cache.pkl"
+
+# Bump when a parser changes so stale caches are discarded.
+CACHE_VERSION = 2
+
+
+def normalize_name(name):
+    """Lookup key: lowercase, no quotes/punctuation, no leading 'the'."""
+    name = name.lower().replace("’", "'")
+    name = re.sub(r"[^a-z0-9' ]+", " ", name)
+    name = name.replace("'", "")
+    name = re.sub(r"\s+", " ", name).strip()
+    if name.startswith("the "):
+        name = name[4:]
+    return name
+
+
+# -- NPC_MASTER.md -----------------------------------------------------------
+
+NPC_STAT_RE = re.compile(
+    r"^(?P<race>[a-z_]+) (?P<gender>[a-z]+) \| (?P<archetype>[a-z_]+) \| TL(?P<tl>\d+) \| (?P<status>[a-z_]+)\s*$"
+)
+FIELD_RE = re.compile(r"\*\*(?P<key>[A-Za-z ]+):\*\*\s*(?P<value>.*?)(?=\s*\|\s*\*\*|$)")
+NPC_FIELDS = {
+    "Faction": "faction",
+    "Location": "location",
+    "Feature": "feature",
+    "Companion": "companion",
+    "Role": "role",
+    "Want": "want",
+    "Secret": "secret",
+    "Relationships": "relationships",
+    "Tags": "tags",
+    "Aliases": "aliases",
+    "TrueIdentity": "trueIdentity",
+    "Status": "statusNote",
+}
+
+
+def _blank(value):
+    return value in ("", "—", "-")
+
+
+def _split_list(value):
+    """Comma-separated items, ignoring commas inside parentheses."""
+    items, depth, start = [], 0, 0
+    for i, ch in enumerate(value):
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth = max(0, depth - 1)
+        elif ch == "," and depth == 0:
+            items.append(value[start:i])
+            start = i + 1
+    items.append(value[start:])
+    return [item.strip() for item in items if item.strip()]
+
+
+def parse_npcs(text):
+    lines = text.splitlines()
+    npcs = []
+    group = None
+    faction_section = None
+    for i, line in enumerate(lines):
+        if line.startswith("## "):
+            title = line[3:].strip()
+            faction_section = re.sub(r"^\d+\.\s*", "", title) if re.match(r"\d+\.", title) else None
+            group = None
+            continue
+        heading = re.match(r"^#{3,4} (.+)$", line)
+        if not heading:
+            continue
+        stat = NPC_STAT_RE.match(lines[i + 1]) if i + 1 < len(lines) else None
+        if not stat:
+            group = heading.group(1).strip()
+            continue
+
+        raw_name = heading.group(1).strip()
+        name, _, alias = raw_name.partition(" / ")
+        npc = {
+            "name": name.strip(),
+            "aliases": [alias.strip().strip('"')] if alias else [],
+            "race": stat["race"],
+            "gender": stat["gender"],
+            "archetype": stat["archetype"],
+            "threatLevel": int(stat["tl"]),
+            "status": stat["status"],
+            "section": faction_section,
+            "group": group,
+            "description": "",
+        }
+        for body in lines[i + 2:]:
+            if body.startswith("#") or body.startswith("---"):
+                break
+            if body.startswith("> "):
+                npc["description"] = (npc["description"] + " " + body[2:].strip()).strip()
+                continue
+            for m in FIELD_RE.finditer(body):
+                key = NPC_FIELDS.get(m["key"].strip())
+                if key and not _blank(m["value"].strip()):
+                    npc[key] = m["value"].strip()
+
+        for key in ("tags", "relationships"):
+            if key in npc:
+                npc[key] = _split_list(npc[key])
+        if isinstance(npc["aliases"], str):
+            # An **Aliases:** field adds to the "Name / Alias" heading alias.
+            listed = [a.strip('"') for a in _split_list(npc["aliases"])]
+            heading_alias = [alias.strip().strip('"')] if alias else []
+            npc["aliases"] = list(dict.fromkeys(heading_alias + listed))
+        faction = npc.pop("faction", None)
+        if faction:
+            m = re.match(r"^(.*?)\s*\((.*)\)$", faction)
+            npc["faction"], npc["factionRole"] = (m.group(1), m.group(2)) if m else (faction, None)
+        location = npc.get("location")
+        if location and " — " in location:
+            npc["location"], npc["region"] = [p.strip() for p in location.split(" — ", 1)]
+        elif group and " — " in group:
+            npc.setdefault("location", group.split(" — ")[0].strip())
+            npc["region"] = group.split(" — ", 1)[1].strip()
+        npcs.append(npc)
+    return npcs
+
+
+# -- FACTIONS.md -------------------------------------------------------------
+
+def _table_rows(lines):
+    rows = []
+    for line in lines:
+        if not line.startswith("|") or re.match(r"^\|[-\s|]+\|$", line):
+            continue
+        rows.append([c.strip() for c in line.strip().strip("|").split("|")])
+    return rows[1:]  # drop header
+
+
+def _paragraph(lines):
+    return " ".join(l.strip() for l in lines if l.strip() and l.strip() != "---").strip()
+
+
+def _sections(lines, marker):
+    """Split lines into (title, body_lines) on headings starting with marker."""
+    out = []
+    title, body = None, []
+    for line in lines:
+        if line.startswith(marker):
+            if title is not None:
+                out.append((title, body))
+            title, body = line[len(marker):].strip(), []
+        elif title is not None:
+            body.append(line)
+    if title is not None:
+        out.append((title, body))
+    return out
+
+
+def parse_factions(text):
+    factions = []
+    for title, body in _sections(text.splitlines(), "## "):
+        m = re.match(r"^(\d+)\.\s*(.+)$", title)
+        if not m:
+            continue
+        faction = {"order": int(m.group(1)), "name": m.group(2).strip(), "agents": [],
+                   "advantages": [], "agenda": [], "obstacles": {}, "want": "", "tension": ""}
+        # Header bullets before the first ### subsection
+        for line in body:
+            if line.startswith("### "):
+                break
+            fm = re.match(r"^- \*\*(.+?):\*\*\s*(.*)$", line)
+            if fm:
+                key = fm.group(1).strip().lower()
+                faction[key] = fm.group(2).strip()
+        if "traits" in faction:
+            faction["traits"] = [t.strip() for t in faction["traits"].split(",")]
+
+        for sub, sub_body in _sections(body, "### "):
+            kind = sub.lower()
+            if kind == "agents":
+                for line in sub_body:
+                    am = re.match(r"^- \*\*(.+?)\*\*\s*—\s*(.*)$", line)
+                    if am:
+                        faction["agents"].append({"name": am.group(1).strip(), "description": am.group(2).strip()})
+            elif kind == "advantages":
+                faction["advantages"] = [{"type": r[0], "detail": r[1]} for r in _table_rows(sub_body) if len(r) >= 2]
+            elif kind == "agenda":
+                faction["agenda"] = [re.sub(r"^\d+\.\s*", "", l).strip() for l in sub_body if re.match(r"^\d+\.", l)]
+            elif kind in ("obstacles", "obstacle"):
+                split = [re.match(r"^\*\*(.+?):\*\*\s*(.*)$", l) for l in sub_body]
+                labelled = {m.group(1).strip().lower(): m.group(2).strip() for m in split if m}
+                faction["obstacles"] = labelled or {"main": _paragraph(sub_body)}
+            elif kind == "want":
+                faction["want"] = _paragraph(sub_body)
+            elif kind == "tension":
+                faction["tension"] = _paragraph(sub_body)
+        factions.append(faction)
+    return factions
+
+
+# -- GEOGRAPHY.md ------------------------------------------------------------
+
+def parse_geography(text):
+    lines = text.splitlines()
+    regions = []
+    for title, body in _sections(lines, "### "):
+        m = re.match(r"^\d+\.\s*(?:\S+\s+)?(.+?)\s*\((\w+)\)(?:\s*—\s*(.*))?$", title)
+        if not m:
+            continue
+        region = {"name": m.group(1).strip(), "direction": m.group(2).lower(),
+                  "note": (m.group(3) or "").strip(), "settlements": []}
+        for line in body:
+            if line.startswith("#"):
+                break
+            fm = re.match(r"^- \*\*(.+?):\*\*\s*(.*)$", line)
+            if fm:
+                key = fm.group(1).strip().lower().replace(" ", "_")
+                region[key] = fm.group(2).strip()
+        if "hex_terrain" in region:
+            region["hexTerrain"] = re.findall(r"`(\w+)`", region.pop("hex_terrain"))
+        regions.append(region)
+
+    by_region = {normalize_name(r["name"]): r for r in regions}
+    for title, body in _sections(lines, "### "):
+        if title != "By Region":
+            continue
+        for row in _table_rows(body):
+            if len(row) < 4:
+                continue
+            region = by_region.get(normalize_name(row[1]))
+            if region is not None:
+                region["settlements"].append({
+                    "name": row[0].strip("*").strip(), "terrain": row[2], "notes": row[3],
+                })
+    return regions
+
+
+# -- bestiary.md -------------------------------------------------------------
+
+CREATURE_RE = re.compile(r"^\*\*(?P<name>.+?)\*\*\s*\|\s*CR (?P<cr>[\d/]+)\s*(?:\|\s*(?P<source>.*))?$")
+
+
+def _cr_value(cr):
+    if "/" in cr:
+        num, den = cr.split("/")
+        return int(num) / int(den)
+    return float(cr)
+
+
+def parse_bestiary(text):
+    creatures = []
+    category = None
+    current = None
+    for line in text.splitlines():
+        if line.startswith("## "):
+            category = line[3:].strip()
+            continue
+        m = CREATURE_RE.match(line)
+        if m:
+            current = {"name": m["name"].strip(), "cr": m["cr"], "crValue": _cr_value(m["cr"]),
+                       "source": (m["source"] or "").strip(), "category": category, "traits": []}
+            creatures.append(current)
+            continue
+        if current is None or not line.strip():
+            continue
+        if line.startswith("AC "):
+            for part in line.split("|"):
+                key, _, value = part.strip().partition(" ")
+                if key in ("AC", "HP"):
+                    current[key.lower()] = int(re.match(r"\d+", value).group()) if re.match(r"\d+", value) else value
+                elif key == "Speed":
+                    current["speed"] = value.strip()
+                elif key == "Habitat:":
+                    current["habitats"] = [h.strip() for h in value.split(",")]
+        elif line.startswith("- "):
+            current["traits"].append(line[2:].replace("**", "").strip())
+    return creatures
+
+
+# -- obojima_raw.txt ---------------------------------------------------------
+
+def parse_raw(text):
+    pages = []
+    for number, chunk in enumerate(text.split("--- PAGE BREAK ---")):
+        body = chunk.strip()
+        if body:
+            pages.append({"page": number, "text": body, "search": body.lower().replace("’", "'")})
+    return pages
+
+
+# -- Cache -------------------------------------------------------------------
+
+SOURCES = {
+    "npcs": ("NPC_MASTER.md", parse_npcs),
+    "factions": ("FACTIONS.md", parse_factions),
+    "regions": ("GEOGRAPHY.md", parse_geography),
+    "creatures": ("bestiary.md", parse_bestiary),
+    "pages": ("obojima_raw.txt", parse_raw),
+}
+
+
+def _file_hash(path):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class ReferenceLibrary:
+    """Parsed reference records with by-name lookup."""
+
+    def __init__(self, records):
+        self.npcs = records.get("npcs", [])
+        self.factions = records.get("factions", [])
+        self.regions = records.get("regions", [])
+        self.creatures = records.get("creatures", [])
+        self.pages = records.get("pages", [])
+        self._by_name = {}
+        for kind in ("npcs", "factions", "regions", "creatures"):
+            table = {}
+            for rec in getattr(self, kind):
+                for name in [rec["name"]] + rec.get("aliases", []):
+                    table.setdefault(normalize_name(name), rec)
+            self._by_name[kind] = table
+
+    def _lookup(self, kind, name, default):
+        return self._by_name[kind].get(normalize_name(name), default)
+
+    def npc(self, name, default=None):
+        return self._lookup("npcs", name, default)
+
+    def faction(self, name, default=None):
+        return self._lookup("factions", name, default)
+
+    def region(self, name, default=None):
+        return self._lookup("regions", name, default)
+
+    def creature(self, name, default=None):
+        return self._lookup("creatures", name, default)
+
+    def npcs_in(self, faction=None, location=None):
+        return [n for n in self.npcs
+                if (faction is None or normalize_name(n.get("faction") or "") == normalize_name(faction))
+                and (location is None or normalize_name(location) in normalize_name(n.get("location") or ""))]
+
+    def pages_mentioning(self, term):
+        needle = term.lower().replace("’", "'")
+        return [p["page"] for p in self.pages if needle in p["search"]]
+
+
+def load_reference(reference_dir=REFERENCE_DIR, cache_path=None, verbose=False):
+    """Load parsed reference records, reparsing only sources that changed."""
+    reference_dir = Path(reference_dir)
+    cache_path = Path(cache_path) if cache_path else reference_dir / CACHE_NAME
+
+    cache = {}
+    try:
+        with open(cache_path, "rb") as f:
+            cache = pickle.load(f)
+        if cache.get("version") != CACHE_VERSION:
+            cache = {}
+    except (OSError, pickle.UnpicklingError, EOFError):
+        cache = {}
+    entries = cache.get("sources", {})
+
+    dirty = False
+    records = {}
+    for kind, (filename, parser) in SOURCES.items():
+        path = reference_dir / filename
+        if not path.exists():
+            records[kind] = []
+            continue
+        st = os.stat(path)
+        entry = entries.get(kind)
+        if entry and entry["mtime"] == st.st_mtime_ns and entry["size"] == st.st_size:
+            records[kind] = entry["records"]
+            continue
+        digest = _file_hash(path)
+        if entry and entry["sha1"] == digest:
+            entry["mtime"], entry["size"] = st.st_mtime_ns, st.st_size
+        else:
+            if verbose:
+                print(f"  parsing {filename}")
+            with open(path, encoding="utf-8") as f:
+                entry = {"sha1": digest, "records": parser(f.read())}
+            entry["mtime"], entry["size"] = st.st_mtime_ns, st.st_size
+            entries[kind] = entry
+        records[kind] = entry["records"]
+        dirty = True
+
+    if dirty:
+        tmp = cache_path.with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            pickle.dump({"version": CACHE_VERSION, "sources": entries}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, cache_path)
+    return ReferenceLibrary(records)
+
+
+def main():
+    start = time.perf_counter()
+    ref = load_reference(verbose=True)
+    elapsed = time.perf_counter() - start
+    print(f"Loaded reference in {elapsed * 1000:.1f} ms")
+    print(f"  NPCs:      {len(ref.npcs)}")
+    print(f"  Factions:  {len(ref.factions)}")
+    print(f"  Regions:   {len(ref.regions)}")
+    print(f"  Creatures: {len(ref.creatures)}")
+    print(f"  Pages:     {len(ref.pages)}")
+    for name in sys.argv[1:]:
+        for kind in ("npc", "faction", "region", "creature"):
+            rec = getattr(ref, kind)(name)
+            if rec:
+                print(f"\n{kind}: {rec}")
+        print(f"pages mentioning {name!r}: {ref.pages_mentioning(name)[:20]}")
+
+
+if __name__ == "__main__":
+    main()
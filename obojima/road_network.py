@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Generate a road network between settlements.
+
+Roads form a minimum spanning tree over settlements, weighted by terrain
+travel cost, plus a few shortcuts:
+
+  1. Candidate pairs: each settlement is paired with its `neighbors`
+     nearest settlements by hex distance (SettlementLocator buckets), so
+     thousands of settlements give O(n * neighbors) pairs rather than n^2.
+  2. Each candidate is weighted by its A* terrain cost (TravelGraph with
+     TERRAIN_COSTS and no existing edges).
+  3. Kruskal picks the spanning tree. Shortcuts are the non-tree candidates
+     whose detour along the tree is worst relative to their direct cost.
+  4. Each chosen pair is routed hex by hex with A*, cheapest first. Hexes
+     that already carry a road cost ROAD_HEX_COST, so later roads merge
+     into earlier ones the way src/generators/RoadGenerator.ts does.
+
+Settlements with no finite-cost route to any of their candidate neighbours
+stay disconnected: water is impassable to TravelGraph, so each island gets
+its own tree. On Obojima this leaves three separate networks.
+road_components() groups settlements by the roads that join them, so
+callers can see which ones were left apart.
+
+The result is a list of edges in the world's {"from", "to", "type"} format,
+one per hex step, with no duplicates:
+
+    edges = generate_roads(world, shortcuts=2)
+    world["edges"] = [e for e in world["edges"] if e["type"] != "road"] + edges
+
+Usage: python3 road_network.py [world.hexbinder.json] [--shortcuts N]
+           [--neighbors K] [--bench SETTLEMENTS]
+"""
+
+import json
+import math
+import random
+import sys
+import time
+from pathlib import Path
+
+from hex_grid import spiral
+from hex_nearest import TERRAIN_COSTS, SettlementLocator
+from travel_planner import TravelGraph
+
+BASE = Path(__file__).parent
+DEFAULT_WORLD = BASE / "obojima_final.hexbinder.json"
+
+# Movement cost of a hex that already has a road (RoadGenerator.ts uses 1).
+ROAD_HEX_COST = 1
+
+
+def candidate_pairs(locator, neighbors=6):
+    """Sorted (id, id) pairs linking each settlement to its nearest neighbours."""
+    pairs = set()
+    for sid, qr in locator.settlements:
+        for _, other in locator.nearest(qr, neighbors + 1):
+            if other != sid:
+                pairs.add((sid, other) if sid < other else (other, sid))
+    return sorted(pairs)
+
+
+def spanning_tree(nodes, weighted):
+    """Kruskal over [(weight, a, b)]: (tree edges, non-tree edges)."""
+    parent = {n: n for n in nodes}
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    tree, rest = [], []
+    for w, a, b in sorted(weighted):
+        ra, rb = find(a), find(b)
+        if ra == rb:
+            rest.append((w, a, b))
+        else:
+            parent[ra] = rb
+            tree.append((w, a, b))
+    return tree, rest
+
+
+def _tree_distances(tree):
+    """Function giving the path cost between two nodes of a spanning forest (None if split)."""
+    adj = {}
+    for w, a, b in tree:
+        adj.setdefault(a, []).append((b, w))
+        adj.setdefault(b, []).append((a, w))
+    up = {}  # node -> (parent, cost to parent, depth, cost from root, root)
+    for root in sorted(adj):
+        if root in up:
+            continue
+        up[root] = (None, 0, 0, 0, root)
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            _, _, depth, cost, _ = up[node]
+            for nb, w in adj[node]:
+                if nb not in up:
+                    up[nb] = (node, w, depth + 1, cost + w, root)
+                    stack.append(nb)
+
+    def distance(a, b):
+        if a not in up or b not in up or up[a][4] != up[b][4]:
+            return None
+        total = up[a][3] + up[b][3]
+        while a != b:
+            if up[a][2] < up[b][2]:
+                a, b = b, a
+            a = up[a][0]
+        return total - 2 * up[a][3]
+    return distance
+
+
+def road_components(nodes, pairs):
+    """Groups of settlement ids joined by `pairs`, largest first."""
+    parent = {n: n for n in nodes}
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for a, b in pairs:
+        parent[find(a)] = find(b)
+    groups = {}
+    for n in nodes:
+        groups.setdefault(find(n), []).append(n)
+    return sorted(groups.values(), key=lambda g: (-len(g), g))
+
+
+def plan_roads(world, shortcuts=2, neighbors=6, terrain_costs=TERRAIN_COSTS):
+    """(tree pairs, shortcut pairs) of settlement ids, before routing.
+
+    The tree is a spanning forest: settlements cut off by water get no road
+    to the rest (see road_components).
+    """
+    locator = SettlementLocator(world)
+    coords = dict(locator.settlements)
+    graph = TravelGraph({"hexes": world.get("hexes", [])}, terrain_costs, {})
+    weighted = []
+    for a, b in candidate_pairs(locator, neighbors):
+        cost, _ = graph.route(coords[a], coords[b])
+        if cost != math.inf:
+            weighted.append((cost, a, b))
+    tree, rest = spanning_tree(coords, weighted)
+    distance = _tree_distances(tree)
+    detours = []
+    for w, a, b in rest:
+        along = distance(a, b)
+        if along is not None and w > 0 and along > w:
+            detours.append((w / along, a, b))
+    detours.sort()
+    return [(a, b) for _, a, b in tree], [(a, b) for _, a, b in detours[:shortcuts]]
+
+
+def route_roads(world, pairs, terrain_costs=TERRAIN_COSTS, edge_type="road"):
+    """Route settlement pairs hex by hex, merging into earlier roads. Returns edges."""
+    coords = dict(SettlementLocator(world).settlements)
+    graph = TravelGraph({"hexes": world.get("hexes", [])}, terrain_costs, {})
+    graph.min_step = min(graph.min_step, ROAD_HEX_COST)
+    seen = set()
+    edges = []
+    for a, b in pairs:
+        _, path = graph.route(coords[a], coords[b])
+        for x, y in zip(path, path[1:]):
+            key = (x, y) if x <= y else (y, x)
+            if key not in seen:
+                seen.add(key)
+                edges.append({"from": {"q": x[0], "r": x[1]}, "to": {"q": y[0], "r": y[1]}, "type": edge_type})
+        for qr in path:
+            if qr in graph.enter:
+                graph.enter[qr] = min(graph.enter[qr], ROAD_HEX_COST)
+    return edges
+
+
+def generate_roads(world, shortcuts=2, neighbors=6, terrain_costs=TERRAIN_COSTS):
+    """Road edges connecting settlements that can reach each other overland, plus `shortcuts` extras."""
+    tree, extra = plan_roads(world, shortcuts, neighbors, terrain_costs)
+    return route_roads(world, tree + extra, terrain_costs)
+
+
+def _synthetic_world(settlements, seed=0):
+    rng = random.Random(seed)
+    radius = int(math.sqrt(settlements * 60 / 3)) + 1
+    terrains = ["plains"] * 5 + ["forest"] * 3 + ["hills"] * 2 + ["swamp", "desert", "mountains", "water"]
+    hexes = [{"coord": {"q": q, "r": r}, "terrain": rng.choice(terrains)} for q, r in spiral((0, 0), radius)]
+    towns = rng.sample([h for h in hexes if h["terrain"] in ("plains", "forest", "hills")], settlements)
+    locations = [{"id": f"settlement-{i:05d}", "type": "settlement", "hexCoord": h["coord"]}
+                 for i, h in enumerate(towns)]
+    return {"hexes": hexes, "locations": locations}
+
+
+def main():
+    args = sys.argv[1:]
+    shortcuts = 2
+    neighbors = 6
+    bench = None
+    for flag in ("--shortcuts", "--neighbors", "--bench"):
+        if flag in args:
+            i = args.index(flag)
+            value = int(args[i + 1])
+            del args[i:i + 2]
+            if flag == "--shortcuts":
+                shortcuts = value
+            elif flag == "--neighbors":
+                neighbors = value
+            else:
+                bench = value
+    if bench:
+        world = _synthetic_world(bench)
+    else:
+        world_path = Path(args[0]) if args else DEFAULT_WORLD
+        with open(world_path) as f:
+            world = json.load(f)
+
+    start = time.perf_counter()
+    tree, extra = plan_roads(world, shortcuts, neighbors)
+    planned = time.perf_counter() - start
+    start = time.perf_counter()
+    edges = route_roads(world, tree + extra)
+    routed = time.perf_counter() - start
+
+    names = {l["id"]: l.get("name", l["id"]) for l in world["locations"]}
+    n = sum(1 for l in world["locations"] if l.get("type") == "settlement")
+    print(f"{n} settlements: {len(tree)} tree roads + {len(extra)} shortcuts -> {len(edges)} road edges")
+    print(f"  planned in {planned * 1000:.0f} ms, routed in {routed * 1000:.0f} ms")
+    ids = [l["id"] for l in world["locations"] if l.get("type") == "settlement"]
+    groups = road_components(ids, tree)
+    if len(groups) > 1:
+        print(f"  {len(groups)} unconnected road networks (water or no candidate pair between them):")
+        for group in groups[:10]:
+            print(f"    {len(group)}: {', '.join(names[g] for g in group[:8])}{' ...' if len(group) > 8 else ''}")
+    if not bench:
+        for a, b in tree:
+            print(f"  road      {names[a]} - {names[b]}")
+        for a, b in extra:
+            print(f"  shortcut  {names[a]} - {names[b]}")
+
+
+if __name__ == "__main__":
+    main()
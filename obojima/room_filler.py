@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""
+Fill dungeon rooms with encounters, treasure, features, hazards and secrets.
+
+Each room's depth is its passage-graph distance from entranceRoomId (a BFS
+over passages). Chances and table weights scale with depth:
+
+  entry weight at depth d = weight * (1 + bias) ** d, or 0 below min_depth
+
+so coins give way to gems and magic items, and pits give way to crushing
+blocks, further in. The weighted tables are compiled into cumulative-weight
+lists per depth once at import, and each dungeon draws all of its rooms'
+picks for a table in one rng.choices call per depth.
+
+Every dungeon gets its own stream, entity_rng(world seed, dungeon id,
+"room-content"), and dungeons are filled through rng_streams.parallel_map.
+The output is the same for any worker count or dungeon order. Only empty
+lists are filled, so hand-written content is kept. New ids are checked
+against the whole world after the workers return.
+
+    stats = fill_world(world, workers=4)
+    fill_dungeon(dungeon, rng)        -> {room_id: {"encounters": [...], ...}}
+
+Usage: python3 room_filler.py [world.hexbinder.json] [--workers N]
+           [--set-depth] [--out PATH] [--bench DUNGEONS]
+"""
+
+import copy
+import json
+import sys
+import time
+from collections import deque
+from itertools import accumulate
+from pathlib import Path
+
+from dice import parse
+from id_alloc import ID_CHARS, ID_LENGTH, IdAllocator
+from rng_streams import entity_rng, parallel_map
+from wander_table import compile_table
+
+BASE = Path(__file__).parent
+DEFAULT_WORLD = BASE / "obojima_final.hexbinder.json"
+
+KINDS = ("encounters", "treasure", "features", "hazards", "secrets")
+MAX_DEPTH = 12
+PURPOSE = "room-content"
+
+# Chance that a room gets a first entry of each kind: (base, per depth, cap).
+CHANCES = {
+    "encounters": (0.30, 0.08, 0.85),
+    "treasure": (0.35, 0.08, 0.90),
+    "features": (0.60, 0.00, 0.60),
+    "hazards": (0.10, 0.06, 0.50),
+    "secrets": (0.08, 0.04, 0.40),
+}
+
+# Room types that raise (or lower) those chances.
+ROOM_BIAS = {
+    "entrance": {"encounters": -0.2, "treasure": -0.3, "hazards": -0.1},
+    "treasury": {"treasure": 0.5, "hazards": 0.2},
+    "trap_room": {"hazards": 0.9},
+    "lair": {"encounters": 0.6, "treasure": 0.2},
+    "shrine": {"secrets": 0.2, "features": 0.3},
+    "prison": {"encounters": 0.2},
+}
+
+# (weight, bias per depth, min depth, template)
+TREASURE = [
+    (10, -0.35, 0, {"type": "coins", "name": "Coins", "value": "2d6 cp"}),
+    (8, -0.10, 0, {"type": "coins", "name": "Coins", "value": "2d6 sp"}),
+    (4, 0.30, 1, {"type": "coins", "name": "Coins", "value": "2d6 gp"}),
+    (1, 0.45, 3, {"type": "coins", "name": "Coins", "value": "1d6 pp"}),
+    (3, 0.30, 1, {"type": "gems", "name": "Gems", "value": "1d4 x 50 gp"}),
+    (2, 0.30, 1, {"type": "art", "name": "Art Object", "value": "1d6 x 25 gp"}),
+    (4, 0.00, 0, {"type": "item", "name": "Adventuring Gear", "value": "1d10 gp"}),
+    (1, 0.60, 2, {"type": "magic_item", "name": "Magic Item"}),
+]
+
+# ROOM_FEATURES from src/generators/DungeonGenerator.ts.
+FEATURES = [(1, 0.0, 0, {"name": n, "description": d, "interactive": i}) for n, d, i in [
+    ("Broken Furniture", "Broken furniture scattered about", False),
+    ("Ancient Altar", "An ancient stone altar", True),
+    ("Faded Murals", "Faded murals on the walls", False),
+    ("Bone Pile", "Piles of bones in the corners", True),
+    ("Glowing Fungi", "Glowing fungi provide dim light", False),
+    ("Unnatural Torches", "Torches burn with an unnatural flame", True),
+    ("Stagnant Pool", "A pool of stagnant water", True),
+    ("Dripping Ceiling", "Water drips from the ceiling", False),
+    ("Rubble", "Rubble blocks part of the room", False),
+    ("Collapsed Pillars", "Collapsed pillars", False),
+]]
+
+# UNIVERSAL_TRAPS from src/generators/dungeon/DungeonBlueprints.ts.
+HAZARDS = [
+    (6, -0.15, 0, {
+        "name": "Covered Pit",
+        "description": "A 10-foot pit covered with rotting canvas and debris",
+        "damage": "1d6 STR (fall damage)",
+        "save": "DC 12 DEX to grab the edge",
+        "trigger": "Stepping onto the center of the covered section",
+        "passiveHint": "The floor sounds hollow when walked on",
+        "activeHint": "Seams in the dust outline a rectangular section of floor",
+        "disarmMethods": [
+            "Walk along the walls where the floor is solid",
+            "Probe ahead with a 10-foot pole",
+            "Throw heavy objects to trigger it safely",
+        ],
+        "consequence": "The pit remains open, blocking direct passage",
+        "targetAttribute": "STR",
+    }),
+    (4, 0.10, 1, {
+        "name": "Pressure Plate Darts",
+        "description": "A floor tile triggers poison darts from concealed wall slots",
+        "damage": "1d4 DEX + poison (DC 13 CON or 1d6 CON)",
+        "save": "DC 13 DEX to dodge",
+        "trigger": "Stepping on the raised floor tile",
+        "passiveHint": "Tiny holes line the walls at chest height",
+        "activeHint": "One floor tile is slightly raised and a different color",
+        "disarmMethods": [
+            "Step over the obvious pressure plate",
+            "Crawl beneath the dart trajectory",
+            "Jam cloth into the dart holes",
+        ],
+        "consequence": "The clicking alerts creatures in adjacent rooms",
+        "targetAttribute": "DEX",
+    }),
+    (2, 0.35, 2, {
+        "name": "Counterweight Block",
+        "description": "A stone block drops when a tripwire is disturbed",
+        "damage": "2d6 STR (crushing)",
+        "save": "DC 14 DEX to leap clear",
+        "trigger": "Walking through or disturbing the tripwire",
+        "passiveHint": "Fresh scratches on the ceiling directly above",
+        "activeHint": "A thin wire glints at ankle height across the passage",
+        "disarmMethods": [
+            "Step carefully over the visible tripwire",
+            "Crawl under the wire",
+            "Cut the wire from a safe distance with a blade on a pole",
+        ],
+        "consequence": "The crash blocks the passage until cleared (1 hour) and alerts nearby creatures",
+        "targetAttribute": "STR",
+    }),
+]
+
+# SECRETS from src/generators/DungeonGenerator.ts; DCs rise with depth.
+SECRETS = [
+    (3, 0.0, 0, {"description": "A secret door behind a tapestry", "skill": "Perception", "dc": 14}),
+    (3, 0.0, 0, {"description": "A concealed passage in the floor", "skill": "Investigation", "dc": 15}),
+    (2, 0.2, 0, {"description": "A hidden compartment in the wall", "skill": "Perception", "dc": 12, "reward": "50 gp"}),
+    (2, 0.2, 1, {"description": "A false bottom in a chest", "skill": "Investigation", "dc": 13, "reward": "gems"}),
+    (3, 0.0, 0, {"description": "A narrow crawlway hidden by rubble", "skill": "Perception", "dc": 14}),
+    (2, 0.1, 1, {"description": "A hidden lever opens a secret door", "skill": "Investigation", "dc": 16}),
+]
+
+BEHAVIORS = [(5, -0.05, 0, "hostile"), (2, 0.0, 0, "neutral"), (2, 0.0, 0, "negotiable"), (1, -0.2, 0, "fleeing")]
+
+# Used when a dungeon has no wanderingMonsters table.
+DEFAULT_CREATURES = [
+    (6, -0.2, 0, {"creatureType": "giant rat", "count": "2d4"}),
+    (5, -0.1, 0, {"creatureType": "goblin", "count": "1d6"}),
+    (4, 0.0, 0, {"creatureType": "skeleton", "count": "1d4+1"}),
+    (3, 0.15, 1, {"creatureType": "ghoul", "count": "1d4"}),
+    (2, 0.3, 2, {"creatureType": "ogre", "count": "1"}),
+    (1, 0.45, 3, {"creatureType": "wraith", "count": "1"}),
+]
+
+
+def compile_depths(table, max_depth=MAX_DEPTH):
+    """(templates, [cumulative weights per depth 0..max_depth])."""
+    templates = [entry[3] for entry in table]
+    cums = []
+    for d in range(max_depth + 1):
+        weights = [w * (1 + bias) ** d if d >= min_depth else 0 for w, bias, min_depth, _ in table]
+        cums.append(list(accumulate(weights)))
+    return templates, cums
+
+
+TABLES = {
+    "treasure": compile_depths(TREASURE),
+    "features": compile_depths(FEATURES),
+    "hazards": compile_depths(HAZARDS),
+    "secrets": compile_depths(SECRETS),
+    "behavior": compile_depths(BEHAVIORS),
+    "creatures": compile_depths(DEFAULT_CREATURES),
+}
+
+
+def room_depths(dungeon):
+    """{room id: passages from the entrance}; unreachable rooms get the deepest depth + 1."""
+    adj = {}
+    for p in dungeon.get("passages", []):
+        adj.setdefault(p.get("fromRoomId"), []).append(p.get("toRoomId"))
+        adj.setdefault(p.get("toRoomId"), []).append(p.get("fromRoomId"))
+    entrance = dungeon.get("entranceRoomId")
+    depths = {entrance: 0}
+    queue = deque([entrance])
+    while queue:
+        room = queue.popleft()
+        for nb in adj.get(room, ()):
+            if nb not in depths:
+                depths[nb] = depths[room] + 1
+                queue.append(nb)
+    deepest = max(depths.values())
+    return {r["id"]: depths.get(r["id"], deepest + 1) for r in dungeon.get("rooms", [])}
+
+
+def _chance(kind, depth, room_type):
+    base, step, cap = CHANCES[kind]
+    return min(cap, base + step * depth) + ROOM_BIAS.get(room_type, {}).get(kind, 0)
+
+
+def _picks(rng, table, depths):
+    """One table pick per depth in `depths`, batched per distinct depth."""
+    templates, cums = TABLES[table]
+    out = [None] * len(depths)
+    by_depth = {}
+    for i, d in enumerate(depths):
+        by_depth.setdefault(min(d, MAX_DEPTH), []).append(i)
+    for d, where in sorted(by_depth.items()):
+        for i, t in zip(where, rng.choices(templates, cum_weights=cums[d], k=len(where))):
+            out[i] = t
+    return out
+
+
+def _new_id(prefix, rng, taken):
+    while True:
+        candidate = f"{prefix}-{''.join(rng.choices(ID_CHARS, k=ID_LENGTH))}"
+        if candidate not in taken:
+            taken.add(candidate)
+            return candidate
+
+
+def fill_dungeon(dungeon, rng):
+    """{room id: {kind: [new entries]}} for the dungeon's empty room lists."""
+    depths = room_depths(dungeon)
+    rooms = dungeon.get("rooms", [])
+    taken = {x.get("id") for r in rooms for k in KINDS for x in r.get(k, []) if isinstance(x, dict)}
+    wandering = dungeon.get("wanderingMonsters")
+    sampler = compile_table(wandering) if wandering and wandering.get("entries") else None
+    out = {r["id"]: {} for r in rooms}
+
+    for kind in KINDS:
+        # Rooms that roll this kind; a second entry follows at half the chance.
+        chosen = []
+        rolls = [rng.random() for _ in range(2 * len(rooms))]
+        for i, room in enumerate(rooms):
+            if room.get(kind):
+                continue
+            d = depths[room["id"]]
+            p = _chance(kind, d, room.get("type"))
+            n = (rolls[2 * i] < p) + (rolls[2 * i] < p and rolls[2 * i + 1] < p / 2)
+            chosen.extend([room] * n)
+        if not chosen:
+            continue
+        room_depth = [depths[room["id"]] for room in chosen]
+
+        if kind == "encounters":
+            if sampler is not None:
+                kinds = [sampler.entries[i] for i in sampler.roll_indices(rng, len(chosen))]
+            else:
+                kinds = _picks(rng, "creatures", room_depth)
+            behaviors = _picks(rng, "behavior", room_depth)
+            for room, d, creature, behavior in zip(chosen, room_depth, kinds, behaviors):
+                count = max(1, parse(creature.get("count", 1)).roll(rng) + d // 3)
+                out[room["id"]].setdefault(kind, []).append({
+                    "id": _new_id("encounter", rng, taken),
+                    "creatureType": creature["creatureType"],
+                    "count": count,
+                    "behavior": behavior,
+                    "defeated": False,
+                })
+        elif kind == "treasure":
+            for room, t in zip(chosen, _picks(rng, kind, room_depth)):
+                entry = {"id": _new_id("treasure", rng, taken), **t, "looted": False}
+                out[room["id"]].setdefault(kind, []).append(entry)
+        elif kind == "secrets":
+            for room, d, t in zip(chosen, room_depth, _picks(rng, kind, room_depth)):
+                entry = {"description": t["description"], "trigger": f"{t['skill']} DC {t['dc'] + d}"}
+                if "reward" in t:
+                    entry["reward"] = t["reward"]
+                entry["discovered"] = False
+                out[room["id"]].setdefault(kind, []).append(entry)
+        else:
+            flag = {"hazards": {"disarmed": False}}.get(kind, {})
+            for room, t in zip(chosen, _picks(rng, kind, room_depth)):
+                entry = copy.deepcopy(t)
+                entry.update(flag)
+                out[room["id"]].setdefault(kind, []).append(entry)
+    return {"depths": depths, "rooms": out}
+
+
+def fill_world(world, workers=None, set_depth=False):
+    """Fill every dungeon's empty room lists in place. Returns {kind: entries added}."""
+    dungeons = [l for l in world.get("locations", []) if l.get("type") == "dungeon" and l.get("rooms")]
+    results = parallel_map(fill_dungeon, [(d["id"], d) for d in dungeons], world.get("seed"), PURPOSE,
+                           workers=workers, chunksize=64)
+    ids = IdAllocator.from_world(world)
+    added = dict.fromkeys(KINDS, 0)
+    rng = None
+    for dungeon, result in zip(dungeons, results):
+        for room in dungeon["rooms"]:
+            if set_depth:
+                room["depth"] = result["depths"][room["id"]]
+            for kind, entries in result["rooms"][room["id"]].items():
+                for entry in entries:
+                    # Worker ids are unique within a dungeon; settle clashes across the world here.
+                    if "id" in entry and not ids.claim(entry["id"]):
+                        if rng is None:
+                            rng = entity_rng(world.get("seed"), "room-content-ids")
+                        entry["id"] = ids.allocate(entry["id"].split("-", 1)[0], rng)
+                room[kind] = entries
+                added[kind] += len(entries)
+    return added
+
+
+def _bench_world(world, n):
+    dungeons = [l for l in world["locations"] if l.get("type") == "dungeon" and l.get("rooms")]
+    locations = []
+    for i in range(n):
+        d = copy.deepcopy(dungeons[i % len(dungeons)])
+        d["id"] = f"dungeon-bench{i:06d}"
+        for room in d["rooms"]:
+            for kind in KINDS:
+                room[kind] = []
+        locations.append(d)
+    return {"seed": world.get("seed"), "locations": locations}
+
+
+def main():
+    args = sys.argv[1:]
+    workers = None
+    bench = None
+    out_path = None
+    set_depth = "--set-depth" in args
+    if set_depth:
+        args.remove("--set-depth")
+    for flag in ("--workers", "--bench", "--out"):
+        if flag in args:
+            i = args.index(flag)
+            value = args[i + 1]
+            del args[i:i + 2]
+            if flag == "--workers":
+                workers = int(value)
+            elif flag == "--bench":
+                bench = int(value)
+            else:
+                out_path = value
+    world_path = Path(args[0]) if args else DEFAULT_WORLD
+    with open(world_path) as f:
+        world = json.load(f)
+
+    start = time.perf_counter()
+    added = fill_world(world, workers, set_depth)
+    elapsed = time.perf_counter() - start
+    print(f"Filled {world.get('name')} in {elapsed * 1000:.0f} ms: "
+          + ", ".join(f"{n} {kind}" for kind, n in added.items()))
+    d = next(l for l in world["locations"] if l.get("type") == "dungeon" and l.get("rooms"))
+    depths = room_depths(d)
+    for room in d["rooms"]:
+        summary = ", ".join(f"{len(room.get(k, []))} {k}" for k in KINDS)
+        print(f"  depth {depths[room['id']]}  {room['name']}: {summary}")
+    if out_path:
+        with open(out_path, "w") as f:
+            json.dump(world, f, indent=2, ensure_ascii=False)
+        print(f"Wrote {out_path}")
+
+    if bench:
+        big = _bench_world(world, bench)
+        start = time.perf_counter()
+        added = fill_world(big, workers)
+        elapsed = time.perf_counter() - start
+        rooms = sum(len(d["rooms"]) for d in big["locations"])
+        print(f"Bench: {bench:,} dungeons, {rooms:,} rooms in {elapsed:.2f} s "
+              f"({sum(added.values()):,} entries, workers={workers or 1})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Python port of src/generators/SeededRandom.ts.
+
+Mulberry32 seeded from the same 31-bit string hash, so a Python script and
+the app draw identical values for the same seed string:
+
+    rng = SeededRandom(f"{world_seed}-weather-{day}")
+    rng.pick_weighted(table)   # same result as rng.pickWeighted(table) in TS
+
+Weighted tables are plain {value: weight} dicts (createWeightedTable keeps
+insertion order, and so do dicts).
+
+Usage: python3 seeded_random.py seed [n]
+"""
+
+import math
+import re
+import sys
+
+MASK32 = 0xFFFFFFFF
+
+
+def _int32(x):
+    x &= MASK32
+    return x - 0x100000000 if x & 0x80000000 else x
+
+
+def _imul(a, b):
+    return (a * b) & MASK32
+
+
+def hash_string(text):
+    """SeededRandom.hashString: Java-style 31x hash over UTF-16 code units."""
+    h = 0
+    units = text.encode("utf-16-le")
+    for i in range(0, len(units), 2):
+        h = _int32((_int32(h << 5)) - h + (units[i] | units[i + 1] << 8))
+    return abs(h) or 1
+
+
+class SeededRandom:
+    def __init__(self, seed):
+        self.state = hash_string(seed) if isinstance(seed, str) else seed
+        if self.state == 0:
+            self.state = 1
+
+    def next(self):
+        """Mulberry32: float in [0, 1)."""
+        self.state += 0x6D2B79F5
+        t = self.state & MASK32
+        t = _imul(t ^ (t >> 15), t | 1)
+        t ^= (t + _imul(t ^ (t >> 7), t | 61)) & MASK32
+        return (t ^ (t >> 14)) / 4294967296
+
+    def between(self, low, high):
+        """Integer in [low, high]."""
+        return math.floor(self.next() * (high - low + 1)) + low
+
+    def float(self, low, high):
+        return self.next() * (high - low) + low
+
+    def pick(self, items):
+        if not items:
+            raise ValueError("Cannot pick from empty array")
+        return items[int(self.next() * len(items))]
+
+    def pick_weighted(self, table):
+        roll = self.next() * sum(table.values())
+        value = None
+        for value, weight in table.items():
+            roll -= weight
+            if roll <= 0:
+                return value
+        return value
+
+    def sample(self, items, n):
+        if n >= len(items):
+            return self.shuffle(list(items))
+        pool = list(items)
+        return [pool.pop(int(self.next() * len(pool))) for _ in range(n)]
+
+    def shuffle(self, items):
+        for i in range(len(items) - 1, 0, -1):
+            j = int(self.next() * (i + 1))
+            items[i], items[j] = items[j], items[i]
+        return items
+
+    def chance(self, probability):
+        return self.next() < probability
+
+    def roll(self, dice):
+        m = re.fullmatch(r"(\d+)d(\d+)", dice)
+        if not m:
+            raise ValueError(f"Invalid dice format: {dice}")
+        count, sides = int(m.group(1)), int(m.group(2))
+        return sum(self.between(1, sides) for _ in range(count))
+
+    def child(self, suffix):
+        return SeededRandom(f"{self.state}-{suffix}")
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        return
+    rng = SeededRandom(sys.argv[1])
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    for _ in range(n):
+        print(rng.next())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,478 @@
+#!/usr/bin/env python3
+"""
+Generate settlement geometry (center, radius, wards, streets, plaza) from
+size and population, in the same vertex format the app writes.
+
+Port of the street-first layout in src/generators/StreetFirstTownGenerator.ts
+and TownLayoutEngine.ts, with one change: every block between streets
+becomes its own ward polygon instead of one bounding-box ward.
+
+  1. Size.  SIZE_CONFIG gives the base radius, street counts and building
+     sizes. Population sets the number of houses (PEOPLE_PER_BUILDING),
+     and the town grows past the base radius, with more streets at the same
+     block spacing, when the houses would not fit.
+  2. Streets.  Rough east-west main streets and north-south cross streets
+     with a little wobble; the middle cross street is a main street. Large
+     blocks in towns and cities get an alley down the middle.
+  3. Wards.  Each block is the quad between its four bounding lines, inset
+     by half the street width. Wards next to the plaza are markets; each
+     site claims the nearest free ward of its SITE_TO_WARD type, and the
+     rest are residential, craftsmen or slum.
+  4. Lots.  Each ward is cut into a grid of lots. Villages build only on
+     the street-facing ring; towns and cities build on every row but the
+     alley. All lots of all wards go into flat lists (centers, sizes,
+     angles, random draws); the kept lots are grouped by shape class, and
+     each class's vertices come from one pass over its own index list.
+  5. Landmarks.  Each site gets the lot in its ward nearest the plaza, as
+     linkSitesToBuildings does in the app; with no sites, numLandmarks
+     lots get LANDMARK_TYPES names.
+
+    geometry = generate_geometry("city", 12000, rng, sites=settlement["sites"])
+    apply_geometry(settlement, geometry)   # keeps npcIds on landmarks and houses
+
+Usage: python3 settlement_geometry.py [world.hexbinder.json] [--name SETTLEMENT]
+           [--out PATH] [--bench POPULATION]
+"""
+
+import json
+import math
+import random
+import sys
+import time
+from pathlib import Path
+
+from rng_streams import entity_rng
+
+BASE = Path(__file__).parent
+DEFAULT_WORLD = BASE / "obojima_final.hexbinder.json"
+
+PURPOSE = "settlement-geometry"
+
+# From StreetFirstTownGenerator.ts SIZE_CONFIG.
+SIZE_CONFIG = {
+    "thorpe": {"radius": 45, "mainStreets": 1, "crossStreets": 1, "buildingWidth": (8, 13), "buildingDepth": (6, 10), "numLandmarks": 2},
+    "hamlet": {"radius": 65, "mainStreets": 2, "crossStreets": 2, "buildingWidth": (8, 14), "buildingDepth": (6, 11), "numLandmarks": 3},
+    "village": {"radius": 90, "mainStreets": 2, "crossStreets": 3, "buildingWidth": (9, 15), "buildingDepth": (7, 12), "numLandmarks": 4},
+    "town": {"radius": 120, "mainStreets": 3, "crossStreets": 4, "buildingWidth": (10, 16), "buildingDepth": (8, 13), "numLandmarks": 8},
+    "city": {"radius": 160, "mainStreets": 4, "crossStreets": 5, "buildingWidth": (10, 18), "buildingDepth": (8, 14), "numLandmarks": 12},
+}
+DENSE_SIZES = ("town", "city")
+
+# Residents per building; town and city houses are taller and shared.
+PEOPLE_PER_BUILDING = {"thorpe": 5, "hamlet": 5, "village": 5, "town": 8, "city": 10}
+
+# Half the corridor width of each street type (overlapsStreet in the app).
+STREET_HALF_WIDTH = {"main": 5, "side": 3.5, "alley": 2.5, None: 0}
+
+PLAZA_SIZE = 12
+
+LANDMARK_TYPES = [
+    ("Temple", "⛪"), ("Tavern", "🍺"), ("Market", "🏪"), ("Town Hall", "🏛️"),
+    ("Blacksmith", "⚒️"), ("Inn", "🛏️"), ("General Store", "🏪"), ("Noble Estate", "🏰"),
+    ("Tavern", "🍺"), ("Inn", "🛏️"), ("Temple", "⛪"), ("Market", "🏪"),
+]
+
+# From linkSitesToBuildings and SITE_TO_WARD in TownLayoutEngine.ts.
+SITE_ICONS = {
+    "temple": "⛪", "tavern": "🍺", "market": "🏪", "guild_hall": "🏛️", "blacksmith": "⚒️",
+    "inn": "🏨", "general_store": "🏪", "noble_estate": "🏰",
+}
+SITE_TO_WARD = {
+    "tavern": "tavern", "inn": "tavern", "temple": "temple", "shrine": "temple", "market": "market",
+    "blacksmith": "craftsmen", "armorer": "craftsmen", "fletcher": "craftsmen",
+    "general_store": "merchant", "stables": "merchant", "town_hall": "castle", "barracks": "castle",
+    "jail": "castle", "guild_hall": "craftsmen", "noble_estate": "castle",
+}
+FILL_WARD_TYPES = (("residential", 50), ("craftsmen", 30), ("slum", 20))
+
+NANOID_CHARS = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_-"
+
+
+def _nanoid(rng):
+    return "".join(rng.choices(NANOID_CHARS, k=21))
+
+
+def _pt(x, y):
+    return {"x": x, "y": y}
+
+
+# -- Streets and wards -----------------------------------------------------------
+
+def _street_count(base, extent, spacing):
+    return max(base, round(extent / spacing) - 1)
+
+
+def _lines(lo, hi, count, rng):
+    """(position, wobble at start, wobble at end) of `count` rough lines spread between lo and hi."""
+    out = []
+    for i in range(count):
+        base = lo + (hi - lo) * (i + 1) / (count + 1)
+        mid = base + (rng.random() - 0.5) * 20
+        w1 = (rng.random() - 0.5) * 15
+        w2 = (rng.random() - 0.5) * 15
+        out.append((mid, w1, w2))
+    return out
+
+
+def _cross(h, v):
+    """Intersection of y = a + b * x and x = c + d * y."""
+    a, b = h
+    c, d = v
+    y = (a + b * c) / (1 - b * d)
+    return c + d * y, y
+
+
+def _inset(corners, insets):
+    """Move each edge of a quad (TL, TR, BR, BL) inward; insets are (top, right, bottom, left)."""
+    (tlx, tly), (trx, try_), (brx, bry), (blx, bly) = corners
+    top, right, bottom, left = insets
+    return [(tlx + left, tly + top), (trx - right, try_ + top), (brx - right, bry - bottom), (blx + left, bly - bottom)]
+
+
+def _plan(size, population, rng, grow=1.0):
+    """Bounds, street lines and ward quads for a settlement, its radius scaled by grow."""
+    cfg = SIZE_CONFIG[size]
+    houses = max(cfg["numLandmarks"] + 4, math.ceil(population / PEOPLE_PER_BUILDING[size]))
+    (wmin, wmax), (dmin, dmax) = cfg["buildingWidth"], cfg["buildingDepth"]
+    gap = 2 if size in DENSE_SIZES else 4
+    lot_area = ((wmin + wmax) / 2 + gap) * ((dmin + dmax) / 2 + gap)
+    # Share of a block that ends up as building lots: street-facing ring only
+    # in villages, almost all of it in towns.
+    coverage = 0.55 if size in DENSE_SIZES else 0.3
+    radius = max(cfg["radius"], math.sqrt(houses * lot_area / coverage) / 2) * grow
+    spacing_y = 2 * cfg["radius"] / (cfg["mainStreets"] + 1)
+    spacing_x = 2 * cfg["radius"] / (cfg["crossStreets"] + 1)
+
+    min_x, max_x, min_y, max_y = (s * radius * (0.9 + rng.random() * 0.2) for s in (-1, 1, -1, 1))
+    n_main = _street_count(cfg["mainStreets"], max_y - min_y, spacing_y)
+    n_cross = _street_count(cfg["crossStreets"], max_x - min_x, spacing_x)
+
+    streets = []
+    h_lines = [((min_y, 0.0), None)]
+    for mid, w1, w2 in _lines(min_y, max_y, n_main, rng):
+        y0, y1 = mid + w1, mid + w2
+        slope = (y1 - y0) / (max_x - min_x)
+        h_lines.append(((y0 - slope * min_x, slope), "main"))
+        streets.append({"id": _nanoid(rng), "waypoints": [_pt(min_x, y0), _pt(max_x, y1)], "width": "main"})
+    h_lines.append(((max_y, 0.0), None))
+    v_lines = [((min_x, 0.0), None)]
+    for i, (mid, w1, w2) in enumerate(_lines(min_x, max_x, n_cross, rng)):
+        x0, x1 = mid + w1, mid + w2
+        slope = (x1 - x0) / (max_y - min_y)
+        width = "main" if i == n_cross // 2 else "side"
+        v_lines.append(((x0 - slope * min_y, slope), width))
+        streets.append({"id": _nanoid(rng), "waypoints": [_pt(x0, min_y), _pt(x1, max_y)], "width": width})
+    v_lines.append(((max_x, 0.0), None))
+
+    blocks = []
+    for i in range(len(h_lines) - 1):
+        (top, top_w), (bottom, bottom_w) = h_lines[i], h_lines[i + 1]
+        for j in range(len(v_lines) - 1):
+            (left, left_w), (right, right_w) = v_lines[j], v_lines[j + 1]
+            corners = [_cross(top, left), _cross(top, right), _cross(bottom, right), _cross(bottom, left)]
+            insets = [STREET_HALF_WIDTH[w] for w in (top_w, right_w, bottom_w, left_w)]
+            blocks.append(_inset(corners, insets))
+
+    inner = [_cross(h, v) for h, _ in h_lines[1:-1] for v, _ in v_lines[1:-1]]
+    plaza_center = min(inner, key=lambda p: p[0] ** 2 + p[1] ** 2)
+    return {
+        "radius": radius, "houses": houses, "gap": gap, "blocks": blocks, "streets": streets,
+        "plaza": plaza_center, "bounds": (min_x, min_y, max_x, max_y),
+    }
+
+
+def _assign_ward_types(blocks, plaza, sites, rng):
+    """Ward type per block and {site id: block index}."""
+    px, py = plaza
+    centroids = [(sum(x for x, _ in b) / 4, sum(y for _, y in b) / 4) for b in blocks]
+    order = sorted(range(len(blocks)), key=lambda i: (centroids[i][0] - px) ** 2 + (centroids[i][1] - py) ** 2)
+    types = [None] * len(blocks)
+    # The blocks touching the plaza's intersection form the market.
+    for i in order[:2 if len(blocks) > 4 else 1]:
+        types[i] = "market"
+    site_block = {}
+    for site in sites:
+        want = SITE_TO_WARD.get(site.get("type"), "residential")
+        free = [i for i in order if types[i] in (None, want)]
+        if free:
+            i = next((i for i in free if types[i] == want), free[0])
+            types[i] = want
+            site_block[site["id"]] = i
+    names, weights = zip(*FILL_WARD_TYPES)
+    for i in order:
+        if types[i] is None:
+            types[i] = rng.choices(names, weights)[0]
+    return types, site_block
+
+
+# -- Lots and buildings ------------------------------------------------------------
+
+def _lots(plan, size, rng):
+    """Flat lot lists over every block: ward index, center, size, angle."""
+    cfg = SIZE_CONFIG[size]
+    (wmin, wmax), (dmin, dmax) = cfg["buildingWidth"], cfg["buildingDepth"]
+    gap = plan["gap"]
+    pitch_u = (wmin + wmax) / 2 + gap
+    pitch_v = (dmin + dmax) / 2 + gap
+    dense = size in DENSE_SIZES
+    px, py = plan["plaza"]
+    half_x, half_y = PLAZA_SIZE + gap, PLAZA_SIZE * 0.8 + gap
+
+    ward, cx, cy, cell_u, cell_v, angle = [], [], [], [], [], []
+    alleys = []
+    for b, ((x0, y0), (x1, y1), (x2, y2), (x3, y3)) in enumerate(plan["blocks"]):
+        width = (math.hypot(x1 - x0, y1 - y0) + math.hypot(x2 - x3, y2 - y3)) / 2
+        height = (math.hypot(x3 - x0, y3 - y0) + math.hypot(x2 - x1, y2 - y1)) / 2
+        nu, nv = int(width // pitch_u), int(height // pitch_v)
+        if nu < 1 or nv < 1:
+            continue
+        alley = nv // 2 if dense and nv >= 5 else None
+        if alley is not None:
+            ax0, ay0 = x0 + (x3 - x0) * (alley + 0.5) / nv, y0 + (y3 - y0) * (alley + 0.5) / nv
+            ax1, ay1 = x1 + (x2 - x1) * (alley + 0.5) / nv, y1 + (y2 - y1) * (alley + 0.5) / nv
+            alleys.append({"id": _nanoid(rng), "waypoints": [_pt(ax0, ay0), _pt(ax1, ay1)], "width": "alley"})
+        top = math.atan2(y1 - y0, x1 - x0)
+        bottom = math.atan2(y2 - y3, x2 - x3)
+        du, dv = width / nu, height / nv
+        for l in range(nv):
+            if l == alley:
+                continue
+            edge_row = l == 0 or l == nv - 1 or (alley is not None and abs(l - alley) == 1)
+            cols = range(nu) if dense or edge_row else sorted({0, nu - 1})
+            v = (l + 0.5) / nv
+            lx0, ly0 = x0 + (x3 - x0) * v, y0 + (y3 - y0) * v
+            lx1, ly1 = x1 + (x2 - x1) * v, y1 + (y2 - y1) * v
+            row_angle = top if v < 0.5 else bottom
+            for k in cols:
+                u = (k + 0.5) / nu
+                x, y = lx0 + (lx1 - lx0) * u, ly0 + (ly1 - ly0) * u
+                if abs(x - px) < half_x + du / 2 and abs(y - py) < half_y + dv / 2:
+                    continue
+                ward.append(b)
+                cx.append(x)
+                cy.append(y)
+                # Lots on a side column of a non-street row face the cross street.
+                turned = not edge_row and k in (0, nu - 1)
+                cell_u.append(dv if turned else du)
+                cell_v.append(du if turned else dv)
+                angle.append(row_angle + (math.pi / 2 if turned else 0))
+    return {"ward": ward, "x": cx, "y": cy, "u": cell_u, "v": cell_v, "angle": angle}, alleys
+
+
+def _l_vertices(x, y, hw, hd, c, s, cut_w, cut_d, corner):
+    """createLShape: a rectangle with one corner notched out."""
+    if corner == 0:
+        local = [(-hw + cut_w, -hd), (hw, -hd), (hw, hd), (-hw, hd), (-hw, -hd + cut_d), (-hw + cut_w, -hd + cut_d)]
+    elif corner == 1:
+        local = [(-hw, -hd), (hw - cut_w, -hd), (hw - cut_w, -hd + cut_d), (hw, -hd + cut_d), (hw, hd), (-hw, hd)]
+    elif corner == 2:
+        local = [(-hw, -hd), (hw, -hd), (hw, hd - cut_d), (hw - cut_w, hd - cut_d), (hw - cut_w, hd), (-hw, hd)]
+    else:
+        local = [(-hw, -hd), (hw, -hd), (hw, hd), (-hw + cut_w, hd), (-hw + cut_w, hd - cut_d), (-hw, hd - cut_d)]
+    return [_pt(x + c * lx - s * ly, y + s * lx + c * ly) for lx, ly in local]
+
+
+_UNIT_CIRCLE = [(math.cos(i * math.pi / 6), math.sin(i * math.pi / 6)) for i in range(12)]
+
+
+def _buildings(lots, keep, landmark_size, size, rng):
+    """Vertex lists for the kept lots, built shape class by shape class."""
+    cfg = SIZE_CONFIG[size]
+    wmax, dmax = cfg["buildingWidth"][1], cfg["buildingDepth"][1]
+    n = len(keep)
+    draws = [rng.random() for _ in range(5 * n)]
+    xs = [lots["x"][i] for i in keep]
+    ys = [lots["y"][i] for i in keep]
+    angles = [lots["angle"][i] + (r - 0.5) * 0.15 for i, r in zip(keep, draws[0:n])]
+    cos = list(map(math.cos, angles))
+    sin = list(map(math.sin, angles))
+    fill_w = [1.0 if big else 0.7 + 0.2 * r for big, r in zip(landmark_size, draws[n:2 * n])]
+    fill_d = [1.0 if big else 0.6 + 0.3 * r for big, r in zip(landmark_size, draws[2 * n:3 * n])]
+    hw = [min(lots["u"][i] - 2, wmax * 1.3) * f / 2 for i, f in zip(keep, fill_w)]
+    hd = [min(lots["v"][i] - 2, dmax * 1.3) * f / 2 for i, f in zip(keep, fill_d)]
+    shape = draws[3 * n:4 * n]
+    extra = draws[4 * n:]
+
+    # Shape distribution as in the app: 10% round, 20% L, 30% square, 40% rectangle.
+    # Landmarks are always full rectangles.
+    rolls = [1.0 if big else r for big, r in zip(landmark_size, shape)]
+    rounds = [j for j, r in enumerate(rolls) if r < 0.1]
+    ells = [j for j, r in enumerate(rolls) if 0.1 <= r < 0.3]
+    squares = [j for j, r in enumerate(rolls) if 0.3 <= r < 0.6]
+    rects = [j for j, r in enumerate(rolls) if r >= 0.6]
+
+    out = [None] * n
+    radii = [min(hw[j], hd[j]) for j in rounds]
+    for j, r in zip(rounds, radii):
+        x, y = xs[j], ys[j]
+        out[j] = [_pt(x + r * ux, y + r * uy) for ux, uy in _UNIT_CIRCLE]
+
+    for j in ells:
+        e = extra[j]
+        out[j] = _l_vertices(xs[j], ys[j], hw[j], hd[j], cos[j], sin[j],
+                             hw[j] * (0.4 + 0.2 * e), hd[j] * (0.6 - 0.2 * e), int(e * 4))
+
+    # Squares are rectangles with both half sides at the shorter one.
+    boxes = squares + rects
+    bw = [min(hw[j], hd[j]) for j in squares] + [hw[j] for j in rects]
+    bd = [min(hw[j], hd[j]) for j in squares] + [hd[j] for j in rects]
+    cw = [cos[j] * w for j, w in zip(boxes, bw)]
+    sw = [sin[j] * w for j, w in zip(boxes, bw)]
+    cd = [cos[j] * d for j, d in zip(boxes, bd)]
+    sd = [sin[j] * d for j, d in zip(boxes, bd)]
+    for j, a, b, c, d in zip(boxes, cw, sw, cd, sd):
+        x, y = xs[j], ys[j]
+        out[j] = [_pt(x - a + d, y - b - c), _pt(x + a + d, y + b - c), _pt(x + a - d, y + b + c), _pt(x - a - d, y - b + c)]
+    return out
+
+
+# -- Whole settlement ----------------------------------------------------------------
+
+def generate_geometry(size, population, rng, sites=()):
+    """{center, radius, wards, streets, plaza} for a settlement of this size and population."""
+    # The coverage estimate in _plan can fall short once the plaza and
+    # street wobble take their share; re-plan wider until every house and
+    # landmark has a lot.
+    n_landmarks = len(sites) if sites else SIZE_CONFIG[size]["numLandmarks"]
+    grow = 1.0
+    while True:
+        plan = _plan(size, population, rng, grow)
+        types, site_block = _assign_ward_types(plan["blocks"], plan["plaza"], sites, rng)
+        lots, alleys = _lots(plan, size, rng)
+        n_lots = len(lots["x"])
+        need = plan["houses"] + n_landmarks
+        if n_lots >= need:
+            break
+        grow *= math.sqrt(need / max(n_lots, 1)) * 1.02
+    px, py = plan["plaza"]
+    dist = [(x - px) ** 2 + (y - py) ** 2 for x, y in zip(lots["x"], lots["y"])]
+
+    # Landmarks: each site takes the lot of its ward nearest the plaza.
+    by_ward = {}
+    for i in sorted(range(n_lots), key=dist.__getitem__):
+        by_ward.setdefault(lots["ward"][i], []).append(i)
+    landmarks = {}
+    if sites:
+        for site in sites:
+            b = site_block.get(site["id"])
+            candidates = by_ward.get(b) or next((v for v in by_ward.values() if v), [])
+            if candidates:
+                landmarks[candidates.pop(0)] = {
+                    "type": "landmark", "siteId": site["id"], "name": site.get("name"),
+                    "icon": SITE_ICONS.get(site.get("type"), "🏠"),
+                }
+    else:
+        wards_near = sorted(by_ward, key=lambda b: dist[by_ward[b][0]] if by_ward[b] else math.inf)
+        for (name, icon), b in zip(LANDMARK_TYPES[:SIZE_CONFIG[size]["numLandmarks"]], wards_near):
+            if by_ward[b]:
+                landmarks[by_ward[b].pop(0)] = {"type": "landmark", "name": name, "icon": icon}
+
+    # Houses: exactly plan["houses"] of the remaining lots, drawn in one batch.
+    free = [i for i in range(n_lots) if i not in landmarks]
+    keep = sorted(set(landmarks).union(rng.sample(free, min(plan["houses"], len(free)))))
+    shapes = _buildings(lots, keep, [i in landmarks for i in keep], size, rng)
+
+    wards = [{"id": _nanoid(rng), "type": t, "shape": {"vertices": [_pt(x, y) for x, y in block]}, "buildings": []}
+             for t, block in zip(types, plan["blocks"])]
+    for i, vertices in zip(keep, shapes):
+        building = {"id": _nanoid(rng), "shape": {"vertices": vertices}}
+        building.update(landmarks.get(i) or {"type": "house"})
+        wards[lots["ward"][i]]["buildings"].append(building)
+    for ward in wards:
+        site = next((b.get("siteId") for b in ward["buildings"] if b.get("siteId")), None)
+        if site:
+            ward["siteId"] = site
+
+    h, hv = PLAZA_SIZE, PLAZA_SIZE * 0.8
+    plaza = {"vertices": [_pt(px - h, py - hv), _pt(px + h, py - hv), _pt(px + h, py + hv), _pt(px - h, py + hv)]}
+    return {
+        "center": _pt(0, 0),
+        "radius": round(plan["radius"]),
+        "wards": wards,
+        "streets": plan["streets"] + alleys,
+        "plaza": plaza,
+    }
+
+
+def apply_geometry(settlement, geometry):
+    """Replace a settlement's geometry, moving npcIds onto the new buildings."""
+    old = [b for w in settlement.get("wards", []) for b in w.get("buildings", [])]
+    by_site = {b["siteId"]: b.get("npcIds", []) for b in old if b.get("siteId") and b.get("npcIds")}
+    house_npcs = [b["npcIds"] for b in old if not b.get("siteId") and b.get("npcIds")]
+    new = [b for w in geometry["wards"] for b in w["buildings"]]
+    for b in new:
+        if b.get("siteId") in by_site:
+            b["npcIds"] = by_site.pop(b["siteId"])
+    # Residents of landmarks whose site got no building move into houses.
+    house_npcs += list(by_site.values())
+    houses = [b for b in new if b["type"] == "house"]
+    for b, npcs in zip(houses, house_npcs):
+        b["npcIds"] = npcs
+    # More households than houses: double them up from the start.
+    for i, npcs in enumerate(house_npcs[len(houses):]):
+        if houses:
+            houses[i % len(houses)]["npcIds"] = houses[i % len(houses)].get("npcIds", []) + npcs
+    for key in ("center", "radius", "wards", "streets", "plaza"):
+        settlement[key] = geometry[key]
+    settlement.pop("wall", None)
+
+
+def settlement_geometry(settlement, world_seed):
+    rng = entity_rng(world_seed, settlement["id"], PURPOSE)
+    return generate_geometry(settlement.get("size", "village"), settlement.get("population", 0), rng,
+                             settlement.get("sites", []))
+
+
+def summarize(geometry):
+    buildings = [b for w in geometry["wards"] for b in w["buildings"]]
+    landmarks = sum(1 for b in buildings if b["type"] == "landmark")
+    return (f"radius {geometry['radius']}, {len(geometry['wards'])} wards, {len(buildings)} buildings "
+            f"({landmarks} landmarks), {len(geometry['streets'])} streets")
+
+
+def main():
+    args = sys.argv[1:]
+    name = None
+    out_path = None
+    bench = None
+    for flag in ("--name", "--out", "--bench"):
+        if flag in args:
+            i = args.index(flag)
+            value = args[i + 1]
+            del args[i:i + 2]
+            if flag == "--name":
+                name = value.lower()
+            elif flag == "--out":
+                out_path = value
+            else:
+                bench = int(value)
+    world_path = Path(args[0]) if args else DEFAULT_WORLD
+    with open(world_path) as f:
+        world = json.load(f)
+
+    settlements = [l for l in world["locations"] if l.get("type") == "settlement"]
+    if name:
+        settlements = [s for s in settlements if s["name"].lower().startswith(name)]
+    for s in settlements:
+        start = time.perf_counter()
+        geometry = settlement_geometry(s, world.get("seed"))
+        elapsed = time.perf_counter() - start
+        print(f"{s['name']} ({s.get('size')}, pop {s.get('population')}): {summarize(geometry)} "
+              f"in {elapsed * 1000:.1f} ms")
+        if out_path:
+            apply_geometry(s, geometry)
+    if out_path:
+        with open(out_path, "w") as f:
+            json.dump(world, f, indent=2, ensure_ascii=False)
+        print(f"Wrote {out_path}")
+
+    if bench:
+        rng = random.Random(0)
+        start = time.perf_counter()
+        geometry = generate_geometry("city", bench, rng)
+        elapsed = time.perf_counter() - start
+        print(f"Bench: city of {bench:,}: {summarize(geometry)} in {elapsed * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
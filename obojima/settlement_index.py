@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+Uniform-grid spatial index over settlement geometry.
+
+Indexes every ward polygon, building polygon and street polyline of a
+settlement so tooling can answer point, box and nearest-neighbor queries
+without scanning every shape. Indexes are persisted next to the world file
+(<world>.spatial.pkl) and rebuilt only for settlements whose geometry changed.
+
+Usage: python3 settlement_index.py [world.hexbinder.json]
+"""
+
+import hashlib
+import heapq
+import json
+import math
+import pickle
+import random
+import sys
+import time
+from pathlib import Path
+
+BASE = Path(__file__).parent
+DEFAULT_WORLD = BASE / "obojima_final.hexbinder.json"
+
+INDEX_VERSION = 1
+
+
+# -- Geometry helpers --------------------------------------------------------
+
+def _points(vertices):
+    return [(v["x"], v["y"]) for v in vertices]
+
+
+def _bbox(pts):
+    xs = [p[0] for p in pts]
+    ys = [p[1] for p in pts]
+    return (min(xs), min(ys), max(xs), max(ys))
+
+
+def point_in_polygon(x, y, pts):
+    """Even-odd ray cast. Points on an edge may fall either side."""
+    inside = False
+    j = len(pts) - 1
+    for i in range(len(pts)):
+        xi, yi = pts[i]
+        xj, yj = pts[j]
+        if (yi > y) != (yj > y) and x < (xj - xi) * (y - yi) / (yj - yi) + xi:
+            inside = not inside
+        j = i
+    return inside
+
+
+def _segment_dist2(x, y, ax, ay, bx, by):
+    dx, dy = bx - ax, by - ay
+    length2 = dx * dx + dy * dy
+    if length2 == 0:
+        t = 0.0
+    else:
+        t = max(0.0, min(1.0, ((x - ax) * dx + (y - ay) * dy) / length2))
+    px, py = ax + t * dx - x, ay + t * dy - y
+    return px * px + py * py
+
+
+def _polyline_dist(x, y, pts, closed):
+    n = len(pts)
+    if n == 1:
+        return math.hypot(pts[0][0] - x, pts[0][1] - y)
+    best = math.inf
+    last = n if closed else n - 1
+    for i in range(last):
+        ax, ay = pts[i]
+        bx, by = pts[(i + 1) % n]
+        d = _segment_dist2(x, y, ax, ay, bx, by)
+        if d < best:
+            best = d
+    return math.sqrt(best)
+
+
+def _box_overlaps(a, b):
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+
+def geometry_hash(settlement):
+    """Stable hash of the parts of a settlement the index is built from."""
+    payload = json.dumps(
+        [settlement.get("wards", []), settlement.get("streets", [])],
+        sort_keys=True, separators=(",", ":"),
+    )
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+# -- Index -------------------------------------------------------------------
+
+class SettlementIndex:
+    """Grid index for one settlement.
+
+    Items are stored as tuples ``(kind, id, ward_id, bbox, points)`` where
+    kind is "building", "ward" or "street". Query results are item dicts
+    with those keys plus ``distance`` for nearest-neighbor queries.
+    """
+
+    def __init__(self, settlement, cell_size=None):
+        self.settlement_id = settlement["id"]
+        self.geometry_hash = geometry_hash(settlement)
+        self.items = []
+
+        for ward in settlement.get("wards", []):
+            shape = ward.get("shape", {}).get("vertices")
+            if shape:
+                pts = _points(shape)
+                self.items.append(("ward", ward["id"], ward["id"], _bbox(pts), pts))
+            for b in ward.get("buildings", []):
+                verts = b.get("shape", {}).get("vertices")
+                if verts:
+                    pts = _points(verts)
+                    self.items.append(("building", b["id"], ward["id"], _bbox(pts), pts))
+        for street in settlement.get("streets", []):
+            if street.get("waypoints"):
+                pts = _points(street["waypoints"])
+                self.items.append(("street", street["id"], None, _bbox(pts), pts))
+
+        if self.items:
+            self.bounds = (
+                min(i[3][0] for i in self.items), min(i[3][1] for i in self.items),
+                max(i[3][2] for i in self.items), max(i[3][3] for i in self.items),
+            )
+        else:
+            self.bounds = (0.0, 0.0, 0.0, 0.0)
+
+        self.cell_size = cell_size or self._pick_cell_size()
+        self.cells = {}
+        for idx, item in enumerate(self.items):
+            for cell in self._cells_for_box(item[3]):
+                self.cells.setdefault(cell, []).append(idx)
+
+    def _pick_cell_size(self):
+        # Size cells to roughly one building so point lookups touch few items.
+        spans = [
+            max(b[2] - b[0], b[3] - b[1])
+            for kind, _, _, b, _ in self.items if kind == "building"
+        ]
+        if spans:
+            spans.sort()
+            return max(spans[len(spans) // 2] * 2.0, 1.0)
+        width = self.bounds[2] - self.bounds[0]
+        height = self.bounds[3] - self.bounds[1]
+        return max(width, height, 1.0) / 8.0
+
+    def _cell(self, x, y):
+        return (math.floor(x / self.cell_size), math.floor(y / self.cell_size))
+
+    def _cells_for_box(self, box):
+        x0, y0 = self._cell(box[0], box[1])
+        x1, y1 = self._cell(box[2], box[3])
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                yield (cx, cy)
+
+    def _result(self, idx, distance=None):
+        kind, item_id, ward_id, bbox, _ = self.items[idx]
+        result = {"kind": kind, "id": item_id, "wardId": ward_id, "bbox": bbox}
+        if distance is not None:
+            result["distance"] = distance
+        return result
+
+    def _distance(self, idx, x, y):
+        kind, _, _, _, pts = self.items[idx]
+        if kind == "street":
+            return _polyline_dist(x, y, pts, closed=False)
+        if point_in_polygon(x, y, pts):
+            return 0.0
+        return _polyline_dist(x, y, pts, closed=True)
+
+    def query_point(self, x, y, kinds=("building", "ward")):
+        """Polygons containing (x, y). Buildings come before wards."""
+        hits = []
+        for idx in self.cells.get(self._cell(x, y), ()):
+            kind, _, _, b, pts = self.items[idx]
+            if kind not in kinds or kind == "street":
+                continue
+            if b[0] <= x <= b[2] and b[1] <= y <= b[3] and point_in_polygon(x, y, pts):
+                hits.append(idx)
+        hits.sort(key=lambda i: self.items[i][0] != "building")
+        return [self._result(i) for i in hits]
+
+    def query_box(self, min_x, min_y, max_x, max_y, kinds=("building", "ward", "street")):
+        """Items whose bounding box overlaps the query box."""
+        box = (min_x, min_y, max_x, max_y)
+        seen = set()
+        hits = []
+        for cell in self._cells_for_box(box):
+            for idx in self.cells.get(cell, ()):
+                if idx in seen:
+                    continue
+                seen.add(idx)
+                item = self.items[idx]
+                if item[0] in kinds and _box_overlaps(item[3], box):
+                    hits.append(idx)
+        return [self._result(i) for i in sorted(hits)]
+
+    def nearest(self, x, y, k=1, kinds=("building",)):
+        """The k items closest to (x, y), nearest first.
+
+        Searches outward ring by ring over grid cells and stops once no
+        unvisited cell can hold anything closer than the current k-th best.
+        """
+        if not self.items:
+            return []
+        cx, cy = self._cell(x, y)
+        bx0, by0 = self._cell(self.bounds[0], self.bounds[1])
+        bx1, by1 = self._cell(self.bounds[2], self.bounds[3])
+        max_ring = max(abs(cx - bx0), abs(cx - bx1), abs(cy - by0), abs(cy - by1))
+
+        best = []  # max-heap of (-distance, idx)
+        seen = set()
+        ring = 0
+        while ring <= max_ring:
+            for cell in _ring_cells(cx, cy, ring):
+                for idx in self.cells.get(cell, ()):
+                    if idx in seen or self.items[idx][0] not in kinds:
+                        continue
+                    seen.add(idx)
+                    d = self._distance(idx, x, y)
+                    if len(best) < k:
+                        heapq.heappush(best, (-d, idx))
+                    elif d < -best[0][0]:
+                        heapq.heapreplace(best, (-d, idx))
+            # Every cell outside this ring is at least ring * cell_size away.
+            if len(best) == k and -best[0][0] <= ring * self.cell_size:
+                break
+            ring += 1
+        return [self._result(idx, -negd) for negd, idx in sorted(best, reverse=True)]
+
+
+def _ring_cells(cx, cy, ring):
+    if ring == 0:
+        yield (cx, cy)
+        return
+    for dx in range(-ring, ring + 1):
+        yield (cx + dx, cy - ring)
+        yield (cx + dx, cy + ring)
+    for dy in range(-ring + 1, ring):
+        yield (cx - ring, cy + dy)
+        yield (cx + ring, cy + dy)
+
+
+# -- World-level build / persistence -----------------------------------------
+
+def index_path(world_path):
+    world_path = Path(world_path)
+    return world_path.with_name(world_path.name.replace(".json", "") + ".spatial.pkl")
+
+
+def build_world_index(world, previous=None):
+    """Index every settlement with geometry, reusing unchanged entries."""
+    previous = previous or {}
+    indexes = {}
+    for loc in world.get("locations", []):
+        if loc.get("type") != "settlement" or not loc.get("wards"):
+            continue
+        old = previous.get(loc["id"])
+        if old is not None and old.geometry_hash == geometry_hash(loc):
+            indexes[loc["id"]] = old
+        else:
+            indexes[loc["id"]] = SettlementIndex(loc)
+    return indexes
+
+
+def save_index(path, indexes):
+    # Store plain state rather than instances so the pickle loads no matter
+    # which script (or __main__) created it.
+    state = {sid: vars(idx) for sid, idx in indexes.items()}
+    with open(path, "wb") as f:
+        pickle.dump({"version": INDEX_VERSION, "indexes": state}, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def load_index(path):
+    try:
+        with open(path, "rb") as f:
+            payload = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return {}
+    if payload.get("version") != INDEX_VERSION:
+        return {}
+    indexes = {}
+    for sid, state in payload["indexes"].items():
+        idx = SettlementIndex.__new__(SettlementIndex)
+        idx.__dict__.update(state)
+        indexes[sid] = idx
+    return indexes
+
+
+def load_or_build(world_path, world=None):
+    """Load the persisted index for a world file, refreshing stale settlements."""
+    if world is None:
+        with open(world_path) as f:
+            world = json.load(f)
+    path = index_path(world_path)
+    previous = load_index(path)
+    indexes = build_world_index(world, previous)
+    if indexes.keys() != previous.keys() or any(indexes[k] is not previous[k] for k in indexes):
+        save_index(path, indexes)
+    return indexes
+
+
+def main():
+    world_path = Path(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_WORLD
+    with open(world_path) as f:
+        world = json.load(f)
+
+    start = time.perf_counter()
+    indexes = load_or_build(world_path, world)
+    elapsed = time.perf_counter() - start
+    print(f"Indexed {len(indexes)} settlements in {elapsed * 1000:.1f} ms -> {index_path(world_path).name}")
+
+    rng = random.Random(0)
+    for sid, idx in indexes.items():
+        x0, y0, x1, y1 = idx.bounds
+        points = [(rng.uniform(x0, x1), rng.uniform(y0, y1)) for _ in range(2000)]
+        start = time.perf_counter()
+        for x, y in points:
+            idx.query_point(x, y)
+            idx.nearest(x, y)
+        rate = len(points) / (time.perf_counter() - start)
+        buildings = sum(1 for i in idx.items if i[0] == "building")
+        print(f"  {sid}: {buildings} buildings, {len(idx.cells)} cells, {rate:,.0f} point+nearest lookups/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,8 @@ import json
 import copy
 from pathlib import Path
 
+from calendar_engine import cycle_events
+
 INPUT = Path("/Users/dmccord/Projects/vibeCode/hexbinder/temp/obojima.hexbinder.json")
 OUTPUT = Path("/Users/dmccord/Projects/vibeCode/hexbinder/temp/obojima_core.json")
 NPC_MAP_OUTPUT = Path("/Users/dmccord/Projects/vibeCode/hexbinder/temp/npc_settlement_map.json")
@@ -441,22 +443,15 @@ def main():
         {"type": "arrival", "description": "AHA researchers pass through Toggle", "linkedLocationId": "settlement-kCsR6cxU"},
     ]
 
-    event_counter = 1
-    pool_idx = 0
+    # Events cycle through the pool three a day; any day can be computed directly.
+    day_events = cycle_events(event_pool, per_day=3)
     calendar = data["state"]["calendar"]
 
     for day_entry in calendar:
-        new_events = []
-        for _ in range(3):
-            event_id = f"event-obj-{event_counter:03d}"
-            event_data = dict(event_pool[pool_idx % len(event_pool)])
-            event_data["id"] = event_id
-            new_events.append(event_data)
-            event_counter += 1
-            pool_idx += 1
-        day_entry["events"] = new_events
-
-    changes.append(f"Calendar: replaced events for {len(calendar)} days ({event_counter - 1} events total)")
+        day_entry["events"] = day_events(day_entry["day"])
+
+    event_total = sum(len(d["events"]) for d in calendar)
+    changes.append(f"Calendar: replaced events for {len(calendar)} days ({event_total} events total)")
 
     # -- Save outputs ---------------------------------------------------------
     with open(OUTPUT, "w") as f:
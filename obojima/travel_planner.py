@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""
+Hex travel routing with a cached location-to-location travel table.
+
+TravelGraph is the hex map as a weighted graph. Stepping into a hex costs
+its terrain cost, and world edges (roads, rivers) are links priced per hex
+of length. These are the same TERRAIN_COSTS and EDGE_COSTS that
+hex_nearest uses. A link never leads into an impassable hex, so whether B
+is reachable from A never depends on direction. Costs can differ each way,
+since a step is priced by the hex it enters. route() is A* with a hex-distance heuristic scaled by the
+cheapest step, so it stays admissible when roads are cheaper than plains.
+
+TravelTable caches one Dijkstra row per source location, stopping once
+every other location is settled. Editing the map invalidates only the rows
+the edit can change:
+
+  cost goes up   rows whose chosen routes pass through the hex or edge.
+  cost goes down rows where the cheapest settled neighbour plus the new
+                 cost, plus the heuristic to a target, beats that target.
+
+A terrain change also drops the row of any location standing on that hex.
+Every other row keeps its cached costs, so lookups stay O(1) between edits.
+
+    table = TravelTable.from_world(world)
+    table.cost("settlement-a", "settlement-b")  -> movement cost, inf if unreachable
+    table.route("settlement-a", "settlement-b") -> (cost, [(q, r), ...])
+    table.set_terrain((2, 1), "plains")         -> rows invalidated
+    table.set_edge((0, 0), (1, 0), "road")      -> rows invalidated
+
+Usage: python3 travel_planner.py [world.hexbinder.json] [--from NAME] [--to NAME]
+"""
+
+import heapq
+import json
+import math
+import sys
+import time
+from pathlib import Path
+
+from hex_nearest import AXIAL_DIRECTIONS, EDGE_COSTS, TERRAIN_COSTS, _qr, hex_distance
+
+BASE = Path(__file__).parent
+DEFAULT_WORLD = BASE / "obojima_final.hexbinder.json"
+
+
+class TravelGraph:
+    def __init__(self, world, terrain_costs=TERRAIN_COSTS, edge_costs=EDGE_COSTS):
+        self.terrain_costs = terrain_costs
+        self.edge_costs = edge_costs
+        self.terrain = {_qr(h["coord"]): h.get("terrain") for h in world.get("hexes", [])}
+        self.enter = {}
+        for qr, t in self.terrain.items():
+            self._set_enter(qr, t)
+        self.edges = {}  # (a, b) sorted -> {edge types}
+        self.links = {}  # node -> {neighbour: cost}
+        for edge in world.get("edges", []):
+            self.add_edge(_qr(edge["from"]), _qr(edge["to"]), edge.get("type"))
+        steps = [c for c in terrain_costs.values() if c != math.inf] + list(edge_costs.values())
+        self.min_step = min(steps) if steps else 1
+
+    def _set_enter(self, qr, terrain):
+        step = self.terrain_costs.get(terrain, math.inf)
+        if step == math.inf:
+            self.enter.pop(qr, None)
+        else:
+            self.enter[qr] = step
+
+    def _link_cost(self, a, b):
+        types = self.edges.get((a, b) if a <= b else (b, a), ())
+        per_hex = min((self.edge_costs[t] for t in types if t in self.edge_costs), default=None)
+        return None if per_hex is None else per_hex * max(1, hex_distance(a, b))
+
+    def _relink(self, a, b):
+        cost = self._link_cost(a, b)
+        for x, y in ((a, b), (b, a)):
+            if cost is None:
+                self.links.get(x, {}).pop(y, None)
+            else:
+                self.links.setdefault(x, {})[y] = cost
+
+    def add_edge(self, a, b, edge_type):
+        self.edges.setdefault((a, b) if a <= b else (b, a), set()).add(edge_type)
+        self._relink(a, b)
+
+    def remove_edge(self, a, b, edge_type):
+        key = (a, b) if a <= b else (b, a)
+        types = self.edges.get(key)
+        if types:
+            types.discard(edge_type)
+            if not types:
+                del self.edges[key]
+        self._relink(a, b)
+
+    def enter_cost(self, qr):
+        return self.enter.get(qr, math.inf)
+
+    def link_cost(self, a, b):
+        return self.links.get(a, {}).get(b, math.inf)
+
+    def neighbors(self, node):
+        """(neighbour, step cost) pairs: passable adjacent hexes, then edge links."""
+        q, r = node
+        enter = self.enter
+        for dq, dr in AXIAL_DIRECTIONS:
+            nb = (q + dq, r + dr)
+            step = enter.get(nb)
+            if step is not None:
+                yield nb, step
+        for nb, step in self.links.get(node, {}).items():
+            # A road or river never leads into a hex you could not step into.
+            if nb in enter:
+                yield nb, step
+
+    def heuristic(self, a, b):
+        return hex_distance(a, b) * self.min_step
+
+    def dijkstra(self, source, targets=None):
+        """(settled costs, parents) from source; stops once all targets are settled."""
+        dist = {}
+        parent = {source: None}
+        remaining = set(targets) if targets is not None else None
+        if remaining is not None:
+            remaining.discard(source)
+        # Nothing can come back into an impassable hex, so nothing leaves it either.
+        heap = [(0, source)] if source in self.enter else []
+        best = {source: 0}
+        if not heap:
+            return {source: 0}, parent
+        pop, push = heapq.heappop, heapq.heappush
+        while heap:
+            cost, node = pop(heap)
+            if node in dist:
+                continue
+            dist[node] = cost
+            if remaining is not None:
+                remaining.discard(node)
+                if not remaining:
+                    break
+            for nb, step in self.neighbors(node):
+                c = cost + step
+                if nb not in dist and c < best.get(nb, math.inf):
+                    best[nb] = c
+                    parent[nb] = node
+                    push(heap, (c, nb))
+        return dist, parent
+
+    def route(self, start, goal):
+        """(cost, path) by A*; (inf, []) when goal is unreachable."""
+        start, goal = _qr(start), _qr(goal)
+        if start == goal:
+            return 0, [start]
+        if start not in self.enter:
+            return math.inf, []
+        best = {start: 0}
+        parent = {start: None}
+        heap = [(self.heuristic(start, goal), 0, start)]
+        closed = set()
+        pop, push = heapq.heappop, heapq.heappush
+        while heap:
+            _, cost, node = pop(heap)
+            if node == goal:
+                return cost, _walk_back(parent, goal)
+            if node in closed:
+                continue
+            closed.add(node)
+            for nb, step in self.neighbors(node):
+                c = cost + step
+                if nb not in closed and c < best.get(nb, math.inf):
+                    best[nb] = c
+                    parent[nb] = node
+                    push(heap, (c + self.heuristic(nb, goal), c, nb))
+        return math.inf, []
+
+
+def _walk_back(parent, node):
+    path = []
+    while node is not None:
+        path.append(node)
+        node = parent[node]
+    path.reverse()
+    return path
+
+
+class _Row:
+    """One source's cached Dijkstra result."""
+
+    __slots__ = ("costs", "settled", "hexes", "links")
+
+    def __init__(self, costs, settled, hexes, links):
+        self.costs = costs      # location id -> cost
+        self.settled = settled  # hex -> settled cost
+        self.hexes = hexes      # hexes on the chosen routes
+        self.links = links      # (a, b) sorted pairs on the chosen routes
+
+
+class TravelTable:
+    def __init__(self, graph, locations):
+        self.graph = graph
+        self.locations = dict(locations)  # id -> (q, r)
+        self.rows = {}
+        self.solves = 0
+
+    @classmethod
+    def from_world(cls, world, kinds=("settlement",), **costs):
+        locations = {
+            loc["id"]: _qr(loc["hexCoord"])
+            for loc in world.get("locations", [])
+            if loc.get("hexCoord") and (not kinds or loc.get("type") in kinds)
+        }
+        return cls(TravelGraph(world, **costs), locations)
+
+    def _solve(self, source_id):
+        source = self.locations[source_id]
+        settled, parent = self.graph.dijkstra(source, self.locations.values())
+        costs = {}
+        hexes = set()
+        links = set()
+        for loc_id, qr in self.locations.items():
+            costs[loc_id] = settled.get(qr, math.inf)
+            if qr not in settled or qr in hexes:
+                continue
+            node = qr
+            while node is not None and node not in hexes:
+                hexes.add(node)
+                prev = parent[node]
+                if prev is not None:
+                    links.add((prev, node) if prev <= node else (node, prev))
+                node = prev
+        self.solves += 1
+        row = self.rows[source_id] = _Row(costs, settled, hexes, links)
+        return row
+
+    def row(self, source_id):
+        row = self.rows.get(source_id)
+        return row if row is not None else self._solve(source_id)
+
+    def cost(self, a, b):
+        return self.row(a).costs[b]
+
+    def table(self):
+        """{source id: {target id: cost}} for every location pair."""
+        return {loc_id: self.row(loc_id).costs for loc_id in self.locations}
+
+    def route(self, a, b):
+        return self.graph.route(self.locations[a], self.locations[b])
+
+    def one_way(self):
+        """(a, b) pairs reachable from a to b but not back; empty on a consistent graph."""
+        rows = self.table()
+        return [(a, b) for a, costs in rows.items() for b, c in costs.items()
+                if c != math.inf and rows[b][a] == math.inf]
+
+    # -- incremental invalidation ---------------------------------------------
+
+    def _improvable(self, row, via, bound):
+        """Could reaching `via` at cost `bound` beat any of this row's targets?"""
+        h = self.graph.heuristic
+        for loc_id, qr in self.locations.items():
+            if bound + h(via, qr) < row.costs[loc_id]:
+                return True
+        return False
+
+    def _drop(self, keep):
+        stale = [loc_id for loc_id, row in self.rows.items() if not keep(loc_id, row)]
+        for loc_id in stale:
+            del self.rows[loc_id]
+        return len(stale)
+
+    def set_terrain(self, qr, terrain):
+        """Change one hex's terrain. Returns the number of rows invalidated."""
+        qr = _qr(qr)
+        graph = self.graph
+        old = graph.enter_cost(qr)
+        graph.terrain[qr] = terrain
+        graph._set_enter(qr, terrain)
+        new = graph.enter_cost(qr)
+        if new == old:
+            return 0
+        # Rows from a location on this hex: its passability decides whether they leave at all.
+        here = {loc_id for loc_id, at in self.locations.items() if at == qr}
+        if new > old:
+            return self._drop(lambda loc_id, row: loc_id not in here and qr not in row.hexes)
+        q, r = qr
+        around = [(q + dq, r + dr) for dq, dr in AXIAL_DIRECTIONS]
+        # Links into the hex open up too, at their own cost.
+        entries = [(nb, new) for nb in around] + list(graph.links.get(qr, {}).items())
+
+        def keep(loc_id, row):
+            if loc_id in here:
+                return False
+            reached = [row.settled[nb] + step for nb, step in entries if nb in row.settled]
+            return not reached or not self._improvable(row, qr, min(reached))
+        return self._drop(keep)
+
+    def set_edge(self, a, b, edge_type, present=True):
+        """Add (or with present=False remove) one edge. Returns rows invalidated."""
+        a, b = _qr(a), _qr(b)
+        graph = self.graph
+        old = graph.link_cost(a, b)
+        if present:
+            graph.add_edge(a, b, edge_type)
+        else:
+            graph.remove_edge(a, b, edge_type)
+        new = graph.link_cost(a, b)
+        key = (a, b) if a <= b else (b, a)
+        if new > old:
+            return self._drop(lambda loc_id, row: key not in row.links)
+        if new < old:
+            def keep(loc_id, row):
+                for x, y in ((a, b), (b, a)):
+                    if x in row.settled and y in graph.enter and self._improvable(row, y, row.settled[x] + new):
+                        return False
+                return True
+            return self._drop(keep)
+        return 0
+
+
+def _find(world, name):
+    name = name.lower()
+    for loc in world.get("locations", []):
+        if loc["id"] == name or loc.get("name", "").lower().startswith(name):
+            return loc
+    raise SystemExit(f"No location matching {name!r}")
+
+
+def main():
+    args = sys.argv[1:]
+    opts = {}
+    for flag in ("--from", "--to"):
+        if flag in args:
+            i = args.index(flag)
+            opts[flag] = args[i + 1]
+            del args[i:i + 2]
+    world_path = Path(args[0]) if args else DEFAULT_WORLD
+    with open(world_path) as f:
+        world = json.load(f)
+
+    start = time.perf_counter()
+    table = TravelTable.from_world(world)
+    rows = table.table()
+    elapsed = time.perf_counter() - start
+    names = {l["id"]: l["name"] for l in world["locations"]}
+    n = len(table.locations)
+    print(f"Travel table for {n} settlements ({n * n} pairs) in {elapsed * 1000:.1f} ms")
+    for a, costs in rows.items():
+        cells = " ".join(f"{c:>5g}" if c != math.inf else "    -" for c in costs.values())
+        print(f"  {names[a][:22]:<22} {cells}")
+
+    one_way = table.one_way()
+    print(f"Reachability symmetric: {'yes' if not one_way else 'NO'}")
+    for a, b in one_way:
+        print(f"  {names[a]} -> {names[b]} reachable, not the way back")
+
+    src = _find(world, opts.get("--from", "Tidewater"))
+    dst = _find(world, opts.get("--to", "Matango"))
+    cost, path = table.graph.route(src["hexCoord"], dst["hexCoord"])
+    print(f"\n{src['name']} -> {dst['name']}: cost {cost:g} via {path}")
+
+    # Block one hex on the route and add one road; see how much of the table survives.
+    qr = path[len(path) // 2] if path else _qr(src["hexCoord"])
+    for label, edit in ((f"Set {qr} to mountains", lambda: table.set_terrain(qr, "mountains")),
+                        (f"Road {src['name']} -> {dst['name']}",
+                         lambda: table.set_edge(_qr(src["hexCoord"]), _qr(dst["hexCoord"]), "road"))):
+        solves = table.solves
+        start = time.perf_counter()
+        dropped = edit()
+        table.table()
+        elapsed = time.perf_counter() - start
+        print(f"{label}: {dropped}/{n} rows invalidated, {table.solves - solves} re-solved "
+              f"in {elapsed * 1000:.2f} ms; "
+              f"route cost now {table.graph.route(src['hexCoord'], dst['hexCoord'])[0]:g}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,8 @@ import json
 import sys
 from pathlib import Path
 
+from dungeon_grid import validate_world as dungeon_layout_problems
+
 BASE = Path(__file__).parent
 
 def load_json(filename):
@@ -212,6 +214,9 @@ def main():
                 failures.append(f"NPC '{name}' ({npc['id']}) contains generic name '{gn}'")
     check("(q) No generic NPC names", failures)
 
+    # ── (r) Dungeon layouts: no overlaps, cut-throughs, dangling ─
+    check("(r) Dungeon room/passage layouts", dungeon_layout_problems(core))
+
     # ── Summary ──────────────────────────────────────────────
     print()
     print("=" * 70)
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+O(1) wandering-monster rolls via alias tables.
+
+A dungeon's wanderingMonsters.entries is compiled once into a Vose alias
+table. Each roll then costs one uniform draw and one comparison, however
+many entries the table has. Compiled tables are cached by a hash of their
+entries, so every dungeon sharing a table shares the compiled form.
+
+    sampler = compile_table(dungeon["wanderingMonsters"])
+    sampler.roll(rng)              -> {"creatureType", "count", "activity"}
+    sampler.roll_many(rng, 10000)  -> list of encounters
+    sampler.probabilities()        -> exact Fraction per entry
+    sampler.count_distribution()   -> exact pmf of the encounter size
+
+Usage: python3 wander_table.py [world.hexbinder.json] [--rolls N]
+"""
+
+import hashlib
+import json
+import random
+import sys
+import time
+from collections import Counter
+from fractions import Fraction
+from pathlib import Path
+
+from dice import mixture_pmf, parse
+
+BASE = Path(__file__).parent
+DEFAULT_WORLD = BASE / "obojima_final.hexbinder.json"
+
+
+class AliasTable:
+    """Vose's alias method over integer or float weights."""
+
+    def __init__(self, weights):
+        n = len(weights)
+        if n == 0:
+            raise ValueError("alias table needs at least one entry")
+        total = sum(weights)
+        if total <= 0:
+            raise ValueError("alias table weights must sum to a positive value")
+        scaled = [w * n / total for w in weights]
+        prob = [0.0] * n
+        alias = list(range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s = small.pop()
+            l = large.pop()
+            prob[s] = scaled[s]
+            alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+        for i in large + small:
+            prob[i] = 1.0
+        self.n = n
+        self.prob = prob
+        self.alias = alias
+
+    def sample(self, rng):
+        x = rng.random() * self.n
+        i = int(x)
+        return i if x - i < self.prob[i] else self.alias[i]
+
+    def sample_many(self, rng, k):
+        n, prob, alias = self.n, self.prob, self.alias
+        rand = rng.random
+        out = []
+        append = out.append
+        for _ in range(k):
+            x = rand() * n
+            i = int(x)
+            append(i if x - i < prob[i] else alias[i])
+        return out
+
+
+class WanderingSampler:
+    def __init__(self, entries):
+        self.entries = [dict(e) for e in entries]
+        self.weights = [e.get("weight", 1) for e in self.entries]
+        self.table = AliasTable(self.weights)
+        self.counts = [parse(e.get("count", 1)) for e in self.entries]
+
+    def _encounter(self, i, count):
+        e = self.entries[i]
+        return {"creatureType": e["creatureType"], "count": count, "activity": e.get("activity", "")}
+
+    def roll(self, rng=random):
+        i = self.table.sample(rng)
+        return self._encounter(i, self.counts[i].roll(rng))
+
+    def roll_many(self, rng, k):
+        """k encounters; counts are rolled in one batch per entry."""
+        picks = self.table.sample_many(rng, k)
+        positions = {}
+        for pos, i in enumerate(picks):
+            positions.setdefault(i, []).append(pos)
+        counts = [0] * k
+        for i, where in sorted(positions.items()):
+            for pos, n in zip(where, self.counts[i].roll_many(rng, len(where))):
+                counts[pos] = n
+        return [self._encounter(i, n) for i, n in zip(picks, counts)]
+
+    def roll_indices(self, rng, k):
+        """Entry indices only: the cheapest form for bulk simulation."""
+        return self.table.sample_many(rng, k)
+
+    def probabilities(self):
+        """Exact chance of each entry, as Fractions in entry order."""
+        total = sum(Fraction(w) for w in self.weights)
+        return [Fraction(w) / total for w in self.weights]
+
+    def creature_probabilities(self):
+        """Exact chance per creatureType, merging duplicate entries."""
+        out = {}
+        for e, p in zip(self.entries, self.probabilities()):
+            out[e["creatureType"]] = out.get(e["creatureType"], 0) + p
+        return out
+
+    def count_distribution(self):
+        """Exact pmf of the number of creatures in one encounter."""
+        return mixture_pmf([(w, e.get("count", 1)) for w, e in zip(self.weights, self.entries)])
+
+
+_CACHE = {}
+
+
+def table_hash(entries):
+    blob = json.dumps(entries, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(blob.encode()).hexdigest()
+
+
+def compile_table(table):
+    """Cached WanderingSampler for a wanderingMonsters dict or entries list."""
+    entries = table.get("entries", []) if isinstance(table, dict) else table
+    key = table_hash(entries)
+    sampler = _CACHE.get(key)
+    if sampler is None:
+        sampler = _CACHE[key] = WanderingSampler(entries)
+    return sampler
+
+
+def _linear_roll(entries, rng):
+    total = sum(e["weight"] for e in entries)
+    roll = rng.random() * total
+    for i, e in enumerate(entries):
+        roll -= e["weight"]
+        if roll < 0:
+            return i
+    return len(entries) - 1
+
+
+def main():
+    args = sys.argv[1:]
+    rolls = 1_000_000
+    if "--rolls" in args:
+        i = args.index("--rolls")
+        rolls = int(args[i + 1])
+        del args[i:i + 2]
+    world_path = Path(args[0]) if args else DEFAULT_WORLD
+    with open(world_path) as f:
+        world = json.load(f)
+
+    dungeons = [l for l in world["locations"] if l.get("type") == "dungeon" and l.get("wanderingMonsters")]
+    rng = random.Random(world.get("seed"))
+    per = rolls // max(1, len(dungeons))
+
+    start = time.perf_counter()
+    for d in dungeons:
+        entries = d["wanderingMonsters"]["entries"]
+        for _ in range(per):
+            _linear_roll(entries, rng)
+    linear = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = {}
+    for d in dungeons:
+        results[d["id"]] = compile_table(d["wanderingMonsters"]).roll_indices(rng, per)
+    alias = time.perf_counter() - start
+    print(f"{per * len(dungeons):,} rolls over {len(dungeons)} dungeons: "
+          f"linear scan {linear * 1000:.0f} ms, alias {alias * 1000:.0f} ms")
+
+    d = dungeons[0]
+    sampler = compile_table(d["wanderingMonsters"])
+    seen = Counter(results[d["id"]])
+    print(f"\n{d['name']} (exact vs observed):")
+    for i, (e, p) in enumerate(zip(sampler.entries, sampler.probabilities())):
+        print(f"  {str(p):>6} = {float(p):.4f}  observed {seen[i] / per:.4f}  {e['count']} {e['creatureType']}")
+    sizes = sampler.count_distribution()
+    mean = sum(n * p for n, p in sizes.items())
+    print("\nEncounter size: " + ", ".join(f"{n}: {float(p):.3f}" for n, p in sizes.items()) + f" (mean {float(mean):.3f})")
+    print(f"Sample encounter: {sampler.roll(rng)}")
+
+
+if __name__ == "__main__":
+    main()
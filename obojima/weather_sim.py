@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Season-aware Markov weather for calendar days.
+
+calendar_engine draws each day's weather independently, as the app does.
+This model chains days together. Tomorrow's condition and temperature band
+depend on today's, through a transition matrix built per (region, season):
+
+  - stationary pull toward the season's WEATHER_BY_SEASON / TEMP_BY_SEASON
+    weights, scaled by the region's climate multipliers
+  - persistence, so today's weather tends to hold
+  - affinity by severity, so clear skies drift to cloud before rain and
+    rain before storms
+
+Matrices are compiled once into cumulative rows. simulate() then advances
+every chain (one per region, or per world for what-if forecasts) in
+lockstep, one bisect per draw. Output records have the app's weather shape
+({condition, temperature, tempLow, tempHigh, wind}).
+
+Years are simulated whole and are independent of each other: each year
+starts from a state drawn from its own seeded stream. A lazy calendar can
+therefore seek to year 40 without simulating years 1-39.
+
+    weather = MarkovWeather(data["seed"], "Brackwater Wetlands")
+    cal = CalendarEngine.from_world(data, weather=weather)
+    simulate_regions(seed, REGION_CLIMATES, year=0)     # all regions at once
+    forecast_batch(worlds, days=28)                     # what-if, many worlds
+
+Usage: python3 weather_sim.py [world.hexbinder.json] [--worlds N] [--write OUT]
+"""
+
+import json
+import math
+import random
+import sys
+import time
+from bisect import bisect_right
+from itertools import accumulate
+from pathlib import Path
+
+from calendar_engine import (
+    SNOW_CONDITIONS, STORM_CONDITIONS, TEMP_BY_SEASON, TEMP_RANGES,
+    WEATHER_BY_SEASON, WIND_WEIGHTS, season_for_day,
+)
+from rng_streams import stream_seed
+
+BASE = Path(__file__).parent
+DEFAULT_WORLD = BASE / "obojima_final.hexbinder.json"
+
+SEASONS = ("spring", "summer", "autumn", "winter")
+CONDITIONS = list(WEATHER_BY_SEASON["spring"])
+TEMPERATURES = list(TEMP_BY_SEASON["spring"])
+WINDS = list(WIND_WEIGHTS)
+
+SEVERITY = {
+    "clear": 0, "cloudy": 1, "overcast": 2, "fog": 2, "rain_light": 3, "snow_light": 3,
+    "rain_heavy": 4, "snow_heavy": 4, "storm": 5, "thunderstorm": 5, "blizzard": 6,
+}
+
+# Condition weight multipliers and a temperature band shift per region.
+REGION_CLIMATES = {
+    "default": {},
+    "Gift of Shuritashi": {"conditions": {"clear": 1.2, "fog": 1.5}},
+    "Land of Hot Water": {"conditions": {"fog": 3.0, "snow_light": 0.3, "snow_heavy": 0.2, "blizzard": 0.1},
+                          "temp_shift": 1},
+    "Mount Arbora": {"conditions": {"snow_light": 2.0, "snow_heavy": 2.0, "blizzard": 2.0, "fog": 2.0},
+                     "temp_shift": -1},
+    "Gale Fields": {"conditions": {"storm": 2.0, "thunderstorm": 1.5}, "wind": {"wind": 2.0, "gale": 3.0}},
+    "Brackwater Wetlands": {"conditions": {"rain_light": 1.8, "rain_heavy": 1.5, "fog": 4.0, "clear": 0.6}},
+    "Coastal Highlands": {"conditions": {"overcast": 1.4, "storm": 1.5}, "wind": {"wind": 1.5}},
+    "The Shallows": {"conditions": {"storm": 1.8, "thunderstorm": 1.3, "fog": 2.0}, "wind": {"gale": 2.0}},
+}
+
+
+def _affinity_matrix(states, weights, persistence, spread, distance):
+    """Row-stochastic matrix: persistence + weights pulled by closeness."""
+    rows = []
+    for i, a in enumerate(states):
+        row = [weights[j] * math.exp(-distance(a, b) / spread) for j, b in enumerate(states)]
+        total = sum(row)
+        if total == 0:
+            row = list(weights)
+            total = sum(row)
+        stay = persistence if weights[i] > 0 else 0.0
+        row = [(1 - stay) * w / total for w in row]
+        row[i] += stay
+        rows.append(row)
+    return rows
+
+
+class Climate:
+    """Compiled transition tables for one region, all four seasons."""
+
+    def __init__(self, profile=None, persistence=0.45, temp_persistence=0.6):
+        profile = profile or {}
+        cond_mult = profile.get("conditions", {})
+        shift = profile.get("temp_shift", 0)
+        wind_mult = profile.get("wind", {})
+        self.condition_cdf = {}
+        self.temp_cdf = {}
+        for season in SEASONS:
+            cw = [WEATHER_BY_SEASON[season][c] * cond_mult.get(c, 1.0) for c in CONDITIONS]
+            base_t = [TEMP_BY_SEASON[season][t] for t in TEMPERATURES]
+            n = len(base_t)
+            tw = [base_t[min(n - 1, max(0, i - shift))] for i in range(n)]
+            cm = _affinity_matrix(CONDITIONS, cw, persistence, 1.5,
+                                  lambda a, b: abs(SEVERITY[a] - SEVERITY[b]))
+            tm = _affinity_matrix(range(n), tw, temp_persistence, 0.8, lambda a, b: abs(a - b))
+            self.condition_cdf[season] = [list(accumulate(r)) for r in cm]
+            self.temp_cdf[season] = [list(accumulate(r)) for r in tm]
+        self.wind_cdf = list(accumulate(WIND_WEIGHTS[w] * wind_mult.get(w, 1.0) for w in WINDS))
+
+    def initial(self, season, rng):
+        """Random starting (condition, temp) indices from the season's weights."""
+        cw = self.condition_cdf[season]
+        tw = self.temp_cdf[season]
+        return (_draw(cw[rng.randrange(len(cw))], rng.random()),
+                _draw(tw[rng.randrange(len(tw))], rng.random()))
+
+
+def _draw(cdf, u):
+    i = bisect_right(cdf, u * cdf[-1])
+    return min(i, len(cdf) - 1)
+
+
+def _record(condition, temp, wind_u, low_u, high_u, wind_cdf):
+    wind = WINDS[_draw(wind_cdf, wind_u)]
+    if condition in STORM_CONDITIONS:
+        if wind in ("calm", "breeze"):
+            wind = "wind"
+        if condition == "blizzard":
+            wind = "gale"
+    temperature = TEMPERATURES[temp]
+    if condition in SNOW_CONDITIONS and temperature not in ("freezing", "cold"):
+        temperature = "cold"
+    min_low, max_low, min_high, max_high = TEMP_RANGES[temperature]
+    temp_low = min_low + int(low_u * (max_low - min_low + 1))
+    lo = max(min_high, temp_low + 5)
+    temp_high = lo + int(high_u * (max(max_high, lo) - lo + 1))
+    return {"condition": condition, "temperature": temperature,
+            "tempLow": temp_low, "tempHigh": temp_high, "wind": wind}
+
+
+def simulate(chains, start_day, days):
+    """Advance chains in lockstep.
+
+    chains is a list of (climate, rng, (condition_idx, temp_idx)). Returns
+    one list of `days` weather records per chain, for start_day onward.
+    """
+    states = [list(state) for _, _, state in chains]
+    climates = [c for c, _, _ in chains]
+    rngs = [r for _, r, _ in chains]
+    out = [[] for _ in chains]
+    for day in range(start_day, start_day + days):
+        season = season_for_day(day)
+        for k, state in enumerate(states):
+            climate = climates[k]
+            rand = rngs[k].random
+            c = _draw(climate.condition_cdf[season][state[0]], rand())
+            t = _draw(climate.temp_cdf[season][state[1]], rand())
+            state[0], state[1] = c, t
+            out[k].append(_record(CONDITIONS[c], t, rand(), rand(), rand(), climate.wind_cdf))
+    return out
+
+
+def _year_chain(seed, region, climate, year):
+    rng = random.Random(stream_seed(seed, region, "markov-weather", year))
+    first_day = year * 360 + 1
+    return climate, rng, climate.initial(season_for_day(first_day), rng)
+
+
+def simulate_regions(seed, regions=REGION_CLIMATES, year=0):
+    """{region: 360 weather records} for one year of every region at once."""
+    names = list(regions)
+    chains = [_year_chain(seed, name, Climate(regions[name]), year) for name in names]
+    return dict(zip(names, simulate(chains, year * 360 + 1, 360)))
+
+
+class MarkovWeather:
+    """Weather source for CalendarEngine: day -> record, one simulated year at a time."""
+
+    def __init__(self, seed, region="default", profile=None, max_years=4):
+        self.seed = seed
+        self.region = region
+        self.climate = Climate(profile if profile is not None else REGION_CLIMATES.get(region, {}))
+        self._years = {}
+        self._max_years = max_years
+
+    def year(self, year):
+        cached = self._years.get(year)
+        if cached is None:
+            chain = _year_chain(self.seed, self.region, self.climate, year)
+            cached = simulate([chain], year * 360 + 1, 360)[0]
+            if len(self._years) >= self._max_years:
+                self._years.pop(next(iter(self._years)))
+            self._years[year] = cached
+        return cached
+
+    def __call__(self, day):
+        year, offset = divmod(day - 1, 360)
+        return dict(self.year(year)[offset])
+
+
+def forecast_batch(worlds, days=28, region="default", runs=1):
+    """What-if forecasts: {world id: [run][day] records} from each world's current weather.
+
+    Worlds on the same calendar day share a season schedule and advance as
+    one batch of chains.
+    """
+    climate = Climate(REGION_CLIMATES.get(region, {}))
+    groups = {}
+    for world in worlds:
+        state = world.get("state", {})
+        day = state.get("day", 1)
+        current = state.get("weather", {})
+        c = CONDITIONS.index(current["condition"]) if current.get("condition") in CONDITIONS else 0
+        t = TEMPERATURES.index(current["temperature"]) if current.get("temperature") in TEMPERATURES else 3
+        for run in range(runs):
+            rng = random.Random(stream_seed(world.get("seed", ""), region, "forecast", day, run))
+            groups.setdefault(day, []).append((world.get("id"), (climate, rng, (c, t))))
+
+    out = {}
+    for day, members in groups.items():
+        results = simulate([chain for _, chain in members], day + 1, days)
+        for (world_id, _), records in zip(members, results):
+            out.setdefault(world_id, []).append(records)
+    return out
+
+
+def apply_to_calendar(world, region="default"):
+    """Replace weather in state.calendar (and today's state.weather) with the Markov model."""
+    weather = MarkovWeather(world.get("seed", ""), region)
+    state = world["state"]
+    for entry in state.get("calendar", []):
+        entry["weather"] = weather(entry["day"])
+    state["weather"] = weather(state.get("day", 1))
+    return state.get("calendar", [])
+
+
+def main():
+    args = sys.argv[1:]
+    n_worlds = 500
+    out_path = None
+    if "--worlds" in args:
+        i = args.index("--worlds")
+        n_worlds = int(args[i + 1])
+        del args[i:i + 2]
+    if "--write" in args:
+        i = args.index("--write")
+        out_path = Path(args[i + 1])
+        del args[i:i + 2]
+    world_path = Path(args[0]) if args else DEFAULT_WORLD
+    with open(world_path) as f:
+        world = json.load(f)
+    seed = world.get("seed", "")
+
+    start = time.perf_counter()
+    years = simulate_regions(seed)
+    elapsed = time.perf_counter() - start
+    print(f"Simulated a year for {len(years)} regions in {elapsed * 1000:.0f} ms")
+    for region, records in years.items():
+        summer = records[90:180]
+        wet = sum(r["condition"].startswith(("rain", "storm", "thunder")) for r in summer)
+        print(f"  {region:<20} summer wet days {wet:>2}/90")
+
+    variants = [{**world, "id": f"{world.get('id')}-{i}", "seed": f"{seed}-{i}"} for i in range(n_worlds)]
+    start = time.perf_counter()
+    forecasts = forecast_batch(variants, days=28)
+    elapsed = time.perf_counter() - start
+    print(f"28-day forecasts for {len(forecasts)} worlds in {elapsed * 1000:.0f} ms")
+
+    if out_path:
+        apply_to_calendar(world)
+        with open(out_path, "w") as f:
+            json.dump(world, f, indent=2)
+        print(f"Wrote Markov weather into state.calendar: {out_path}")
+
+
+if __name__ == "__main__":
+    main()